@@ -8,9 +8,10 @@ from sqlalchemy.future import select
 
 from app.core import security
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, RedisClient
 from app.models.user import User
 from app.schemas.auth import TokenPayload
+from app.services.user_cache import UserCache
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_PREFIX}/auth/token"
@@ -20,6 +21,12 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(reusable_oauth2)
 ) -> User:
+    """
+    The user the bearer token belongs to. It may come from the user cache:
+    then it is a transient User with profile columns only, attached to no
+    session. Handlers that modify the user, or need anything beyond the
+    profile, load the row through their own session first (see update_user_me).
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -31,11 +38,16 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
     
-    # In async sqlalchemy we use execute(select(...))
-    result = await db.execute(select(User).where(User.email == token_data.sub))
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # Resolved users are cached briefly; the cache never holds credentials
+    cache = UserCache(RedisClient.get_client())
+    user = await cache.get(token_data.sub)
+    if user is None:
+        # In async sqlalchemy we use execute(select(...))
+        result = await db.execute(select(User).where(User.email == token_data.sub))
+        user = result.scalar_one_or_none()
+        
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        await cache.set(token_data.sub, user)
         
     return user
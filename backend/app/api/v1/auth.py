@@ -7,14 +7,26 @@ from datetime import timedelta
 from app.api.deps import get_current_user
 from datetime import timedelta
 
-from app.core.database import get_db
+from app.core.database import get_db, RedisClient
 from app.models.user import User
 from app.schemas.auth import UserCreate, UserResponse, Token
 from app.core.security import get_password_hash, verify_password, create_access_token
 from app.core.config import settings
+from app.core.blocking import password_pool, oauth_pool
+from app.exceptions.base import ServiceBusyException
+from app.services.user_cache import invalidate_user
 
 router = APIRouter()
 
+
+def busy_http_exception(e: ServiceBusyException) -> HTTPException:
+    return HTTPException(
+        status_code=e.status_code,
+        detail=e.message,
+        headers={"Retry-After": str(e.retry_after_seconds)}
+    )
+
+
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     """
@@ -34,8 +46,11 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
             detail="Email already registered"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user.password)
+    # Create new user (Argon2 runs on the hashing pool, off the event loop)
+    try:
+        hashed_password = await password_pool.run(get_password_hash, user.password)
+    except ServiceBusyException as e:
+        raise busy_http_exception(e)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -55,7 +70,12 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    try:
+        valid = bool(user) and await password_pool.run(verify_password, form_data.password, user.hashed_password)
+    except ServiceBusyException as e:
+        raise busy_http_exception(e)
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -107,7 +127,7 @@ async def google_login(user_id: str): # We pass user_id to know who to link. Ide
                 "client_id": settings.AUTH_GOOGLE_ID,
                 "client_secret": settings.AUTH_GOOGLE_SECRET,
                 "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
+                "token_uri": settings.GOOGLE_TOKEN_URI,
             }
         },
         scopes=SCOPES
@@ -138,7 +158,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
                 "client_id": settings.AUTH_GOOGLE_ID,
                 "client_secret": settings.AUTH_GOOGLE_SECRET,
                 "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
+                "token_uri": settings.GOOGLE_TOKEN_URI,
             }
         },
         scopes=SCOPES,
@@ -150,8 +170,11 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
     os.environ['OAUTHLIB_RELAX_TOKEN_SCOPE'] = '1'
     
     try:
-        flow.fetch_token(code=code)
+        # Synchronous HTTP call to Google; run it on the OAuth pool
+        await oauth_pool.run(flow.fetch_token, code=code)
         credentials = flow.credentials
+    except ServiceBusyException as e:
+        raise busy_http_exception(e)
     except Exception as e:
         # Check if it is the specific scope error and handle/log it, but usually the env var fixes it
         raise HTTPException(status_code=400, detail=f"Failed to fetch token: {str(e)}")
@@ -177,6 +200,7 @@ async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
             user.google_account_connected = True
             db.add(user)
             await db.commit()
+            await invalidate_user(RedisClient.get_client(), user.email)
             
             # Redirect back to frontend settings page with success
             return RedirectResponse("http://localhost:3000/dashboard/settings?google_connected=true")
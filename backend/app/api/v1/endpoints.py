@@ -1,19 +1,52 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.schemas.analysis import AnalyzeRequest, AnalyzeResponse, TaskStatusResponse, AnalysisHistoryItem, AnalysisResultSchema, ReviewListResponse, ReviewItem, AnalysisHistoryResponse
-from app.worker.tasks import analyze_restaurant_task
-from app.core.database import get_db
-from app.models.restaurant import AnalysisReport
+from fastapi import APIRouter, HTTPException, Depends, Request, Query, Header, UploadFile, File, Form
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from app.schemas.analysis import AnalyzeRequest, AnalyzeResponse, TaskStatusResponse, AnalysisResultSchema, AnalysisBatchRequest, AnalysisBatchResponse, ReviewListResponse, AnalysisHistoryResponse, history_item_dict, review_item_dict
+from app.worker.scheduling import TaskLane, enqueue_analysis
+from app.api.v1.responses import build_analyze_response, overloaded_http_exception
+from app.exceptions.analysis import TaskQuotaExceededException, QueueOverloadedException
+from app.services.queue_metrics import QueueMetrics
+from app.core.database import get_db, RedisClient
+from app.core.pagination import encode_cursor, decode_cursor, parse_cursor_datetime
+from app.core.http_cache import make_etag, conditional_response
+from app.services.progress import stream_progress
+from app.services.dashboard_cache import DashboardCache, reviews_version
+from app.repositories.stats_repository import StatsRepository
+from app.models.restaurant import AnalysisReport, AnalysisResult, Restaurant
+from app.core.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, tuple_
 from datetime import datetime, timedelta
+from typing import Optional
 from celery.result import AsyncResult
+import asyncio
+import json
 import logging
+import os
+import uuid
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def build_analysis_schema(report: AnalysisReport) -> AnalysisResultSchema:
+    """Report detail from a report loaded with its restaurant and result."""
+    return AnalysisResultSchema(
+        id=report.id,
+        sentiment_score=report.sentiment_score,
+        summary=report.result.summary,
+        complaints=report.result.complaints or [],
+        praises=report.result.praises or [],
+        recommended_actions=report.result.recommended_actions or [],
+        reviews_analyzed=report.result.reviews_analyzed,
+        restaurant_name=report.restaurant.name if report.restaurant else "Unknown Restaurant",
+        restaurant_rating=report.restaurant.rating if report.restaurant else None,
+        google_maps_url=report.restaurant.google_maps_url if report.restaurant else None,
+        created_at=report.created_at,
+        status="COMPLETED"
+    )
+
+
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_restaurant(request: AnalyzeRequest):
     try:
@@ -25,21 +58,92 @@ async def analyze_restaurant(request: AnalyzeRequest):
                 detail="Query too short. Please enter a restaurant name and location."
             )
         
-        task = analyze_restaurant_task.delay(request.query, request.user_id)
+        queued = await enqueue_analysis(request.query, request.user_id, TaskLane.INTERACTIVE)
         
-        return AnalyzeResponse(
-            task_id=task.id,
-            status="PENDING",
-            message="Analysis task queued successfully. Use the task_id to check status."
+        return build_analyze_response(
+            queued,
+            "Analysis task queued successfully. Use the task_id to check status."
         )
         
     except HTTPException:
         raise
+    except TaskQuotaExceededException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except QueueOverloadedException as e:
+        raise overloaded_http_exception(e)
     except Exception as e:
         logger.error(f"Error queuing analysis task: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error queuing task: {str(e)}")
 
 
+IMPORT_EXTENSIONS = {".json", ".ndjson", ".jsonl"}
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def _save_upload(source, path: str, max_bytes: int) -> int:
+    """Copy an upload to `path` in chunks. Raises ValueError past `max_bytes`."""
+    written = 0
+    try:
+        with open(path, "wb") as out:
+            while chunk := source.read(UPLOAD_CHUNK_BYTES):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise ValueError("upload too large")
+                out.write(chunk)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return written
+
+
+@router.post("/imports", response_model=AnalyzeResponse)
+async def import_reviews(
+    file: UploadFile = File(...),
+    user_id: Optional[str] = Form(None),
+    analyze: bool = Form(False)
+):
+    """
+    Upload a historical review dump (raw_res.json export or NDJSON) for import.
+    A worker streams it into the database; poll /status/{task_id} for row
+    counts, rows per second and, with `analyze`, the queued batch ids.
+    """
+    try:
+        extension = os.path.splitext(file.filename or "")[1].lower()
+        if extension not in IMPORT_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file type. Expected one of: {', '.join(sorted(IMPORT_EXTENSIONS))}"
+            )
+
+        os.makedirs(settings.IMPORT_DIR, exist_ok=True)
+        path = os.path.join(settings.IMPORT_DIR, f"{uuid.uuid4().hex}{extension}")
+        try:
+            size = await asyncio.to_thread(
+                _save_upload, file.file, path, settings.IMPORT_MAX_UPLOAD_MB * 1024 * 1024
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Imports are limited to {settings.IMPORT_MAX_UPLOAD_MB} MB."
+            )
+
+        from app.worker.tasks import import_reviews_task
+        task = import_reviews_task.delay(path, user_id, analyze)
+        logger.info(f"Queued import {task.id} of {file.filename} ({size} bytes) from user {user_id}")
+
+        return AnalyzeResponse(
+            task_id=task.id,
+            message="Import queued. Use the task_id to check status."
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queuing import: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error queuing import: {str(e)}")
+
+
 @router.get("/status/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(task_id: str):
     try:
@@ -63,54 +167,150 @@ async def get_task_status(task_id: str):
         raise HTTPException(status_code=500, detail=f"Error getting status: {str(e)}")
 
 
+@router.get("/status/{task_id}/stream")
+async def stream_task_status(task_id: str, request: Request):
+    """
+    Server-Sent Events stream of stage-level progress for a task.
+    Replaces polling /status/{task_id}; the stream ends after "completed" or "failed".
+    """
+    redis_client = RedisClient.get_client()
+    if not redis_client:
+        raise HTTPException(status_code=503, detail="Progress streaming is unavailable")
+
+    async def event_source():
+        async for event in stream_progress(redis_client, task_id):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/health")
 async def health_check():
     return {"status": "ok", "message": "API is running"}
 
 
+@router.get("/metrics/queue")
+async def get_queue_metrics():
+    """
+    Queue depth, worker capacity and average stage durations.
+    Used by the worker autoscaler.
+    """
+    redis_client = RedisClient.get_client()
+    if not redis_client:
+        raise HTTPException(status_code=503, detail="Metrics are unavailable")
+    try:
+        return await QueueMetrics(redis_client).snapshot()
+    except Exception as e:
+        logger.error(f"Error reading queue metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error reading queue metrics: {str(e)}")
+
+
+@router.get("/metrics/event-loop")
+async def get_event_loop_metrics():
+    """
+    Event-loop steps that blocked longer than LOOP_BLOCK_THRESHOLD_MS, per
+    endpoint or task across the API and workers, with the last stack seen.
+    """
+    from app.core.instrumentation import get_monitor, read_loop_metrics
+
+    redis_client = RedisClient.get_client()
+    if not redis_client:
+        raise HTTPException(status_code=503, detail="Metrics are unavailable")
+    try:
+        if settings.LOOP_MONITOR_ENABLED:
+            # Include this process's latest counters, not just the last flush
+            await get_monitor().publish(redis_client)
+        return await read_loop_metrics(redis_client)
+    except Exception as e:
+        logger.error(f"Error reading event loop metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error reading event loop metrics: {str(e)}")
+
+
 @router.get("/analyses", response_model=AnalysisHistoryResponse)
 async def get_analyses(
     user_id: str,
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get analysis history for a user.
+    Get analysis history for a user, newest first.
+    Pass the returned `next_cursor` as `cursor` so deep pages cost the same as
+    page one; `skip` is kept for clients that jump to page numbers. `total`
+    comes from the per-day stats rollup; include_total=true counts it exactly.
     """
     try:
-        # Get total count
-        count_query = select(func.count()).select_from(AnalysisReport).where(
-            AnalysisReport.user_id == user_id
-        )
-        count_result = await db.execute(count_query)
-        total = count_result.scalar() or 0
+        cache = DashboardCache(RedisClient.get_client())
+        cache_params = {"skip": skip, "limit": limit, "cursor": cursor, "include_total": include_total}
+        cached, cache_version = await cache.get(user_id, "history", cache_params)
+        if cached is not None:
+            return ORJSONResponse(cached)
 
-        # Get paginated results
-        from sqlalchemy.orm import joinedload
-        query = select(AnalysisReport).options(joinedload(AnalysisReport.restaurant)).where(
+        after = None
+        if cursor:
+            try:
+                created, last_id = decode_cursor(cursor, 2)
+                after = (parse_cursor_datetime(created), int(last_id))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        if include_total:
+            # Index-only scan on ix_analysis_reports_user_created
+            count_query = select(func.count()).select_from(AnalysisReport).where(
+                AnalysisReport.user_id == user_id
+            )
+            count_result = await db.execute(count_query)
+            total = count_result.scalar() or 0
+        else:
+            # One row per day with reports instead of one per report
+            total = await StatsRepository(db).count_reports(user_id)
+
+        # Only the columns AnalysisHistoryItem needs, no ORM objects or models
+        query = select(
+            AnalysisReport.id,
+            AnalysisReport.sentiment_score,
+            AnalysisResult.summary,
+            AnalysisReport.created_at,
+            Restaurant.name.label("restaurant_name"),
+            Restaurant.google_maps_url,
+        ).outerjoin(Restaurant, Restaurant.id == AnalysisReport.restaurant_id).outerjoin(
+            AnalysisResult, AnalysisResult.id == AnalysisReport.result_id
+        ).where(
             AnalysisReport.user_id == user_id
-        ).order_by(desc(AnalysisReport.created_at)).offset(skip).limit(limit)
+        )
+        if after:
+            query = query.where(tuple_(AnalysisReport.created_at, AnalysisReport.id) < after)
+        elif skip:
+            query = query.offset(skip)
+        query = query.order_by(desc(AnalysisReport.created_at), desc(AnalysisReport.id)).limit(limit)
 
         result = await db.execute(query)
-        reports = result.scalars().all()
+        rows = result.all()
         
-        # Manually map to schema to ensure flat fields are populated from relation
-        response_items = []
-        for report in reports:
-            item = AnalysisHistoryItem(
-                id=report.id,
-                restaurant_name=report.restaurant.name if report.restaurant else "Unknown Restaurant",
-                sentiment_score=report.sentiment_score,
-                summary=report.summary,
-                created_at=report.created_at,
-                status="COMPLETED",
-                google_maps_url=report.restaurant.google_maps_url if report.restaurant else None
-            )
-            response_items.append(item)
+        next_cursor = encode_cursor([rows[-1].created_at, rows[-1].id]) if len(rows) == limit else None
         
-        return AnalysisHistoryResponse(items=response_items, total=total)
+        body = {
+            "items": [history_item_dict(row) for row in rows],
+            "total": total,
+            "total_is_estimate": not include_total,
+            "next_cursor": next_cursor,
+        }
+        await cache.set(user_id, "history", cache_params, body, cache_version)
+        return ORJSONResponse(body)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching analyses: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching analyses: {str(e)}")
@@ -124,81 +324,112 @@ async def get_analysis_stats(
 ):
     """
     Get aggregated statistics for dashboard charts.
+    Served from the per-user daily rollup, so cost does not grow with history.
     """
     try:
-        # Calculate date range
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
-        # Base query for user's reports in range
-        from sqlalchemy.orm import joinedload
-        query = select(AnalysisReport).options(joinedload(AnalysisReport.restaurant)).where(
-            AnalysisReport.user_id == user_id,
-            AnalysisReport.created_at >= start_date
-        ).order_by(AnalysisReport.created_at)
-        
-        result = await db.execute(query)
-        reports = result.scalars().all()
+        start_day = (datetime.utcnow() - timedelta(days=days)).date()
+        cache = DashboardCache(RedisClient.get_client())
+        cache_params = {"start_day": start_day}
+        cached, cache_version = await cache.get(user_id, "stats", cache_params)
+        if cached is not None:
+            return cached
         
-        # Calculate stats
-        total_analyzed = len(reports)
-        
-        if total_analyzed == 0:
-            return {
+        repo = StatsRepository(db)
+        summary = await repo.get_summary(user_id, start_day)
+        if summary["total_analyzed"] == 0:
+            stats = {
                 "total_analyzed": 0,
                 "avg_sentiment": 0,
                 "sentiment_trend": [],
                 "sentiment_distribution": {"positive": 0, "neutral": 0, "negative": 0}
             }
-            
-        avg_sentiment = sum(r.sentiment_score or 0 for r in reports) / total_analyzed
-        
-        distribution = {"positive": 0, "neutral": 0, "negative": 0}
+        else:
+            stats = {
+                "total_analyzed": summary["total_analyzed"],
+                "avg_sentiment": summary["avg_sentiment"],
+                "sentiment_trend": await repo.get_daily_trend(user_id, start_day),
+                "sentiment_distribution": summary["sentiment_distribution"]
+            }
         
-        # Individual points for trend (more granular "up and down")
-        sentiment_trend = []
-        for r in reports:
-            sentiment_trend.append({
-                "date": r.created_at.isoformat(),
-                "volume": 1,
-                "avg_sentiment": r.sentiment_score or 0,
-                "restaurant_name": r.restaurant.name if r.restaurant else "Unknown"
-            })
-            
-            # Distribution
-            score = r.sentiment_score or 0
-            if score > 0.6:
-                distribution["positive"] += 1
-            elif score > 0.2:
-                 distribution["neutral"] += 1
-            else:
-                 distribution["negative"] += 1
-                 
-        return {
-            "total_analyzed": total_analyzed,
-            "avg_sentiment": round(avg_sentiment, 2),
-            "sentiment_trend": sentiment_trend,
-            "sentiment_distribution": distribution
-        }
+        await cache.set(user_id, "stats", cache_params, stats, cache_version)
+        return stats
         
     except Exception as e:
         logger.error(f"Error fetching stats: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching stats: {str(e)}")
 
 
+@router.post("/analyses/batch", response_model=AnalysisBatchResponse)
+async def get_analyses_batch(
+    request: AnalysisBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get several analysis reports in one round trip, e.g. for a dashboard.
+    Reports come back in the order requested; IDs that are unknown, belong
+    to another user or have no result yet are listed under `missing`.
+    """
+    try:
+        ids = list(dict.fromkeys(request.ids))
+        if len(ids) > settings.ANALYSIS_BATCH_MAX_IDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many analyses. A batch may contain at most {settings.ANALYSIS_BATCH_MAX_IDS}."
+            )
+
+        logger.info(f"Fetching {len(ids)} analyses for user {request.user_id}")
+
+        # One IN query; restaurants and results are many-to-one, so they
+        # come back joined on the same rows
+        from sqlalchemy.orm import joinedload
+        query = select(AnalysisReport).options(
+            joinedload(AnalysisReport.restaurant),
+            joinedload(AnalysisReport.result)
+        ).where(
+            AnalysisReport.id.in_(ids),
+            AnalysisReport.user_id == request.user_id
+        )
+        result = await db.execute(query)
+        reports = {report.id: report for report in result.scalars().all() if report.result}
+
+        return AnalysisBatchResponse(
+            items=[build_analysis_schema(reports[i]) for i in ids if i in reports],
+            missing=[i for i in ids if i not in reports]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching analyses batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching analyses: {str(e)}")
+
+
 @router.get("/analyses/{analysis_id}", response_model=AnalysisResultSchema)
 async def get_analysis(
     analysis_id: int,
     user_id: str,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get a single analysis report by ID.
+    Responses carry a strong ETag (report id + result version); repeat views
+    are answered from the response cache, or with 304, without the database.
     """
     try:
+        cache = DashboardCache(RedisClient.get_client())
+        cache_params = {"id": analysis_id}
+        cached, cache_version = await cache.get(user_id, "analysis", cache_params)
+        if cached is not None:
+            return conditional_response(if_none_match, cached["etag"], cached["body"])
+
         logger.info(f"Fetching analysis {analysis_id} for user {user_id}")
         
         from sqlalchemy.orm import joinedload
-        query = select(AnalysisReport).options(joinedload(AnalysisReport.restaurant)).where(
+        query = select(AnalysisReport).options(
+            joinedload(AnalysisReport.restaurant),
+            joinedload(AnalysisReport.result)
+        ).where(
             AnalysisReport.id == analysis_id,
             AnalysisReport.user_id == user_id
         )
@@ -206,7 +437,7 @@ async def get_analysis(
         result = await db.execute(query)
         report = result.scalars().first()
         
-        if not report:
+        if not report or not report.result:
             logger.warning(f"Analysis {analysis_id} not found for user {user_id}")
             # Check if it exists for ANY user to debug mismatch
             check_query = select(AnalysisReport.user_id).where(AnalysisReport.id == analysis_id)
@@ -217,20 +448,11 @@ async def get_analysis(
             
             raise HTTPException(status_code=404, detail="Analysis not found")
             
-        return AnalysisResultSchema(
-            id=report.id,
-            sentiment_score=report.sentiment_score,
-            summary=report.summary,
-            complaints=report.complaints or [],
-            praises=report.praises or [],
-            recommended_actions=report.recommended_actions or [],
-            reviews_analyzed=report.reviews_analyzed,
-            restaurant_name=report.restaurant.name if report.restaurant else "Unknown Restaurant",
-            restaurant_rating=report.restaurant.rating if report.restaurant else None,
-            google_maps_url=report.restaurant.google_maps_url if report.restaurant else None,
-            created_at=report.created_at,
-            status="COMPLETED"
-        )
+        response = build_analysis_schema(report)
+        etag = make_etag("analysis", user_id, report.id, report.result_id, report.result.prompt_version)
+        body = response.model_dump(mode="json")
+        await cache.set(user_id, "analysis", cache_params, {"etag": etag, "body": body}, cache_version)
+        return conditional_response(if_none_match, etag, body)
         
     except HTTPException:
         raise
@@ -242,13 +464,39 @@ async def get_analysis_reviews(
     analysis_id: int,
     user_id: str,
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get raw scraped reviews for a specific analysis.
+    Get the scraped reviews behind a specific analysis, newest first.
+    Only reviews already stored when the report was created are listed, but
+    rescrapes can still rewrite their text, so the ETag covers the content.
+    Pass the returned `next_cursor` as `cursor` for constant-cost paging;
+    `skip` is kept for clients that jump to page numbers.
     """
     try:
+        redis_client = RedisClient.get_client()
+        cache = DashboardCache(redis_client)
+        cache_params = {"id": analysis_id, "skip": skip, "limit": limit, "cursor": cursor, "include_total": include_total}
+        cached, cache_version = await cache.get(user_id, "analysis_reviews", cache_params)
+        # Rescrapes rewrite review text and re-keying moves reviews: only
+        # serve the entry while the place's reviews are unchanged since
+        if cached is not None and "place_key" in cached and (
+            cached["reviews_version"] == await reviews_version(redis_client, cached["place_key"])
+        ):
+            return conditional_response(if_none_match, cached["etag"], cached["body"])
+
+        after = None
+        if cursor:
+            try:
+                published, last_id = decode_cursor(cursor, 2)
+                after = (parse_cursor_datetime(published), int(last_id))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
         # 1. Get Analysis Report and Restaurant URL
         from sqlalchemy.orm import joinedload
         query = select(AnalysisReport).options(joinedload(AnalysisReport.restaurant)).where(
@@ -261,79 +509,34 @@ async def get_analysis_reviews(
         if not report or not report.restaurant:
             raise HTTPException(status_code=404, detail="Analysis not found")
             
-        restaurant_url = report.restaurant.google_maps_url
+        # Restaurants stored before canonical keys used the query as their key
+        place_key = report.restaurant.place_key or report.restaurant.google_maps_url
         restaurant_name = report.restaurant.name
+        # Read before the page, so a write landing in between retires this entry
+        version = await reviews_version(redis_client, place_key)
         
-        # 2. Query Postgres for latest raw reviews
-        from app.models.review import RawReview
-        
-        stmt = select(RawReview).where(RawReview.query == restaurant_url)
-        result = await db.execute(stmt)
-        doc = result.scalar_one_or_none()
-        
-        reviews_data = []
-        if doc and doc.reviews:
-            for r in doc.reviews:
-                # Map raw review dict to schema
-                # Raw review structure depends on scraper but usually has text, rating, date
-                reviews_data.append(ReviewItem(
-                    text=r.get("text"),
-                    rating=r.get("rating"),
-                    author=r.get("author"),
-                    date=r.get("date_text"),
-                    profile_picture=r.get("profile_picture"),
-                    source="Google Maps"
-                ))
+        # 2. Query the normalized reviews table for just the requested page
+        from app.repositories.review_repository import ReviewRepository
+        repo = ReviewRepository(db)
         
-        # Helper to parse date for sorting
-        def parse_review_date(r: ReviewItem):
-            if not r.date or r.date == "Unknown Date":
-                return datetime.min 
-            try:
-                # Handle YYYY-M-D or YYYY-MM-DD
-                if "-" in r.date and "T" not in r.date: # Simple date format
-                     try:
-                        return datetime.strptime(r.date, "%Y-%m-%d")
-                     except ValueError:
-                        pass
-                
-                # Handle relative dates (e.g., "2 days ago", "a week ago")
-                date_str = r.date.lower()
-                now = datetime.now()
-                
-                if "ago" in date_str:
-                    try:
-                        val = int(''.join(filter(str.isdigit, date_str)) or 1) # Extract number, default 1 for "a week ago"
-                    except:
-                        val = 1
-                        
-                    if "minute" in date_str or "hour" in date_str:
-                        return now # Treat as very recent
-                    elif "day" in date_str:
-                        return now - timedelta(days=val)
-                    elif "week" in date_str:
-                        return now - timedelta(weeks=val)
-                    elif "month" in date_str:
-                        return now - timedelta(days=val*30)
-                    elif "year" in date_str:
-                        return now - timedelta(days=val*365)
-                        
-                return datetime.min
-            except Exception:
-                return datetime.min
-
-        # Sort descending (newest first)
-        reviews_data.sort(key=parse_review_date, reverse=True)
+        total = await repo.count_for_place(place_key, as_of=report.created_at) if include_total else None
+        rows = await repo.list_page(place_key, limit, after=after, offset=skip, as_of=report.created_at)
         
-        # Paginate
-        total = len(reviews_data)
-        paginated_reviews = reviews_data[skip : skip + limit]
-
-        return ReviewListResponse(
-            restaurant_name=restaurant_name,
-            total_reviews=total,
-            reviews=paginated_reviews
+        next_cursor = encode_cursor([rows[-1].published_at, rows[-1].id]) if len(rows) == limit else None
+
+        body = {
+            "restaurant_name": restaurant_name,
+            "total_reviews": total,
+            "reviews": [review_item_dict(r) for r in rows],
+            "next_cursor": next_cursor,
+        }
+        # Over the content itself: the same report can list changed reviews
+        etag = make_etag("analysis_reviews", user_id, report.id, body)
+        await cache.set(
+            user_id, "analysis_reviews", cache_params,
+            {"etag": etag, "body": body, "place_key": place_key, "reviews_version": version}, cache_version
         )
+        return conditional_response(if_none_match, etag, body)
         
     except HTTPException:
         raise
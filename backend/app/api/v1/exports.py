@@ -0,0 +1,97 @@
+"""
+Bulk export API endpoints.
+
+Exports stream NDJSON or CSV straight from a server-side cursor, so a whole
+account's history comes back in one request at constant memory instead of
+thousands of paginated calls.
+"""
+from datetime import datetime
+from typing import AsyncIterator, Callable, Optional, Sequence
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.database import get_db, async_session_maker
+from app.models.restaurant import AnalysisReport, Restaurant
+from app.repositories.export_repository import ExportRepository, ANALYSIS_COLUMNS, REVIEW_COLUMNS
+from app.services.export import ExportFormat, MEDIA_TYPES, encode_rows
+import logging
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+logger = logging.getLogger(__name__)
+
+
+def _export_response(
+    open_stream: Callable[[ExportRepository], AsyncIterator],
+    columns: Sequence[str],
+    export_format: ExportFormat,
+    filename: str
+) -> StreamingResponse:
+    async def body():
+        # The request's get_db session is closed before the body is sent,
+        # so the cursor gets a session that lives as long as the stream
+        async with async_session_maker() as session:
+            rows = open_stream(ExportRepository(session))
+            async for chunk in encode_rows(rows, columns, export_format):
+                yield chunk
+        logger.info(f"Finished export {filename}")
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'}
+    )
+
+
+@router.get("/analyses")
+async def export_analyses(
+    user_id: str,
+    format: ExportFormat = ExportFormat.NDJSON,
+    since: Optional[datetime] = None
+):
+    """
+    Every analysis of a user with its findings, newest first.
+    `since` limits the export to reports created at or after that time.
+    """
+    logger.info(f"Exporting analyses for user {user_id} as {format.value}")
+    return _export_response(
+        lambda repo: repo.stream_analyses(user_id, since),
+        ANALYSIS_COLUMNS,
+        format,
+        "analyses"
+    )
+
+
+@router.get("/analyses/{analysis_id}/reviews")
+async def export_analysis_reviews(
+    analysis_id: int,
+    user_id: str,
+    format: ExportFormat = ExportFormat.NDJSON,
+    db: AsyncSession = Depends(get_db)
+):
+    """The reviews behind an analysis (stored by the time it was created), newest first."""
+    try:
+        result = await db.execute(
+            select(Restaurant.place_key, Restaurant.google_maps_url, AnalysisReport.created_at)
+            .join(AnalysisReport, AnalysisReport.restaurant_id == Restaurant.id)
+            .where(AnalysisReport.id == analysis_id, AnalysisReport.user_id == user_id)
+        )
+        restaurant = result.first()
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+
+        # Restaurants stored before canonical keys used the query as their key
+        place_key = restaurant.place_key or restaurant.google_maps_url
+        logger.info(f"Exporting reviews of analysis {analysis_id} for user {user_id} as {format.value}")
+        return _export_response(
+            lambda repo: repo.stream_reviews(place_key, restaurant.created_at),
+            REVIEW_COLUMNS,
+            format,
+            f"analysis-{analysis_id}-reviews"
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting reviews for analysis {analysis_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error exporting reviews: {str(e)}")
@@ -2,10 +2,20 @@
 Place search API endpoints.
 """
 from fastapi import APIRouter, HTTPException
-from app.schemas.places import PlaceSearchRequest, PlaceSearchResponse, PlaceInfo, AnalyzeByPlaceRequest
+from app.schemas.places import (
+    PlaceSearchRequest, PlaceSearchResponse, PlaceInfo, AnalyzeByPlaceRequest,
+    BulkAnalyzeRequest, BulkAnalyzeResponse, BatchItemStatus, BatchStatusResponse
+)
 from app.schemas.analysis import AnalyzeResponse
 from app.services.place_search import PlaceSearchService
-from app.worker.tasks import analyze_restaurant_task
+from app.services.place_identity import normalize_place_alias
+from app.worker.scheduling import TaskLane, enqueue_analysis, enqueue_analysis_batch, batch_key
+from app.exceptions.analysis import TaskQuotaExceededException, QueueOverloadedException
+from app.api.v1.responses import build_analyze_response, overloaded_http_exception
+from app.core.config import settings
+from app.core.database import RedisClient
+import asyncio
+import json
 import logging
 
 router = APIRouter(prefix="/places", tags=["places"])
@@ -47,17 +57,129 @@ async def analyze_place(request: AnalyzeByPlaceRequest):
         logger.info(f"Analyze place request: {request.place_name}")
         
         # Use the place URL as the query - Gosom accepts URLs directly
-        task = analyze_restaurant_task.delay(
+        queued = await enqueue_analysis(
             request.place_url,  # Pass URL instead of search query
-            request.user_id
+            request.user_id,
+            TaskLane.INTERACTIVE
         )
         
-        return AnalyzeResponse(
-            task_id=task.id,
-            status="PENDING",
-            message=f"Analysis queued for {request.place_name}. Use task_id to check status."
+        return build_analyze_response(
+            queued,
+            f"Analysis queued for {request.place_name}. Use task_id to check status."
         )
         
+    except TaskQuotaExceededException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except QueueOverloadedException as e:
+        raise overloaded_http_exception(e)
     except Exception as e:
         logger.error(f"Analyze place error: {e}")
         raise HTTPException(status_code=500, detail=f"Error queuing task: {str(e)}")
+
+
+@router.post("/analyze/bulk", response_model=BulkAnalyzeResponse)
+async def analyze_places_bulk(request: BulkAnalyzeRequest):
+    """
+    Analyze many places (e.g. every branch of a chain) in one request.
+    Returns a single batch_id for aggregate progress instead of one task_id per place.
+    """
+    try:
+        if len(request.places) > settings.BULK_ANALYZE_MAX_PLACES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many places. A batch may contain at most {settings.BULK_ANALYZE_MAX_PLACES}."
+            )
+
+        # Drop duplicate URLs (by canonical alias) so a chain list with repeats is scraped once per branch
+        places = list({normalize_place_alias(p.place_url): p for p in request.places if p.place_url.strip()}.values())
+        logger.info(f"Bulk analyze request: {len(places)} places from user {request.user_id}")
+
+        redis_client = RedisClient.get_client()
+        if not redis_client:
+            raise HTTPException(status_code=503, detail="Batch tracking is unavailable")
+
+        group_result = await enqueue_analysis_batch(
+            [p.place_url.strip() for p in places],
+            request.user_id,
+            TaskLane.BULK,
+            place_names=[p.place_name for p in places]
+        )
+
+        return BulkAnalyzeResponse(
+            batch_id=group_result.id,
+            total=len(places),
+            status="PENDING",
+            message=f"Queued {len(places)} analyses. Use batch_id to check progress."
+        )
+
+    except HTTPException:
+        raise
+    except TaskQuotaExceededException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except Exception as e:
+        logger.error(f"Bulk analyze error: {e}")
+        raise HTTPException(status_code=500, detail=f"Error queuing batch: {str(e)}")
+
+
+@router.get("/batches/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(batch_id: str, user_id: str = None, include_results: bool = True):
+    """
+    Aggregate progress and partial results of a bulk analysis.
+    """
+    try:
+        redis_client = RedisClient.get_client()
+        raw_batch = await redis_client.get(batch_key(batch_id)) if redis_client else None
+        if not raw_batch:
+            raise HTTPException(status_code=404, detail="Batch not found or expired")
+
+        batch = json.loads(raw_batch)
+        if batch.get("user_id") != user_id:
+            raise HTTPException(status_code=404, detail="Batch not found or expired")
+
+        # One MGET against the result backend instead of an AsyncResult round-trip per task.
+        # The backend client is synchronous, so it runs off the event loop
+        from app.worker.celery_app import celery_app
+        backend = celery_app.backend
+        task_ids = [item["task_id"] for item in batch["items"]]
+        keys = [backend.get_key_for_task(tid) for tid in task_ids]
+        raw_metas = await asyncio.to_thread(backend.mget, keys) if keys else []
+
+        items = []
+        completed = failed = 0
+        for item, raw_meta in zip(batch["items"], raw_metas):
+            meta = backend.decode_result(raw_meta) if raw_meta else {"status": "PENDING"}
+            status = meta.get("status", "PENDING")
+            entry = BatchItemStatus(status=status, **item)
+
+            if status == "SUCCESS":
+                completed += 1
+                if include_results:
+                    entry.result = meta.get("result")
+            elif status in ("FAILURE", "REVOKED"):
+                failed += 1
+                entry.error = str(meta.get("result"))
+            items.append(entry)
+
+        total = len(items)
+        pending = total - completed - failed
+        if pending:
+            status = "PROGRESS" if completed or failed else "PENDING"
+        else:
+            status = "COMPLETED" if not failed else "PARTIAL"
+
+        return BatchStatusResponse(
+            batch_id=batch_id,
+            status=status,
+            total=total,
+            completed=completed,
+            failed=failed,
+            pending=pending,
+            progress=round((completed + failed) / total, 3) if total else 1.0,
+            items=items
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch status error: {e}")
+        raise HTTPException(status_code=500, detail=f"Error getting batch status: {str(e)}")
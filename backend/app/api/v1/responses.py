@@ -0,0 +1,32 @@
+"""
+Response helpers shared by the analysis routers (endpoints, places).
+"""
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+
+from app.exceptions.analysis import QueueOverloadedException
+from app.schemas.analysis import AnalyzeResponse
+from app.worker.scheduling import QueuedAnalysis
+
+
+def build_analyze_response(queued: QueuedAnalysis, message: str) -> AnalyzeResponse:
+    """AnalyzeResponse with the queue estimate filled in when one is available."""
+    response = AnalyzeResponse(
+        task_id=queued.task_id,
+        status="DEFERRED" if queued.deferred else "PENDING",
+        message=message
+    )
+    if queued.estimate:
+        response.queue_position = queued.estimate.queue_depth
+        response.estimated_wait_seconds = queued.estimate.wait_seconds
+        response.estimated_completion_at = datetime.utcnow() + timedelta(seconds=queued.estimate.completion_seconds)
+    return response
+
+
+def overloaded_http_exception(e: QueueOverloadedException) -> HTTPException:
+    return HTTPException(
+        status_code=e.status_code,
+        detail=e.message,
+        headers={"Retry-After": str(e.retry_after_seconds)}
+    )
@@ -0,0 +1,86 @@
+"""
+Full-text search API endpoints.
+"""
+from enum import Enum
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.search import SearchResponse, FindingHit, ReviewHit
+from app.repositories.search_repository import SearchRepository
+from app.core.database import get_db
+import logging
+
+router = APIRouter(prefix="/search", tags=["search"])
+logger = logging.getLogger(__name__)
+
+HIGHLIGHT_MARK = "<mark>"
+
+
+class SearchScope(str, Enum):
+    FINDINGS = "findings"
+    REVIEWS = "reviews"
+    ALL = "all"
+
+
+def _matched(items) -> list:
+    """Keep only the findings ts_headline highlighted."""
+    return [item for item in (items or []) if HIGHLIGHT_MARK in item]
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    user_id: str,
+    q: str = Query(..., min_length=2, max_length=200),
+    scope: SearchScope = SearchScope.ALL,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search the user's report findings and the reviews of restaurants they
+    analyzed, e.g. `q="cold food"`. Supports web-search syntax (quotes,
+    OR, -term). Results are ranked; `limit`/`offset` page each list.
+    """
+    try:
+        repo = SearchRepository(db)
+        response = SearchResponse(query=q, scope=scope.value, limit=limit, offset=offset)
+
+        if scope in (SearchScope.FINDINGS, SearchScope.ALL):
+            rows = await repo.search_findings(user_id, q, limit, offset)
+            response.findings = [
+                FindingHit(
+                    analysis_id=row.id,
+                    restaurant_name=row.restaurant_name or "Unknown Restaurant",
+                    google_maps_url=row.google_maps_url,
+                    sentiment_score=row.sentiment_score,
+                    created_at=row.created_at,
+                    rank=row.rank,
+                    matched_complaints=_matched(row.complaints),
+                    matched_praises=_matched(row.praises),
+                    summary_headline=row.summary if HIGHLIGHT_MARK in (row.summary or "") else None
+                )
+                for row in rows
+            ]
+
+        if scope in (SearchScope.REVIEWS, SearchScope.ALL):
+            rows = await repo.search_reviews(user_id, q, limit, offset)
+            response.reviews = [
+                ReviewHit(
+                    review_id=row.id,
+                    restaurant_name=row.restaurant_name,
+                    google_maps_url=row.google_maps_url,
+                    author=row.author,
+                    rating=row.rating,
+                    date=row.date_text,
+                    rank=row.rank,
+                    headline=row.headline
+                )
+                for row in rows
+            ]
+
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching for '{q}': {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
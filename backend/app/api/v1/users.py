@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.api.deps import get_current_user
-from app.core.database import get_db
+from app.core.database import get_db, RedisClient
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
+from app.services.user_cache import invalidate_user
 
 router = APIRouter()
 
@@ -26,14 +27,19 @@ async def update_user_me(
     """
     Update own user.
     """
+    # current_user may come from the user cache, detached from this session
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
     if user_in.first_name is not None:
-        current_user.first_name = user_in.first_name
+        user.first_name = user_in.first_name
     if user_in.last_name is not None:
-        current_user.last_name = user_in.last_name
+        user.last_name = user_in.last_name
     if user_in.profile_picture is not None:
-        current_user.profile_picture = user_in.profile_picture
+        user.profile_picture = user_in.profile_picture
     
-    db.add(current_user)
+    db.add(user)
     await db.commit()
-    await db.refresh(current_user)
-    return current_user
+    await db.refresh(user)
+    await invalidate_user(RedisClient.get_client(), user.email)
+    return user
@@ -0,0 +1,190 @@
+"""
+Webhook endpoint management.
+
+Users register URLs that receive signed `analysis.completed` /
+`analysis.failed` event batches instead of polling /status/{task_id}.
+"""
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.user import User
+from app.models.webhook import WebhookEndpoint, WebhookDelivery
+from app.schemas.webhook import (
+    WebhookEndpointCreate, WebhookEndpointUpdate, WebhookEndpointCreated,
+    WebhookEndpoint as WebhookEndpointSchema, WebhookDelivery as WebhookDeliverySchema, WebhookDeliveryList
+)
+from app.services.webhooks import UnsafeWebhookURL, generate_secret, build_event, resolve_webhook_url
+import logging
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+logger = logging.getLogger(__name__)
+
+EVENT_TEST = "webhook.test"
+
+
+async def _get_endpoint(db: AsyncSession, endpoint_id: int, user: User) -> WebhookEndpoint:
+    result = await db.execute(
+        select(WebhookEndpoint).where(WebhookEndpoint.id == endpoint_id, WebhookEndpoint.user_id == str(user.id))
+    )
+    endpoint = result.scalar_one_or_none()
+    if not endpoint:
+        raise HTTPException(status_code=404, detail="Webhook endpoint not found")
+    return endpoint
+
+
+async def _check_url(url: str) -> str:
+    """Only https URLs whose host resolves to public addresses (no SSRF into our network)."""
+    try:
+        await resolve_webhook_url(url)
+    except UnsafeWebhookURL as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return url
+
+
+def _kick_delivery():
+    """Deliver now instead of waiting for the next beat sweep."""
+    from app.worker.tasks import deliver_webhooks_task
+    try:
+        deliver_webhooks_task.delay()
+    except Exception as e:
+        logger.warning(f"Could not trigger webhook delivery: {e}")
+
+
+@router.get("", response_model=List[WebhookEndpointSchema])
+async def list_webhooks(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        select(WebhookEndpoint).where(WebhookEndpoint.user_id == str(current_user.id)).order_by(WebhookEndpoint.id)
+    )
+    return result.scalars().all()
+
+
+@router.post("", response_model=WebhookEndpointCreated, status_code=201)
+async def create_webhook(
+    endpoint_in: WebhookEndpointCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Register a URL. The response contains the signing secret, which is not
+    shown again; use it to verify the `X-Webhook-Signature` header.
+    """
+    url = await _check_url(str(endpoint_in.url))
+    count = await db.execute(
+        select(func.count()).select_from(WebhookEndpoint).where(WebhookEndpoint.user_id == str(current_user.id))
+    )
+    if count.scalar() >= settings.WEBHOOK_MAX_ENDPOINTS_PER_USER:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.WEBHOOK_MAX_ENDPOINTS_PER_USER} webhook endpoints per user"
+        )
+
+    endpoint = WebhookEndpoint(
+        user_id=str(current_user.id),
+        url=url,
+        description=endpoint_in.description,
+        secret=generate_secret(),
+        is_active=True,
+        consecutive_failures=0,
+    )
+    db.add(endpoint)
+    await db.commit()
+    await db.refresh(endpoint)
+    return endpoint
+
+
+@router.patch("/{endpoint_id}", response_model=WebhookEndpointSchema)
+async def update_webhook(
+    endpoint_id: int,
+    endpoint_in: WebhookEndpointUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    endpoint = await _get_endpoint(db, endpoint_id, current_user)
+    if endpoint_in.url is not None:
+        endpoint.url = await _check_url(str(endpoint_in.url))
+    if endpoint_in.description is not None:
+        endpoint.description = endpoint_in.description
+    if endpoint_in.is_active is not None:
+        endpoint.is_active = endpoint_in.is_active
+        if endpoint_in.is_active:
+            endpoint.consecutive_failures = 0
+    await db.commit()
+    await db.refresh(endpoint)
+    return endpoint
+
+
+@router.post("/{endpoint_id}/rotate-secret", response_model=WebhookEndpointCreated)
+async def rotate_webhook_secret(
+    endpoint_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Replace the signing secret. Pending retries are signed with the new one."""
+    endpoint = await _get_endpoint(db, endpoint_id, current_user)
+    endpoint.secret = generate_secret()
+    await db.commit()
+    await db.refresh(endpoint)
+    return endpoint
+
+
+@router.delete("/{endpoint_id}", status_code=204)
+async def delete_webhook(
+    endpoint_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Remove the endpoint and its outbox rows."""
+    endpoint = await _get_endpoint(db, endpoint_id, current_user)
+    await db.delete(endpoint)
+    await db.commit()
+
+
+@router.get("/{endpoint_id}/deliveries", response_model=WebhookDeliveryList)
+async def list_webhook_deliveries(
+    endpoint_id: int,
+    status: Optional[str] = Query(None, pattern="^(pending|delivered|failed)$"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Most recent deliveries first, for debugging a receiver."""
+    await _get_endpoint(db, endpoint_id, current_user)
+    query = select(WebhookDelivery).where(WebhookDelivery.endpoint_id == endpoint_id)
+    if status:
+        query = query.where(WebhookDelivery.status == status)
+    result = await db.execute(query.order_by(WebhookDelivery.id.desc()).limit(limit))
+    return WebhookDeliveryList(
+        items=[WebhookDeliverySchema.model_validate(d) for d in result.scalars().all()]
+    )
+
+
+@router.post("/{endpoint_id}/test", response_model=WebhookDeliverySchema, status_code=202)
+async def send_test_webhook(
+    endpoint_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Queue a `webhook.test` event to this endpoint only."""
+    endpoint = await _get_endpoint(db, endpoint_id, current_user)
+    event = build_event(EVENT_TEST, {"endpoint_id": endpoint.id})
+    delivery = WebhookDelivery(
+        endpoint_id=endpoint.id,
+        event_id=event["id"],
+        event_type=EVENT_TEST,
+        payload=event,
+        status="pending",
+        attempts=0,
+    )
+    db.add(delivery)
+    await db.commit()
+    await db.refresh(delivery)
+    _kick_delivery()
+    return delivery
@@ -0,0 +1,72 @@
+"""
+Copy reviews stored in legacy raw_reviews.reviews blobs into the reviews table.
+
+Scrapes made before the reviews table kept every review of a place in one
+JSON blob, which nothing reads any more. Each blob is upserted under its
+place key with the same signature dedupe the worker uses, then emptied so
+the next run skips it. Run after upgrade_places, which moves raw_reviews
+onto canonical place keys. Safe to run more than once.
+
+Usage:
+    python -m app.cli.backfill_reviews
+"""
+import asyncio
+import logging
+
+from sqlalchemy import select, func, case
+
+from app.core.database import async_session_maker, engine, Base, create_redis_client
+from app.models.review import RawReview, Review  # noqa: F401 - register table
+from app.repositories.review_repository import ReviewRepository
+from app.services.dashboard_cache import invalidate_reviews
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def backfill() -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    copied = 0
+    places = set()
+    async with async_session_maker() as session:
+        # Ids only: blobs are loaded one at a time
+        result = await session.execute(
+            select(RawReview.id).where(
+                case(
+                    (func.json_typeof(RawReview.reviews) == "array", func.json_array_length(RawReview.reviews)),
+                    else_=0,
+                ) > 0
+            ).order_by(RawReview.id)
+        )
+        ids = result.scalars().all()
+
+        repo = ReviewRepository(session)
+        for raw_id in ids:
+            raw = await session.get(RawReview, raw_id)
+            reviews = [r for r in raw.reviews or [] if isinstance(r, dict)]
+            copied += await repo.upsert_many(raw.query, reviews, raw.scraped_at)
+            places.add(raw.query)
+            raw.reviews = []
+            await session.commit()
+            logger.info(f"Copied {len(reviews)} reviews of {raw.query}")
+            session.expunge_all()
+    await engine.dispose()
+
+    # Existing reviews may have picked up longer texts
+    redis_client = create_redis_client()
+    try:
+        await invalidate_reviews(redis_client, places)
+    finally:
+        await redis_client.close()
+    return copied
+
+
+def main():
+    copied = asyncio.run(backfill())
+    logger.info(f"Copied {copied} legacy reviews into the reviews table")
+
+
+if __name__ == "__main__":
+    main()
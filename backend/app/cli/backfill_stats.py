@@ -0,0 +1,56 @@
+"""
+Rebuild the user_daily_stats rollup from analysis_reports, then retire the
+cached dashboards of the rebuilt users.
+
+Usage:
+    python -m app.cli.backfill_stats [--user-id USER_ID]
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.core.database import async_session_maker, engine, Base, create_redis_client
+from app.models.stats import UserDailyStats
+from app.repositories.stats_repository import StatsRepository
+from app.services.dashboard_cache import invalidate_dashboard
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def backfill(user_id: str = None) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    users = select(UserDailyStats.user_id).distinct()
+    async with async_session_maker() as session:
+        # Users in the rollup before or after the rebuild may have changed
+        user_ids = {user_id} if user_id else set((await session.execute(users)).scalars().all())
+        rows = await StatsRepository(session).rebuild(user_id)
+        await session.commit()
+        if not user_id:
+            user_ids.update((await session.execute(users)).scalars().all())
+    await engine.dispose()
+
+    redis_client = create_redis_client()
+    try:
+        for affected_user in user_ids:
+            await invalidate_dashboard(redis_client, affected_user)
+    finally:
+        await redis_client.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild dashboard stats rollups")
+    parser.add_argument("--user-id", help="Only rebuild this user's rollup")
+    args = parser.parse_args()
+
+    rows = asyncio.run(backfill(args.user_id))
+    logger.info(f"Rebuilt {rows} daily rollup rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Import a historical review dump (raw_res.json export or NDJSON) without scraping.
+
+Reviews are streamed into Postgres in COPY batches and deduplicated with the
+scraper's signature rules; throughput is reported as rows per second. With
+--analyze every imported place is queued for a stored-only analysis in the
+bulk lane.
+
+Usage:
+    python -m app.cli.import_reviews FILE [--user-id USER] [--analyze] [--batch-size 5000]
+"""
+import argparse
+import asyncio
+import logging
+
+from app.core.database import async_session_maker, engine, create_redis_client
+from app.services.review_importer import ReviewImporter, queue_imported_analyses
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def import_reviews(path: str, user_id: str = None, analyze: bool = False, batch_size: int = None):
+    redis_client = create_redis_client()
+    try:
+        async with async_session_maker() as session:
+            importer = ReviewImporter(session, redis_client, batch_size)
+            stats = await importer.import_file(path)
+
+        logger.info(
+            f"Imported {stats['rows_written']} rows for {stats['places']} places in {stats['seconds']}s "
+            f"({stats['rows_per_second']} rows/s); {stats['duplicates']} duplicates, {stats['skipped']} skipped"
+        )
+
+        if analyze:
+            summary = await queue_imported_analyses(importer, user_id, redis_client)
+            logger.info(f"Queued {summary['queued']} analyses in batches {summary['batch_ids']}")
+            if summary["not_queued"]:
+                logger.warning(f"{summary['not_queued']} places not queued (in-flight cap reached)")
+    finally:
+        await redis_client.close()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a historical review dump")
+    parser.add_argument("path", help="raw_res.json-style document or NDJSON file")
+    parser.add_argument("--user-id", help="Owner of the analyses queued with --analyze")
+    parser.add_argument("--analyze", action="store_true", help="Queue an analysis of every imported place")
+    parser.add_argument("--batch-size", type=int, help="Rows per COPY batch (default IMPORT_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    asyncio.run(import_reviews(args.path, args.user_id, args.analyze, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
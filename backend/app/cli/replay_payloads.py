@@ -0,0 +1,110 @@
+"""
+Feed archived Gosom downloads back through the scraper's parser, offline.
+
+Without --store this is a dry run / benchmark: every payload is
+decompressed, parsed and reduced to a scrape result, and throughput is
+reported. With --store the reviews are re-ingested (e.g. after a parser
+fix) under the place key the payload was linked to, or, for downloads
+whose scrape never got that far, the key derived from the parsed place.
+Reviews already stored get the re-parsed author, rating and dates.
+Place search downloads are archived too but not replayed.
+
+Usage:
+    python -m app.cli.replay_payloads [--place-key KEY] [--hash SHA256] [--limit N] [--store]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import timezone
+
+from sqlalchemy import select
+
+from app.core.database import async_session_maker, engine, create_redis_client
+from app.models.review import ScrapePayload
+from app.repositories.review_repository import ReviewRepository
+from app.services.dashboard_cache import invalidate_reviews
+from app.services.payload_archive import PAYLOAD_KIND_REVIEWS, PayloadArchive
+from app.services.place_identity import canonical_place_key
+from app.services.scraper import parse_gosom_download, build_scrape_result
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def replay(place_key: str = None, content_hash: str = None, limit: int = None, store: bool = False, max_reviews: int = 100):
+    archive = PayloadArchive()
+    stats = {"payloads": 0, "missing": 0, "bytes": 0, "reviews": 0, "stored": 0}
+    stored_places = set()
+
+    async with async_session_maker() as session:
+        query = select(ScrapePayload).where(ScrapePayload.kind == PAYLOAD_KIND_REVIEWS).order_by(ScrapePayload.fetched_at)
+        if place_key:
+            query = query.where(ScrapePayload.place_key == place_key)
+        if content_hash:
+            query = query.where(ScrapePayload.content_hash == content_hash)
+        if limit:
+            query = query.limit(limit)
+        links = (await session.execute(query)).scalars().all()
+
+        started = time.perf_counter()
+        parse_seconds = 0.0
+        for link in links:
+            try:
+                body = archive.load(link.content_hash)
+            except FileNotFoundError:
+                logger.warning(f"Payload {link.content_hash} is missing from the archive")
+                stats["missing"] += 1
+                continue
+
+            parse_started = time.perf_counter()
+            fetched_at = link.fetched_at.astimezone(timezone.utc).replace(tzinfo=None)
+            result = build_scrape_result(parse_gosom_download(body), max_reviews, fetched_at)
+            parse_seconds += time.perf_counter() - parse_started
+
+            stats["payloads"] += 1
+            stats["bytes"] += len(body)
+            stats["reviews"] += len(result["reviews"])
+
+            if store and result["reviews"]:
+                link_place = link.place_key or canonical_place_key(
+                    result["restaurant_info"].get("place_id") or None, link.query
+                )
+                stats["stored"] += await ReviewRepository(session).upsert_many(
+                    link_place, result["reviews"], link.fetched_at, reparse=True
+                )
+                stored_places.add(link_place)
+
+        if store:
+            await session.commit()
+    await engine.dispose()
+
+    if stored_places:
+        # Cached review pages of these places may list the old parse
+        redis_client = create_redis_client()
+        try:
+            await invalidate_reviews(redis_client, stored_places)
+        finally:
+            await redis_client.close()
+
+    elapsed = time.perf_counter() - started if links else 0.0
+    stats["seconds"] = round(elapsed, 3)
+    stats["parse_mb_per_second"] = round(stats["bytes"] / 1e6 / parse_seconds, 2) if parse_seconds else None
+    stats["payloads_per_second"] = round(stats["payloads"] / elapsed, 2) if elapsed else None
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay archived Gosom payloads through the parser")
+    parser.add_argument("--place-key", help="Only payloads linked to this canonical place")
+    parser.add_argument("--hash", dest="content_hash", help="Only this payload")
+    parser.add_argument("--limit", type=int, help="Replay at most N payloads")
+    parser.add_argument("--store", action="store_true", help="Re-ingest the parsed reviews")
+    args = parser.parse_args()
+
+    stats = asyncio.run(replay(args.place_key, args.content_hash, args.limit, args.store))
+    logger.info(f"Replay finished: {stats}")
+
+
+if __name__ == "__main__":
+    main()
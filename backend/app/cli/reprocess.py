@@ -0,0 +1,172 @@
+"""
+Re-run AI analysis over stored reviews after a prompt or scoring change.
+
+Pages through every place's latest scrape in Postgres, analyzes the
+review sets that have no result for the current PROMPT_VERSION under a
+global concurrency limit and the shared Gemini hourly budget, and writes
+the new result versions with one bulk upsert per chunk. Existing reports
+keep the result their users saw; new analyses of the same review set reuse
+the new version. With --repoint, reports on the same review set are moved
+to it as well (rescoring history). Progress is checkpointed in Redis, so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python -m app.cli.reprocess [--chunk-size 50] [--concurrency 4] [--limit N] [--restart] [--repoint]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session_maker, engine, create_redis_client
+from app.models.review import RawReview, Review
+from app.repositories.restaurant_repository import AnalysisResultRepository
+from app.repositories.stats_repository import StatsRepository
+from app.services.ai_analyzer import GeminiAnalyzer, PROMPT_VERSION
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.rate_limit import HourlyBudget
+from app.services.scraper import review_set_hash
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY = f"reprocess:v{PROMPT_VERSION}:last_raw_id"
+BUDGET_POLL_SECONDS = 60
+MAX_REVIEWS = 100  # Same window the worker analyzes
+
+
+async def _load_reviews(session, raws: List[RawReview]) -> Dict[str, List[Dict]]:
+    """Reviews of each place's latest scrape, for a whole chunk in one query."""
+    scraped_at = {raw.query: raw.scraped_at for raw in raws}
+    result = await session.execute(
+        select(Review)
+        .where(Review.place_key.in_(list(scraped_at)))
+        .order_by(Review.place_key, Review.published_at.desc().nullslast(), Review.id.desc())
+    )
+    reviews = defaultdict(list)
+    for r in result.scalars().all():
+        if r.last_seen_at < scraped_at[r.place_key] or len(reviews[r.place_key]) >= MAX_REVIEWS:
+            continue
+        reviews[r.place_key].append({
+            'text': r.text or '',
+            'rating': r.rating,
+            'author': r.author,
+            'date_text': r.date_text,
+        })
+    return reviews
+
+
+class Reprocessor:
+    def __init__(self, concurrency: int, repoint: bool = False):
+        self.repoint = repoint
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.redis = create_redis_client()
+        self.budget = HourlyBudget(self.redis, "gemini", settings.GEMINI_HOURLY_BUDGET)
+        self.analyzer = GeminiAnalyzer()
+        self.stats = {"places": 0, "analyzed": 0, "skipped": 0, "reviews": 0, "users_updated": 0}
+        self.started = time.monotonic()
+
+    async def _analyze(self, place_key: str, name: str, reviews: List[Dict]):
+        async with self.semaphore:
+            # Interactive traffic shares the budget: wait for the next window instead of overspending
+            while await self.budget.remaining() <= 0:
+                logger.info("Gemini hourly budget exhausted, waiting")
+                await asyncio.sleep(BUDGET_POLL_SECONDS)
+            await self.budget.consume()
+            analysis = await self.analyzer.analyze_reviews(reviews, name)
+        return place_key, review_set_hash(reviews), analysis
+
+    async def process_chunk(self, raws: List[RawReview]):
+        async with async_session_maker() as session:
+            reviews_by_place = await _load_reviews(session, raws)
+            pending = [
+                (raw, reviews_by_place[raw.query]) for raw in raws if reviews_by_place.get(raw.query)
+            ]
+            repo = AnalysisResultRepository(session)
+            done = await repo.current_versions([(raw.query, review_set_hash(reviews)) for raw, reviews in pending])
+            todo = [(raw, reviews) for raw, reviews in pending if (raw.query, review_set_hash(reviews)) not in done]
+            await session.commit()  # Release the connection while Gemini runs
+
+            analyses = await asyncio.gather(*[
+                self._analyze(raw.query, (raw.restaurant_info or {}).get('name', 'Restaurant'), reviews)
+                for raw, reviews in todo
+            ])
+            # Fallbacks (AI errors) are left for the next run
+            analyses = [a for a in analyses if not a[2].get('is_fallback')]
+
+            result_ids = await repo.upsert_many(analyses)
+            user_ids = set()
+            if self.repoint:
+                user_ids = set(await repo.repoint_reports(result_ids))
+                stats_repo = StatsRepository(session)
+                for user_id in user_ids:
+                    await stats_repo.rebuild(user_id)
+            await session.commit()
+
+        for user_id in user_ids:
+            await invalidate_dashboard(self.redis, user_id)
+        await self.redis.set(CHECKPOINT_KEY, raws[-1].id)
+
+        self.stats["places"] += len(raws)
+        self.stats["analyzed"] += len(analyses)
+        self.stats["skipped"] += len(raws) - len(todo)
+        self.stats["reviews"] += sum(len(reviews) for _, reviews in todo)
+        self.stats["users_updated"] += len(user_ids)
+        elapsed = time.monotonic() - self.started
+        logger.info(
+            f"Checkpoint raw_id={raws[-1].id}: {self.stats} | "
+            f"{self.stats['places'] / elapsed:.2f} places/s, "
+            f"{self.stats['reviews'] / elapsed:.1f} reviews/s, "
+            f"{self.stats['analyzed'] / elapsed * 60:.1f} analyses/min"
+        )
+
+    async def run(self, chunk_size: int, limit: int = None, restart: bool = False):
+        if restart:
+            await self.redis.delete(CHECKPOINT_KEY)
+        after_id = int(await self.redis.get(CHECKPOINT_KEY) or 0)
+        if after_id:
+            logger.info(f"Resuming after raw_id={after_id}")
+
+        try:
+            # Keyset pages, each read in its own short session: no transaction
+            # (and no old snapshot) stays open across hours of Gemini calls
+            remaining = limit
+            while remaining is None or remaining > 0:
+                page_size = chunk_size if remaining is None else min(chunk_size, remaining)
+                async with async_session_maker() as page_session:
+                    result = await page_session.execute(
+                        select(RawReview).where(RawReview.id > after_id).order_by(RawReview.id).limit(page_size)
+                    )
+                    raws = list(result.scalars().all())
+                if not raws:
+                    break
+                await self.process_chunk(raws)
+                after_id = raws[-1].id
+                if remaining is not None:
+                    remaining -= len(raws)
+        finally:
+            await self.redis.close()
+            await engine.dispose()
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run AI analysis over stored reviews")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Places per chunk / bulk write")
+    parser.add_argument("--concurrency", type=int, default=4, help="Gemini calls in flight")
+    parser.add_argument("--limit", type=int, help="Process at most N places")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    parser.add_argument("--repoint", action="store_true", help="Also move existing reports to the new results")
+    args = parser.parse_args()
+
+    stats = asyncio.run(Reprocessor(args.concurrency, args.repoint).run(args.chunk_size, args.limit, args.restart))
+    logger.info(f"Reprocessing finished (prompt v{PROMPT_VERSION}): {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Add the pagination indexes to databases created before keyset pagination.
+
+create_all only creates indexes together with their table, so existing
+analysis_reports and reviews tables never get them. Without these the
+history and review pages fall back to sorting every row of a user or place.
+Safe to run more than once.
+
+Usage:
+    python -m app.cli.upgrade_history
+"""
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine, Base
+from app.models.restaurant import AnalysisReport  # noqa: F401 - register table
+from app.models.review import Review  # noqa: F401 - register table
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def upgrade():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_analysis_reports_user_created "
+            "ON analysis_reports (user_id, created_at DESC, id DESC)"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_reviews_place_published "
+            "ON reviews (place_key, published_at DESC NULLS LAST, id DESC)"
+        ))
+    await engine.dispose()
+
+
+def main():
+    asyncio.run(upgrade())
+    logger.info("Pagination indexes are in place")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Let scrape_payloads link downloads before their place is known, and place
+search downloads.
+
+Adds the kind column (existing links are review scrapes) and makes
+place_key optional. Safe to run more than once.
+
+Usage:
+    python -m app.cli.upgrade_payloads
+"""
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine, Base
+from app.models.review import ScrapePayload  # noqa: F401 - register table
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def upgrade():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(
+            "ALTER TABLE scrape_payloads ADD COLUMN IF NOT EXISTS kind VARCHAR(20) NOT NULL DEFAULT 'reviews'"
+        ))
+        await conn.execute(text("ALTER TABLE scrape_payloads ALTER COLUMN place_key DROP NOT NULL"))
+    await engine.dispose()
+
+
+def main():
+    asyncio.run(upgrade())
+    logger.info("scrape_payloads is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Move a database created before canonical place keys onto them.
+
+Adds the restaurants.place_key/place_id columns, then re-keys every
+restaurant, its stored reviews and its scrape metadata from the raw query
+string to the canonical place key, recording the old query as an alias.
+Restaurants that turn out to be the same place are merged, and scrape
+metadata gets the unique key the worker upserts on.
+Safe to run more than once.
+
+Usage:
+    python -m app.cli.upgrade_places
+"""
+import asyncio
+import logging
+
+from sqlalchemy import select, update, delete, text
+
+from app.core.database import async_session_maker, engine, Base
+from app.models.restaurant import Restaurant, AnalysisReport, RefreshSchedule
+from app.models.review import RawReview, Review
+from app.models.place import PlaceAlias  # noqa: F401 - register table
+from app.services.place_identity import PlaceResolver, canonical_place_key, extract_place_id
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def upgrade() -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS place_key VARCHAR(2048) UNIQUE"))
+        await conn.execute(text("ALTER TABLE restaurants ADD COLUMN IF NOT EXISTS place_id VARCHAR(255)"))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_restaurants_place_id ON restaurants (place_id)"))
+
+    migrated = 0
+    async with async_session_maker() as session:
+        result = await session.execute(select(Restaurant).where(Restaurant.place_key.is_not(None)))
+        canonical = {r.place_key: r for r in result.scalars().all()}
+
+        result = await session.execute(
+            select(Restaurant).where(Restaurant.place_key.is_(None)).order_by(Restaurant.id)
+        )
+        for restaurant in result.scalars().all():
+            old_key = restaurant.google_maps_url
+            raw = (await session.execute(select(RawReview).where(RawReview.query == old_key))).scalar_one_or_none()
+            place_id = extract_place_id(old_key) or ((raw.restaurant_info or {}).get("place_id") if raw else None)
+            place_key = canonical_place_key(place_id, old_key)
+
+            # Reviews already stored under the canonical key win the signature conflict
+            await session.execute(
+                update(Review)
+                .where(Review.place_key == old_key)
+                .where(~Review.signature.in_(select(Review.signature).where(Review.place_key == place_key)))
+                .values(place_key=place_key)
+            )
+            await session.execute(delete(Review).where(Review.place_key == old_key))
+
+            target = canonical.get(place_key)
+            if target:
+                # Another spelling of a place already migrated: fold this row into it
+                await session.execute(
+                    update(AnalysisReport).where(AnalysisReport.restaurant_id == restaurant.id).values(restaurant_id=target.id)
+                )
+                await session.execute(delete(RefreshSchedule).where(RefreshSchedule.restaurant_id == restaurant.id))
+                if raw:
+                    await session.delete(raw)
+                await session.delete(restaurant)
+            else:
+                restaurant.place_key = place_key
+                restaurant.place_id = place_id
+                canonical[place_key] = restaurant
+                if raw:
+                    raw.query = place_key
+            await session.flush()
+
+            await PlaceResolver(session).record(place_key, place_id, [old_key])
+            migrated += 1
+
+        await session.commit()
+
+    async with engine.begin() as conn:
+        # Scrape metadata is upserted on the place key: keep the newest row per key
+        await conn.execute(text(
+            "DELETE FROM raw_reviews a USING raw_reviews b "
+            "WHERE a.query = b.query AND a.id < b.id"
+        ))
+        await conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_raw_reviews_query ON raw_reviews (query)"))
+        await conn.execute(text("DROP INDEX IF EXISTS ix_raw_reviews_query"))
+    await engine.dispose()
+    return migrated
+
+
+def main():
+    migrated = asyncio.run(upgrade())
+    logger.info(f"Moved {migrated} restaurants onto canonical place keys")
+
+
+if __name__ == "__main__":
+    main()
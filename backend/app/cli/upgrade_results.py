@@ -0,0 +1,81 @@
+"""
+Move reports written before shared analysis results onto them.
+
+Each older report carried its own copy of the analysis. This copies that
+content into one analysis_results row per report (they were computed
+separately, so they are not merged) and points the report at it. The
+legacy content columns on analysis_reports are left in place, unmapped,
+and can be dropped by hand once the move is verified. Safe to run more
+than once.
+
+Usage:
+    python -m app.cli.upgrade_results
+"""
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine, Base
+from app.models.restaurant import AnalysisResult  # noqa: F401 - register table
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def upgrade() -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Results created before prompt versioning are version 1
+        await conn.execute(text(
+            "ALTER TABLE analysis_results ADD COLUMN IF NOT EXISTS prompt_version INTEGER NOT NULL DEFAULT 1"
+        ))
+        await conn.execute(text(
+            "ALTER TABLE analysis_results DROP CONSTRAINT IF EXISTS uq_analysis_results_place_reviews"
+        ))
+        await conn.execute(text(
+            "DO $$ BEGIN "
+            "ALTER TABLE analysis_results ADD CONSTRAINT uq_analysis_results_version "
+            "UNIQUE (place_key, review_set_hash, prompt_version); "
+            "EXCEPTION WHEN duplicate_table OR duplicate_object THEN NULL; END $$"
+        ))
+        await conn.execute(text(
+            "ALTER TABLE analysis_reports ADD COLUMN IF NOT EXISTS result_id INTEGER REFERENCES analysis_results (id)"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_analysis_reports_result_id ON analysis_reports (result_id)"
+        ))
+
+        # The legacy review_set_hash ties each copied result back to its report
+        result = await conn.execute(text(
+            "INSERT INTO analysis_results "
+            "(place_key, review_set_hash, sentiment_score, summary, complaints, praises, "
+            " recommended_actions, reviews_analyzed, raw_ai_response, is_fallback, created_at) "
+            "SELECT coalesce(r.place_key, r.google_maps_url), 'legacy-' || a.id, a.sentiment_score, a.summary, "
+            " a.complaints::jsonb, a.praises::jsonb, a.recommended_actions::jsonb, a.reviews_analyzed, "
+            " a.raw_ai_response, false, a.created_at "
+            "FROM analysis_reports a JOIN restaurants r ON r.id = a.restaurant_id "
+            "WHERE a.result_id IS NULL "
+            "ON CONFLICT ON CONSTRAINT uq_analysis_results_version DO NOTHING"
+        ))
+        copied = result.rowcount
+        await conn.execute(text(
+            "UPDATE analysis_reports a SET result_id = s.id "
+            "FROM analysis_results s "
+            "WHERE a.result_id IS NULL AND s.review_set_hash = 'legacy-' || a.id"
+        ))
+
+        # Findings are searched on analysis_results now
+        for index in ("ix_analysis_reports_complaints", "ix_analysis_reports_praises", "ix_analysis_reports_findings_tsv"):
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    await engine.dispose()
+    return copied
+
+
+def main():
+    copied = asyncio.run(upgrade())
+    logger.info(f"Moved {copied} legacy reports onto shared analysis results")
+
+
+if __name__ == "__main__":
+    main()
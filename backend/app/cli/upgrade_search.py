@@ -0,0 +1,51 @@
+"""
+Bring a database created before full-text search up to the current schema.
+
+create_all only creates missing tables, so existing deployments need the
+generated tsvector column on reviews and its GIN index. Findings are
+indexed on analysis_results, which create_all builds complete (run
+app.cli.upgrade_results to move older reports there). Safe to run more
+than once.
+
+Usage:
+    python -m app.cli.upgrade_search
+"""
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.core.database import engine, Base
+from app.models.review import Review
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEXES = ("ix_reviews_text_tsv",)
+
+
+async def upgrade():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+        await conn.execute(text(
+            "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS text_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('english', coalesce(text, ''))) STORED"
+        ))
+
+        def create_indexes(sync_conn):
+            for index in Review.__table__.indexes:
+                if index.name in SEARCH_INDEXES:
+                    index.create(sync_conn, checkfirst=True)
+
+        await conn.run_sync(create_indexes)
+    await engine.dispose()
+
+
+def main():
+    asyncio.run(upgrade())
+    logger.info("Search schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Bounded thread pools for blocking calls made from async handlers.
+
+Argon2 is deliberately slow and google-auth's token exchange is synchronous
+network I/O; run inline, either stalls every request on the worker. Each
+kind of work gets its own small pool so a slow Google cannot starve logins.
+A pool admits at most `max_pending` calls (running + waiting); past that,
+callers get ServiceBusyException (503) at once instead of queueing without
+bound and timing out later.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.exceptions.base import ServiceBusyException
+
+
+class BlockingPool:
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool, or raise ServiceBusyException if it is full."""
+        executor = self._get_executor()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ServiceBusyException(self.name, settings.BUSY_RETRY_AFTER_SECONDS)
+            self._pending += 1
+        # The slot is released when the call finishes, not when the caller
+        # stops waiting: a cancelled request's hash still occupies a thread
+        future = executor.submit(functools.partial(fn, *args, **kwargs))
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = BlockingPool("password-hash", settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+oauth_pool = BlockingPool("oauth", settings.OAUTH_WORKERS, settings.OAUTH_MAX_PENDING)
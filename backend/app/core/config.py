@@ -34,6 +34,36 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     
+    # Task Scheduling Settings
+    USER_MAX_INFLIGHT_TASKS: int = 5  # Interactive analyses queued/running per user
+    USER_MAX_INFLIGHT_BULK_TASKS: int = 500  # Bulk/scheduled analyses queued/running per user
+    INFLIGHT_PENALTY_STEP: int = 2  # Each N in-flight tasks lowers the user's next priority by one step
+    ANALYSIS_QUEUE_SLO_SECONDS: int = 900  # Max acceptable estimated queue wait for interactive analyses
+    ANALYSIS_ADMISSION_MODE: str = "reject"  # Past the SLO: "reject" (429) or "defer" (queue in the bulk lane)
+    BULK_ANALYZE_MAX_PLACES: int = 500  # Max places per bulk analysis request
+    BATCH_TTL_SECONDS: int = 86400  # How long batch progress stays queryable
+    ANALYSIS_BATCH_MAX_IDS: int = 100  # Max reports per batch read (POST /analyses/batch)
+    
+    # Cache Settings
+    DASHBOARD_CACHE_TTL_SECONDS: int = 3600  # Safety net; entries are invalidated by version bumps
+    USER_CACHE_TTL_SECONDS: int = 60  # Resolved users in Redis; writes invalidate them
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 5  # In-process copy; bounds staleness across API processes
+    USER_CACHE_LOCAL_MAX_ENTRIES: int = 10000  # In-process LRU size
+    ANALYSIS_CACHE_MAX_AGE_SECONDS: int = 300  # Client reuse of report/review responses before revalidating
+    GZIP_MINIMUM_SIZE: int = 1024  # Responses smaller than this are sent uncompressed
+    GZIP_COMPRESS_LEVEL: int = 5  # Most of level 9's ratio at a fraction of the CPU
+    
+    # Scheduled Refresh Settings
+    REFRESH_ENABLED: bool = True
+    REFRESH_TICK_SECONDS: int = 600  # How often the beat scheduler looks for due restaurants
+    REFRESH_WINDOW_START_HOUR: int = 1  # Off-peak window (UTC, inclusive)
+    REFRESH_WINDOW_END_HOUR: int = 6  # Off-peak window (UTC, exclusive)
+    REFRESH_TARGET_NEW_REVIEWS: int = 10  # Refresh once roughly this many new reviews are expected
+    REFRESH_MIN_INTERVAL_HOURS: int = 12
+    REFRESH_MAX_INTERVAL_DAYS: int = 14
+    GOSOM_HOURLY_BUDGET: int = 120  # Gosom scrape jobs per hour (all sources)
+    GEMINI_HOURLY_BUDGET: int = 300  # Gemini analyses per hour (all sources)
+    
     # Google Gemini API
     GEMINI_API_KEY: Optional[str] = None
     
@@ -43,14 +73,53 @@ class Settings(BaseSettings):
     # Google OAuth
     AUTH_GOOGLE_ID: Optional[str] = None
     AUTH_GOOGLE_SECRET: Optional[str] = None
+    GOOGLE_TOKEN_URI: str = "https://oauth2.googleapis.com/token"  # Point at a stand-in for load tests
+    
+    # Event Loop Instrumentation
+    LOOP_MONITOR_ENABLED: bool = False  # Flag event-loop steps that block, in the API and workers
+    LOOP_BLOCK_THRESHOLD_MS: int = 100  # Steps blocking longer than this are logged with their stack
+    LOOP_MONITOR_FLUSH_SECONDS: int = 30  # How often the API publishes its counters to Redis
+    
+    # Blocking Work Pools (keep Argon2 and sync OAuth calls off the event loop)
+    PASSWORD_HASH_WORKERS: int = 4  # Concurrent Argon2 hashes/verifications per API process
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Running + waiting before logins get 503
+    OAUTH_WORKERS: int = 8  # Concurrent token exchanges with Google per API process
+    OAUTH_MAX_PENDING: int = 64  # Running + waiting before OAuth callbacks get 503
+    BUSY_RETRY_AFTER_SECONDS: int = 1  # Retry-After sent with those 503s
 
     # Playwright Settings
     PLAYWRIGHT_HEADLESS: bool = True
     PLAYWRIGHT_TIMEOUT: int = 30000  # 30 seconds
     
     # Scraper Settings
+    GOSOM_MAX_CONCURRENT_JOBS: int = 4  # Gosom jobs running at once across all workers
+    GOSOM_JOB_SLOT_WAIT_SECONDS: int = 60  # Wait for a free job slot this long, then retry the task later
+    GOSOM_JOB_SLOT_RETRY_SECONDS: int = 120  # Countdown before an analysis that found no free slot runs again
+    GOSOM_JOB_SLOT_MAX_RETRIES: int = 300  # About 10 hours of retries: enough for a 500-place batch
     REVIEW_DAYS_LIMIT: int = 30  # Last 30 days
     MAX_REVIEWS_TO_SCRAPE: int = 1000  # Increased to capture all reviews within 30 days
+    SCRAPE_REUSE_MINUTES: int = 60  # Reuse a place's stored scrape this fresh instead of re-scraping
+    PAYLOAD_ARCHIVE_ENABLED: bool = True  # Keep every raw Gosom download for offline replay
+    PAYLOAD_ARCHIVE_DIR: str = "/data/gosom-archive"
+    PAYLOAD_ARCHIVE_ZSTD_LEVEL: int = 10
+
+    # Review Import Settings
+    IMPORT_DIR: str = "/data/imports"  # Uploaded dumps, shared by the API and workers
+    IMPORT_BATCH_SIZE: int = 5000  # Rows per COPY batch (and per transaction)
+    IMPORT_MAX_UPLOAD_MB: int = 10240  # Largest dump accepted by the upload endpoint
+
+    # Webhook Settings
+    WEBHOOK_QUEUE: str = "webhooks"  # Celery queue served by the webhook worker
+    WEBHOOK_MAX_ENDPOINTS_PER_USER: int = 10
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_CONCURRENCY: int = 20  # Batches in flight at once per sweep
+    WEBHOOK_BATCH_SIZE: int = 50  # Events per POST to one endpoint
+    WEBHOOK_SWEEP_LIMIT: int = 500  # Outbox rows claimed per sweep
+    WEBHOOK_SWEEP_SECONDS: int = 60  # Beat sweep picking up retries that are due
+    WEBHOOK_MAX_ATTEMPTS: int = 12  # Then the delivery is marked failed
+    WEBHOOK_BACKOFF_BASE_SECONDS: int = 30
+    WEBHOOK_BACKOFF_MAX_SECONDS: int = 21600  # 6 hours
+    WEBHOOK_ALLOW_PRIVATE_URLS: bool = False  # Local development only: allow http and private/loopback hosts
     
     @property
     def API_V1_STR(self) -> str:
@@ -61,6 +130,11 @@ class Settings(BaseSettings):
         """Generate PostgreSQL connection URL"""
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    @property
+    def redis_url(self) -> str:
+        """Redis URL used for caching, counters and pub/sub"""
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+    
     @property
     def celery_broker_url(self) -> str:
         """Celery broker URL"""
@@ -25,7 +25,9 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-
+def create_redis_client() -> redis.Redis:
+    """Create a standalone async Redis client (e.g. for worker event loops)."""
+    return redis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
 
 
 class RedisClient:
@@ -33,8 +35,7 @@ class RedisClient:
     
     @classmethod
     async def connect(cls):
-        redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
-        cls.client = redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+        cls.client = create_redis_client()
         
     @classmethod
     async def close(cls):
@@ -0,0 +1,47 @@
+"""
+Conditional GET helpers (strong ETags, If-None-Match, Cache-Control).
+
+A report's content is fixed by its id and the result version it points
+at, so the ETag can be computed from those without rendering the body.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+from app.core.config import settings
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the values that determine a representation."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    # private: responses are per user. Clients reuse them for max-age and
+    # then revalidate; a report can be re-pointed at a new result version.
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.ANALYSIS_CACHE_MAX_AGE_SECONDS}, must-revalidate",
+    }
+
+
+def conditional_response(if_none_match: Optional[str], etag: str, body: Any) -> Response:
+    """304 when the client already has this representation, else the JSON body."""
+    headers = cache_headers(etag)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content=body, headers=headers)
@@ -0,0 +1,272 @@
+"""
+Event-loop blocking detector (LOOP_MONITOR_ENABLED).
+
+Sync work called from async code (Argon2, token exchanges, big json.loads,
+CSV parsing, Python-side sorts) stalls every other request on the loop. With
+the monitor on, a heartbeat coroutine measures how late the loop wakes it up
+and a watchdog thread notices a stall while it is still going on, capturing
+the loop thread's stack (sys._current_frames) and the operation (endpoint or
+task name) that was running. Each step that blocks longer than
+LOOP_BLOCK_THRESHOLD_MS is logged with that stack and counted per operation.
+
+Counters are kept in-process and published to one Redis hash (a field per
+process and operation), which /metrics/event-loop aggregates. The API
+publishes every LOOP_MONITOR_FLUSH_SECONDS; workers after each task.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+import weakref
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "metrics:event_loop"
+METRICS_TTL_SECONDS = 86400
+STACK_DEPTH = 30
+
+# Endpoint ("GET /api/v1/analyses/{analysis_id}") or task ("tasks.import_reviews")
+# the current code runs on behalf of
+_operation: ContextVar[str] = ContextVar("loop_operation", default="")
+
+_monitor: Optional["LoopMonitor"] = None
+
+
+class LoopMonitor:
+    """Watches one event loop at a time; a worker re-attaches it for every task."""
+
+    def __init__(self, role: str, threshold_ms: float, clock: Callable[[], float] = time.monotonic):
+        self.role = role
+        self._clock = clock
+        self.threshold = threshold_ms / 1000
+        self.interval = self.threshold / 4
+        self.process = f"{role}:{socket.gethostname()}:{os.getpid()}"
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._beat = 0.0
+        self._stall = None  # (beat, operation, stack) captured by the watchdog
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._publisher: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        # ContextVars cannot be read from the watchdog thread, so tasks are
+        # mapped to the operation they were created under
+        self._task_operations: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+    def start(self, client: Optional[aioredis.Redis] = None):
+        """Attach to the running loop. With a client, also publish periodically."""
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = self._clock()
+        self._stall = None
+        loop.set_task_factory(self._task_factory)
+        self._loop = loop
+        self._heartbeat = loop.create_task(self._run_heartbeat())
+        if client is not None:
+            self._publisher = loop.create_task(self._run_publisher(client))
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        self._loop = None
+        for task in (self._heartbeat, self._publisher):
+            if task:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._heartbeat = self._publisher = None
+
+    def register(self, task: asyncio.Task, name: str):
+        self._task_operations[task] = name
+
+    def unregister(self, task: asyncio.Task):
+        self._task_operations.pop(task, None)
+
+    def _task_factory(self, loop, coro, **kwargs):
+        # Child tasks (gather, create_task) inherit their creator's operation
+        task = asyncio.Task(coro, loop=loop, **kwargs)
+        name = _operation.get()
+        if name:
+            self._task_operations[task] = name
+        return task
+
+    async def _run_heartbeat(self):
+        # The first wake-up is due at start(): code that blocks before this
+        # task ever runs (e.g. the start of a worker task) is measured too
+        due = self._beat
+        while True:
+            due = self._wake(due)
+            await asyncio.sleep(self.interval)
+
+    def _wake(self, due: float) -> float:
+        """One heartbeat: record how late it came if that is a block. Returns the next due time."""
+        blocked = self._clock() - due
+        if blocked >= self.threshold:
+            stall, self._stall = self._stall, None
+            if stall and stall[0] == self._beat:
+                self.record(blocked, stall[1], stall[2])
+            else:
+                self.record(blocked, "unknown", None)
+        self._beat = self._clock()
+        return self._beat + self.interval
+
+    async def _run_publisher(self, client: aioredis.Redis):
+        while True:
+            await asyncio.sleep(settings.LOOP_MONITOR_FLUSH_SECONDS)
+            await self.publish(client)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            self._check_stall()
+
+    def _check_stall(self):
+        """Watchdog side: capture what the loop thread is stuck in, once per stall."""
+        loop, beat = self._loop, self._beat
+        if loop is None or self._clock() - beat < self.interval + self.threshold:
+            return
+        stall = self._stall
+        if stall and stall[0] == beat:
+            return
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = "".join(traceback.format_stack(frame, limit=STACK_DEPTH)) if frame else ""
+        task = asyncio.current_task(loop)
+        if task is None:
+            name = "<callback>"
+        else:
+            name = self._task_operations.get(task) or task.get_name()
+        self._stall = (beat, name, stack)
+
+    def record(self, blocked: float, operation: str, stack: Optional[str]):
+        blocked_ms = blocked * 1000
+        logger.warning(
+            f"Event loop blocked for {blocked_ms:.0f} ms in {operation}" + (f"\n{stack}" if stack else "")
+        )
+        with self._lock:
+            entry = self.stats.setdefault(
+                operation, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_stack": None, "last_blocked_at": None}
+            )
+            entry["count"] += 1
+            entry["total_ms"] += blocked_ms
+            entry["max_ms"] = max(entry["max_ms"], blocked_ms)
+            entry["last_blocked_at"] = datetime.now(timezone.utc).isoformat()
+            if stack:
+                entry["last_stack"] = stack
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {operation: dict(entry) for operation, entry in self.stats.items()}
+
+    def _fields(self) -> Dict[str, str]:
+        return {f"{self.process}|{operation}": json.dumps(entry) for operation, entry in self.snapshot().items()}
+
+    async def publish(self, client: aioredis.Redis):
+        fields = self._fields()
+        if not fields:
+            return
+        try:
+            await client.hset(METRICS_KEY, mapping=fields)
+            await client.expire(METRICS_KEY, METRICS_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Event loop metrics publish failed: {e}")
+
+    def publish_sync(self):
+        """Worker side: publish with a short-lived synchronous client."""
+        fields = self._fields()
+        if not fields:
+            return
+        try:
+            client = redis.Redis.from_url(settings.redis_url)
+            client.hset(METRICS_KEY, mapping=fields)
+            client.expire(METRICS_KEY, METRICS_TTL_SECONDS)
+            client.close()
+        except Exception as e:
+            logger.warning(f"Event loop metrics publish failed: {e}")
+
+
+def get_monitor(role: str = "api") -> LoopMonitor:
+    """The process-wide monitor, created on first use."""
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopMonitor(role, settings.LOOP_BLOCK_THRESHOLD_MS)
+    return _monitor
+
+
+@contextmanager
+def operation(name: str):
+    """Attribute everything run in this block (and tasks it creates) to `name`."""
+    token = _operation.set(name)
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None and _monitor is not None:
+        _monitor.register(task, name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+        if task is not None and _monitor is not None:
+            _monitor.unregister(task)
+
+
+def run_monitored(name: str, main: Awaitable) -> Any:
+    """asyncio.run for Celery tasks, watched by the monitor when it is enabled."""
+    if not settings.LOOP_MONITOR_ENABLED:
+        return asyncio.run(main)
+
+    monitor = get_monitor("worker")
+
+    async def monitored():
+        monitor.start()
+        try:
+            with operation(name):
+                return await main
+        finally:
+            await monitor.stop()
+
+    try:
+        return asyncio.run(monitored())
+    finally:
+        monitor.publish_sync()
+
+
+async def read_loop_metrics(client: aioredis.Redis) -> Dict[str, Any]:
+    """Blocking counters of every process, aggregated per operation (worst first)."""
+    raw = await client.hgetall(METRICS_KEY)
+    operations: Dict[str, Dict[str, Any]] = {}
+    for field, value in raw.items():
+        process, _, name = field.partition("|")
+        entry = json.loads(value)
+        total = operations.setdefault(
+            name, {"operation": name, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                   "last_blocked_at": None, "last_stack": None, "processes": []}
+        )
+        total["count"] += entry["count"]
+        total["total_ms"] += entry["total_ms"]
+        total["max_ms"] = max(total["max_ms"], entry["max_ms"])
+        total["processes"].append(process)
+        if entry["last_blocked_at"] and (total["last_blocked_at"] or "") < entry["last_blocked_at"]:
+            total["last_blocked_at"] = entry["last_blocked_at"]
+            total["last_stack"] = entry["last_stack"] or total["last_stack"]
+    return {
+        "enabled": settings.LOOP_MONITOR_ENABLED,
+        "threshold_ms": settings.LOOP_BLOCK_THRESHOLD_MS,
+        "operations": sorted(operations.values(), key=lambda o: o["total_ms"], reverse=True),
+    }
@@ -0,0 +1,68 @@
+"""
+Response compression and request attribution.
+
+Large JSON pages (history, reviews, exports) compress 5-10x. Server-sent
+event streams are left alone: gzip would hold events back in its buffer.
+"""
+from collections import OrderedDict
+from typing import Tuple
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.instrumentation import operation
+
+# Paths that stream events and must reach the client unbuffered
+UNCOMPRESSED_PATH_SUFFIXES = ("/stream",)
+
+# (method, path) -> route template entries kept by OperationMiddleware
+ROUTE_TEMPLATE_CACHE_SIZE = 4096
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware that skips event-stream endpoints."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith(UNCOMPRESSED_PATH_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+class OperationMiddleware:
+    """
+    Names each request after its route template (e.g. "GET /api/v1/analyses/{analysis_id}")
+    so the event-loop monitor can tell which endpoint blocked. The name is
+    needed before routing runs, so templates are matched here and remembered
+    per (method, path) instead of scanning every route on every request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with operation(f"{scope['method']} {self._route_path(scope)}"):
+            await self.app(scope, receive, send)
+
+    def _route_path(self, scope: Scope) -> str:
+        key = (scope["method"], scope["path"])
+        template = self._templates.get(key)
+        if template is not None:
+            self._templates.move_to_end(key)
+            return template
+        template = "<unmatched>"
+        # Raw paths would give every analysis id its own metric
+        for route in scope["app"].routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+        self._templates[key] = template
+        while len(self._templates) > ROUTE_TEMPLATE_CACHE_SIZE:
+            self._templates.popitem(last=False)
+        return template
@@ -1,16 +1,19 @@
 # Custom exceptions module
-from .base import AppException, NotFoundException, ValidationException, AuthenticationException
+from .base import AppException, NotFoundException, ValidationException, AuthenticationException, ServiceBusyException
 from .auth import InvalidCredentialsException, UserAlreadyExistsException, TokenExpiredException
-from .analysis import ScrapingException, AIAnalysisException
+from .analysis import ScrapingException, AIAnalysisException, TaskQuotaExceededException, QueueOverloadedException
 
 __all__ = [
     "AppException",
     "NotFoundException",
     "ValidationException",
     "AuthenticationException",
+    "ServiceBusyException",
     "InvalidCredentialsException",
     "UserAlreadyExistsException",
     "TokenExpiredException",
     "ScrapingException",
     "AIAnalysisException",
+    "TaskQuotaExceededException",
+    "QueueOverloadedException",
 ]
@@ -13,6 +13,17 @@ class ScrapingException(AppException):
         )
 
 
+class ScraperBusyException(AppException):
+    """Every Gosom job slot stayed taken while waiting for one exception."""
+    
+    def __init__(self, wait_seconds: float):
+        super().__init__(
+            message=f"No free scraper job slot after {wait_seconds:.0f}s",
+            status_code=503,
+            details={"wait_seconds": wait_seconds}
+        )
+
+
 class AIAnalysisException(AppException):
     """Error during AI analysis exception."""
     
@@ -21,3 +32,29 @@ class AIAnalysisException(AppException):
             message=f"AI analysis failed: {message}",
             status_code=502
         )
+
+
+class TaskQuotaExceededException(AppException):
+    """User has too many analyses queued or running exception."""
+    
+    def __init__(self, user_id: str, limit: int):
+        super().__init__(
+            message=f"Too many analyses in progress (limit {limit}). Please wait for some to finish.",
+            status_code=429,
+            details={"user_id": user_id, "limit": limit}
+        )
+
+
+class QueueOverloadedException(AppException):
+    """Estimated queue wait exceeds the service level objective exception."""
+    
+    def __init__(self, estimated_wait_seconds: float, retry_after_seconds: int):
+        super().__init__(
+            message="The analysis queue is too busy right now. Please retry later.",
+            status_code=429,
+            details={
+                "estimated_wait_seconds": estimated_wait_seconds,
+                "retry_after_seconds": retry_after_seconds
+            }
+        )
+        self.retry_after_seconds = retry_after_seconds
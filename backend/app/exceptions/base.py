@@ -44,3 +44,15 @@ class AuthenticationException(AppException):
     
     def __init__(self, message: str = "Authentication required"):
         super().__init__(message=message, status_code=401)
+
+
+class ServiceBusyException(AppException):
+    """A bounded worker pool is full; the caller should retry shortly exception."""
+    
+    def __init__(self, pool: str, retry_after_seconds: int):
+        super().__init__(
+            message="The server is busy right now. Please retry shortly.",
+            status_code=503,
+            details={"pool": pool, "retry_after_seconds": retry_after_seconds}
+        )
+        self.retry_after_seconds = retry_after_seconds
@@ -4,8 +4,18 @@ from app.api.v1.endpoints import router as api_router
 from app.api.v1.places import router as places_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.users import router as users_router
+from app.api.v1.search import router as search_router
+from app.api.v1.exports import router as exports_router
+from app.api.v1.webhooks import router as webhooks_router
+from app.core.config import settings
 from app.core.database import Base, engine, RedisClient
+from app.core.middleware import CompressionMiddleware, OperationMiddleware
+from app.core.instrumentation import get_monitor
+from app.core.blocking import password_pool, oauth_pool
 from app.models.review import RawReview # Register model
+from app.models.stats import UserDailyStats # Register model
+from app.models.place import PlaceAlias # Register model
+from app.models.webhook import WebhookEndpoint # Register model
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -24,9 +34,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL
+)
+
+if settings.LOOP_MONITOR_ENABLED:
+    app.add_middleware(OperationMiddleware)
 
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(places_router, prefix="/api/v1")
+app.include_router(search_router, prefix="/api/v1")
+app.include_router(exports_router, prefix="/api/v1")
+app.include_router(webhooks_router, prefix="/api/v1")
 app.include_router(auth_router, prefix="/api/v1/auth")
 app.include_router(users_router, prefix="/api/v1/users")
 
@@ -37,13 +58,19 @@ async def startup():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     await RedisClient.connect()
+    if settings.LOOP_MONITOR_ENABLED:
+        get_monitor("api").start(RedisClient.get_client())
     logger.info("Database connections established")
 
 
 @app.on_event("shutdown")
 async def shutdown():
     logger.info("Shutting down...")
+    if settings.LOOP_MONITOR_ENABLED:
+        await get_monitor("api").stop()
     await RedisClient.close()
+    password_pool.shutdown()
+    oauth_pool.shutdown()
 
 
 @app.get("/")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class PlaceAlias(Base):
+    """A normalized query or Maps URL that is known to mean a canonical place."""
+    __tablename__ = "place_aliases"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    alias = Column(String(2048), unique=True, nullable=False)  # normalize_place_alias() output
+    place_key = Column(String(2048), nullable=False, index=True)  # "place:<place_id>" or "query:<alias>"
+    place_id = Column(String(255))  # Google place_id when known
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,8 +1,18 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, JSON, Text, Index, Computed, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text, false
 from app.core.database import Base
 
+# Text search configuration shared by the stored tsvectors and search queries
+SEARCH_CONFIG = "english"
+
+FINDINGS_TSV_EXPRESSION = (
+    "setweight(jsonb_to_tsvector('english', coalesce(complaints, '[]'::jsonb), '[\"string\"]'), 'A') || "
+    "setweight(jsonb_to_tsvector('english', coalesce(praises, '[]'::jsonb), '[\"string\"]'), 'A') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'B')"
+)
+
 
 class Restaurant(Base):
     __tablename__ = "restaurants"
@@ -10,6 +20,8 @@ class Restaurant(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     google_maps_url = Column(String(2048), unique=True, nullable=False)
+    place_key = Column(String(2048), unique=True)  # Canonical identity, see services/place_identity
+    place_id = Column(String(255), index=True)  # Google place_id when known
     address = Column(String(500))
     rating = Column(Float)
     total_reviews = Column(Integer)
@@ -17,23 +29,76 @@ class Restaurant(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     analysis_reports = relationship("AnalysisReport", back_populates="restaurant")
+    refresh_schedule = relationship("RefreshSchedule", back_populates="restaurant", uselist=False)
+
+
+class AnalysisResult(Base):
+    """
+    Gemini analysis of one review set of one place. Shared by every user who
+    asks for that place while its reviews are unchanged. Reprocessing with a
+    new prompt adds a new version rather than overwriting.
+    """
+    __tablename__ = "analysis_results"
+    __table_args__ = (
+        UniqueConstraint("place_key", "review_set_hash", "prompt_version", name="uq_analysis_results_version"),
+        # Containment lookups on findings (complaints @> '["Cold food"]')
+        Index("ix_analysis_results_complaints", "complaints", postgresql_using="gin", postgresql_ops={"complaints": "jsonb_path_ops"}),
+        Index("ix_analysis_results_praises", "praises", postgresql_using="gin", postgresql_ops={"praises": "jsonb_path_ops"}),
+        Index("ix_analysis_results_findings_tsv", "findings_tsv", postgresql_using="gin"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    place_key = Column(String(2048), nullable=False)  # Canonical place key (services/place_identity)
+    review_set_hash = Column(String(40), nullable=False)  # See review_set_hash()
+    prompt_version = Column(Integer, nullable=False, default=1, server_default="1")  # ai_analyzer.PROMPT_VERSION
+    sentiment_score = Column(Float)
+    summary = Column(Text)
+    complaints = Column(JSONB, default=list)
+    praises = Column(JSONB, default=list)
+    recommended_actions = Column(JSONB, default=list)
+    reviews_analyzed = Column(Integer)
+    raw_ai_response = Column(JSON)
+    is_fallback = Column(Boolean, nullable=False, default=False, server_default=false())  # Rating-only result after an AI error
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Full-text index over findings; complaints/praises rank above the summary
+    findings_tsv = Column(TSVECTOR, Computed(FINDINGS_TSV_EXPRESSION, persisted=True))
+    
+    reports = relationship("AnalysisReport", back_populates="result")
 
 
 class AnalysisReport(Base):
+    """A user's history entry: who asked for which place, pointing at the shared result."""
     __tablename__ = "analysis_reports"
+    __table_args__ = (
+        # History is always read per user, newest first
+        Index("ix_analysis_reports_user_created", "user_id", text("created_at DESC"), text("id DESC")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    result_id = Column(Integer, ForeignKey("analysis_results.id"), index=True)
     task_id = Column(String(100))
     user_id = Column(String(255), nullable=True)
     analysis_date = Column(DateTime(timezone=True), server_default=func.now())
-    sentiment_score = Column(Float)
-    summary = Column(Text)
-    complaints = Column(JSON, default=list)
-    praises = Column(JSON, default=list)
-    recommended_actions = Column(JSON, default=list)
-    reviews_analyzed = Column(Integer)
-    raw_ai_response = Column(JSON)
+    sentiment_score = Column(Float)  # Copied from the result for stats and history lists
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     restaurant = relationship("Restaurant", back_populates="analysis_reports")
+    result = relationship("AnalysisResult", back_populates="reports")
+
+
+class RefreshSchedule(Base):
+    """Background refresh cadence for a tracked restaurant."""
+    __tablename__ = "refresh_schedules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), unique=True, nullable=False)
+    query = Column(String(2048), nullable=False)  # What to hand the scraper on refresh
+    user_id = Column(String(255), nullable=True)  # Most recent user who analyzed the place
+    last_review_count = Column(Integer)
+    reviews_per_day = Column(Float)
+    last_refreshed_at = Column(DateTime(timezone=True))
+    next_refresh_at = Column(DateTime(timezone=True), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    restaurant = relationship("Restaurant", back_populates="refresh_schedule")
@@ -1,14 +1,71 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Float, Text, UniqueConstraint, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class RawReview(Base):
+    """Per-query scrape metadata. Individual reviews live in the `reviews` table."""
     __tablename__ = "raw_reviews"
+    __table_args__ = (
+        # Conflict target for ReviewRepository.upsert_scrape_metadata
+        Index("uq_raw_reviews_query", "query", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    query = Column(String(2048), index=True, nullable=False)
+    query = Column(String(2048), nullable=False)  # Canonical place key
     restaurant_info = Column(JSON, default=dict) # Name, rating, address
-    reviews = Column(JSON, default=list) # The list of reviews
+    reviews = Column(JSON, default=list) # Legacy blob; no longer written
     total_reviews_collected = Column(Integer, default=0)
     scraped_at = Column(DateTime(timezone=True), default=func.now())
     stored_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+
+class ScrapePayload(Base):
+    """Links a scrape to its raw Gosom download in the payload archive."""
+    __tablename__ = "scrape_payloads"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False, server_default="reviews")  # "reviews" or "search" (services/payload_archive)
+    place_key = Column(String(2048), index=True)  # Canonical place key; set once parsed, never for searches
+    query = Column(String(2048))  # What was sent to Gosom
+    job_id = Column(String(100))  # Gosom job id
+    content_hash = Column(String(64), nullable=False, index=True)  # sha256 of the uncompressed body
+    content_type = Column(String(100))
+    size_bytes = Column(Integer)
+    compressed_bytes = Column(Integer)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Review(Base):
+    """A single scraped review, deduplicated per place by content signature."""
+    __tablename__ = "reviews"
+    __table_args__ = (
+        UniqueConstraint("place_key", "signature", name="uq_reviews_place_signature"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    place_key = Column(String(2048), nullable=False)  # Canonical place key (services/place_identity)
+    signature = Column(String(40), nullable=False)  # sha1 of generate_review_signature()
+    source_review_id = Column(String(255))
+    author = Column(String(255))
+    text = Column(Text)
+    rating = Column(Float)
+    date_text = Column(String(100))  # As shown by Google ("2 weeks ago", ISO date, ...)
+    published_at = Column(DateTime(timezone=True))  # date_text resolved at ingest time
+    profile_picture = Column(String(2048))
+    first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    text_tsv = Column(TSVECTOR, Computed("to_tsvector('english', coalesce(text, ''))", persisted=True))
+
+
+# Serves the newest-first keyset pagination in ReviewRepository.list_page
+Index(
+    "ix_reviews_place_published",
+    Review.place_key,
+    Review.published_at.desc().nullslast(),
+    Review.id.desc(),
+)
+
+# Full-text search over review text (SearchRepository.search_reviews)
+Index("ix_reviews_text_tsv", Review.text_tsv, postgresql_using="gin")
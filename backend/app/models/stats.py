@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UserDailyStats(Base):
+    """Per-user, per-day rollup of analysis reports for dashboard charts."""
+    __tablename__ = "user_daily_stats"
+    
+    user_id = Column(String(255), primary_key=True)
+    day = Column(Date, primary_key=True)
+    report_count = Column(Integer, nullable=False, default=0)
+    sentiment_sum = Column(Float, nullable=False, default=0.0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, text, true
+from app.core.database import Base
+
+
+class WebhookEndpoint(Base):
+    """A URL a user registered to be notified when their analyses finish."""
+    __tablename__ = "webhook_endpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String(255), nullable=False, index=True)
+    url = Column(String(2048), nullable=False)
+    secret = Column(String(64), nullable=False)  # HMAC-SHA256 signing key, shown once on creation
+    description = Column(String(255))
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
+    consecutive_failures = Column(Integer, nullable=False, default=0, server_default="0")
+    last_success_at = Column(DateTime(timezone=True))
+    last_failure_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    deliveries = relationship("WebhookDelivery", back_populates="endpoint", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class WebhookDelivery(Base):
+    """
+    Outbox row: one event for one endpoint. Written in the same transaction
+    as the data it announces, then delivered (and retried) by the webhook worker.
+    """
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        UniqueConstraint("endpoint_id", "event_id", name="uq_webhook_deliveries_event"),
+        # The dispatcher only ever scans due, undelivered rows
+        Index(
+            "ix_webhook_deliveries_due", "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    endpoint_id = Column(Integer, ForeignKey("webhook_endpoints.id", ondelete="CASCADE"), nullable=False, index=True)
+    event_id = Column(String(36), nullable=False)  # Stable across retries, for receiver-side dedupe
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")  # pending, delivered, failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text)
+    delivered_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    endpoint = relationship("WebhookEndpoint", back_populates="deliveries")
@@ -0,0 +1,88 @@
+"""Server-side cursor reads for bulk data exports."""
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from sqlalchemy import select
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.restaurant import AnalysisReport, AnalysisResult, Restaurant
+from app.models.review import Review
+
+# Rows fetched from the server-side cursor per round trip
+FETCH_ROWS = 1000
+
+ANALYSIS_COLUMNS = (
+    "id", "created_at", "restaurant_name", "google_maps_url", "place_key",
+    "sentiment_score", "summary", "complaints", "praises", "recommended_actions",
+    "reviews_analyzed", "prompt_version",
+)
+
+REVIEW_COLUMNS = (
+    "id", "author", "rating", "date", "published_at", "text", "profile_picture", "first_seen_at",
+)
+
+
+class ExportRepository:
+    """
+    Streams rows straight from a server-side cursor as plain mappings, so an
+    export of any size holds only FETCH_ROWS rows in memory. The session
+    must stay open (and its transaction active) while the stream is consumed.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _stream(self, query) -> AsyncIterator[RowMapping]:
+        result = await self.db.stream(query.execution_options(yield_per=FETCH_ROWS))
+        async for row in result.mappings():
+            yield row
+
+    def stream_analyses(self, user_id: str, since: Optional[datetime] = None) -> AsyncIterator[RowMapping]:
+        """All of a user's reports with their findings, newest first."""
+        query = (
+            select(
+                AnalysisReport.id,
+                AnalysisReport.created_at,
+                Restaurant.name.label("restaurant_name"),
+                Restaurant.google_maps_url,
+                Restaurant.place_key,
+                AnalysisReport.sentiment_score,
+                AnalysisResult.summary,
+                AnalysisResult.complaints,
+                AnalysisResult.praises,
+                AnalysisResult.recommended_actions,
+                AnalysisResult.reviews_analyzed,
+                AnalysisResult.prompt_version,
+            )
+            .outerjoin(Restaurant, Restaurant.id == AnalysisReport.restaurant_id)
+            .outerjoin(AnalysisResult, AnalysisResult.id == AnalysisReport.result_id)
+            .where(AnalysisReport.user_id == user_id)
+        )
+        if since:
+            query = query.where(AnalysisReport.created_at >= since)
+        # Walks ix_analysis_reports_user_created
+        query = query.order_by(AnalysisReport.created_at.desc(), AnalysisReport.id.desc())
+        return self._stream(query)
+
+    def stream_reviews(self, place_key: str, as_of: Optional[datetime] = None) -> AsyncIterator[RowMapping]:
+        """
+        Every stored review of a place, newest first (ix_reviews_place_published).
+        `as_of` limits it to reviews first seen by then, as for a report's reviews.
+        """
+        query = (
+            select(
+                Review.id,
+                Review.author,
+                Review.rating,
+                Review.date_text.label("date"),
+                Review.published_at,
+                Review.text,
+                Review.profile_picture,
+                Review.first_seen_at,
+            )
+            .where(Review.place_key == place_key)
+        )
+        if as_of is not None:
+            query = query.where(Review.first_seen_at <= as_of)
+        query = query.order_by(Review.published_at.desc().nullslast(), Review.id.desc())
+        return self._stream(query)
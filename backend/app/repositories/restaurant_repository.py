@@ -1,10 +1,15 @@
 """Restaurant repository for database operations."""
-from typing import Optional, List
-from sqlalchemy import select
+from typing import Optional, List, Set, Tuple, Dict, Any
+from datetime import datetime
+from sqlalchemy import select, update, delete, func, case, tuple_, or_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, aliased
 
-from app.models.restaurant import Restaurant, AnalysisReport
+from app.models.restaurant import Restaurant, AnalysisReport, AnalysisResult
+from app.models.review import Review
+from app.services.ai_analyzer import PROMPT_VERSION
 
 
 class RestaurantRepository:
@@ -12,6 +17,8 @@ class RestaurantRepository:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        # Old keys whose reviews were re-keyed, for cache invalidation after commit
+        self.moved_keys: List[str] = []
     
     async def get_by_id(self, restaurant_id: int) -> Optional[Restaurant]:
         """Get restaurant by ID."""
@@ -42,6 +49,71 @@ class RestaurantRepository:
         restaurant = Restaurant(google_maps_url=google_maps_url, **kwargs)
         return await self.create(restaurant)
 
+    async def upsert_by_place_key(self, place_key: str, **fields) -> int:
+        """
+        Insert the restaurant for a canonical place, or refresh its details.
+        Does not commit.
+        
+        Both place_key and google_maps_url are unique, and a Maps link can
+        already be stored under another key (a `query:` key from before the
+        place_id was known, or another spelling scraped without one). The
+        insert therefore yields on either conflict, and the existing row is
+        updated instead, re-keyed onto `place_key` if needed.
+        """
+        stmt = insert(Restaurant).values(place_key=place_key, **fields).on_conflict_do_nothing().returning(Restaurant.id)
+        result = await self.db.execute(stmt)
+        inserted = result.scalar_one_or_none()
+        if inserted is not None:
+            return inserted
+        
+        # Prefer the row already on this key; otherwise the one with this link
+        conditions = [Restaurant.place_key == place_key]
+        if fields.get("google_maps_url"):
+            conditions.append(Restaurant.google_maps_url == fields["google_maps_url"])
+        result = await self.db.execute(
+            select(Restaurant.id, Restaurant.place_key)
+            .where(or_(*conditions))
+            .order_by((Restaurant.place_key == place_key).desc())
+            .limit(1)
+            .with_for_update()
+        )
+        existing = result.one()
+        
+        values = {
+            "name": fields.get("name"),
+            "address": fields.get("address"),
+            "rating": fields.get("rating"),
+            "total_reviews": fields.get("total_reviews"),
+            "place_id": func.coalesce(fields.get("place_id"), Restaurant.place_id),
+            "updated_at": func.now(),
+        }
+        if existing.place_key != place_key:
+            values["place_key"] = place_key
+            if existing.place_key:
+                await self._move_reviews(existing.place_key, place_key)
+        await self.db.execute(update(Restaurant).where(Restaurant.id == existing.id).values(**values))
+        return existing.id
+    
+    async def _move_reviews(self, old_key: str, place_key: str):
+        """
+        Re-key a place's stored reviews, as upgrade_places does. Reviews
+        already stored under the new key win the signature conflict but keep
+        the earlier first_seen_at, so older reports still list them.
+        """
+        await self.db.execute(text(
+            "UPDATE reviews AS n SET first_seen_at = o.first_seen_at FROM reviews AS o "
+            "WHERE o.place_key = :old AND n.place_key = :new AND n.signature = o.signature "
+            "AND o.first_seen_at < n.first_seen_at"
+        ), {"old": old_key, "new": place_key})
+        await self.db.execute(
+            update(Review)
+            .where(Review.place_key == old_key)
+            .where(~Review.signature.in_(select(Review.signature).where(Review.place_key == place_key)))
+            .values(place_key=place_key)
+        )
+        await self.db.execute(delete(Review).where(Review.place_key == old_key))
+        self.moved_keys.append(old_key)
+
 
 class AnalysisReportRepository:
     """Repository for AnalysisReport model database operations."""
@@ -69,9 +141,166 @@ class AnalysisReportRepository:
         )
         return list(result.scalars().all())
     
+    async def insert(self, **values: Any) -> Tuple[int, datetime]:
+        """Insert a report without loading it back. Returns (id, created_at); does not commit."""
+        result = await self.db.execute(
+            insert(AnalysisReport).values(**values).returning(AnalysisReport.id, AnalysisReport.created_at)
+        )
+        row = result.one()
+        return row.id, row.created_at
+    
     async def create(self, report: AnalysisReport) -> AnalysisReport:
         """Create a new analysis report."""
         self.db.add(report)
         await self.db.commit()
         await self.db.refresh(report)
         return report
+
+
+class AnalysisResultRepository:
+    """Repository for the shared AnalysisResult model."""
+    
+    # Columns produced by the analyzer
+    CONTENT_COLUMNS = (
+        "sentiment_score", "summary", "complaints", "praises",
+        "recommended_actions", "reviews_analyzed", "raw_ai_response", "is_fallback",
+    )
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_reusable(self, place_key: str, review_set_hash: str) -> Optional[AnalysisResult]:
+        """An existing AI result for exactly this review set of this place, from the current prompt."""
+        result = await self.db.execute(
+            select(AnalysisResult).where(
+                AnalysisResult.place_key == place_key,
+                AnalysisResult.review_set_hash == review_set_hash,
+                AnalysisResult.prompt_version == PROMPT_VERSION,
+                AnalysisResult.is_fallback.is_(False)
+            )
+        )
+        return result.scalar_one_or_none()
+    
+    def _row(self, place_key: str, review_set_hash: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "place_key": place_key,
+            "review_set_hash": review_set_hash,
+            "prompt_version": PROMPT_VERSION,
+            "sentiment_score": analysis["sentiment_score"],
+            "summary": analysis["summary"],
+            "complaints": analysis["complaints"],
+            "praises": analysis["praises"],
+            "recommended_actions": analysis.get("recommended_actions", []),
+            "reviews_analyzed": analysis["reviews_analyzed"],
+            "raw_ai_response": analysis,
+            "is_fallback": bool(analysis.get("is_fallback")),
+        }
+    
+    def _upsert_statement(self, rows: List[Dict[str, Any]]):
+        """A real AI result replaces a stored fallback, never the other way round."""
+        stmt = insert(AnalysisResult).values(rows)
+        replace = AnalysisResult.is_fallback & ~stmt.excluded.is_fallback
+        return stmt.on_conflict_do_update(
+            constraint="uq_analysis_results_version",
+            set_={
+                column: case((replace, getattr(stmt.excluded, column)), else_=getattr(AnalysisResult, column))
+                for column in self.CONTENT_COLUMNS
+            }
+        )
+    
+    async def upsert(self, place_key: str, review_set_hash: str, analysis: Dict[str, Any]) -> Row:
+        """
+        Store the result for a review set, or return the one already stored.
+        Returns the row as stored (id and content columns): a fallback that
+        lost to a stored real result comes back as the real one.
+        One INSERT ... ON CONFLICT ... RETURNING; does not commit.
+        """
+        stmt = self._upsert_statement([self._row(place_key, review_set_hash, analysis)])
+        returning = [AnalysisResult.id] + [getattr(AnalysisResult, column) for column in self.CONTENT_COLUMNS]
+        result = await self.db.execute(stmt.returning(*returning))
+        return result.one()
+    
+    async def upsert_many(self, analyses: List[Tuple[str, str, Dict[str, Any]]]) -> List[int]:
+        """Bulk upsert of (place_key, review_set_hash, analysis) in one statement. Does not commit."""
+        if not analyses:
+            return []
+        stmt = self._upsert_statement([self._row(*item) for item in analyses])
+        result = await self.db.execute(stmt.returning(AnalysisResult.id))
+        return list(result.scalars().all())
+    
+    async def current_versions(self, pairs: List[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """Which (place_key, review_set_hash) pairs already have a current-prompt result."""
+        if not pairs:
+            return set()
+        result = await self.db.execute(
+            select(AnalysisResult.place_key, AnalysisResult.review_set_hash).where(
+                tuple_(AnalysisResult.place_key, AnalysisResult.review_set_hash).in_(pairs),
+                AnalysisResult.prompt_version == PROMPT_VERSION,
+                AnalysisResult.is_fallback.is_(False)
+            )
+        )
+        return {(row.place_key, row.review_set_hash) for row in result.all()}
+    
+    async def repoint_reports(self, result_ids: List[int]) -> List[str]:
+        """
+        Move every report on an older version of the same review set to these
+        results, in one UPDATE. Returns the affected user ids. Does not commit.
+        """
+        if not result_ids:
+            return []
+        old = aliased(AnalysisResult)
+        new = aliased(AnalysisResult)
+        stmt = (
+            update(AnalysisReport)
+            .where(
+                AnalysisReport.result_id == old.id,
+                old.place_key == new.place_key,
+                old.review_set_hash == new.review_set_hash,
+                old.id != new.id,
+                new.id.in_(result_ids)
+            )
+            .values(result_id=new.id, sentiment_score=new.sentiment_score)
+            .returning(AnalysisReport.user_id)
+        )
+        result = await self.db.execute(stmt)
+        return [user_id for user_id in result.scalars().all() if user_id]
+    
+    async def sync_report_scores(self, result_id: int) -> List[Row]:
+        """
+        Copy the result's sentiment_score onto reports that still hold another
+        one (a real result replaced a fallback in place), in one UPDATE.
+        Returns (user_id, created_at, old_score, new_score) per changed report,
+        for StatsRepository.rescore_reports. Does not commit.
+        """
+        # Joined to itself, the FROM copy of the row still holds the old score.
+        # A Core alias: ORM aliases are left out of an UPDATE's RETURNING
+        before = AnalysisReport.__table__.alias("before")
+        stmt = (
+            update(AnalysisReport)
+            .where(
+                AnalysisReport.result_id == AnalysisResult.id,
+                AnalysisResult.id == result_id,
+                AnalysisReport.sentiment_score.is_distinct_from(AnalysisResult.sentiment_score),
+                before.c.id == AnalysisReport.id
+            )
+            .values(sentiment_score=AnalysisResult.sentiment_score)
+            .returning(
+                AnalysisReport.user_id,
+                AnalysisReport.created_at,
+                before.c.sentiment_score.label("old_score"),
+                AnalysisReport.sentiment_score.label("new_score")
+            )
+        )
+        result = await self.db.execute(stmt)
+        return [row for row in result.all() if row.user_id]
+    
+    def to_dict(self, result: AnalysisResult) -> Dict[str, Any]:
+        """The analyzer's output format, rebuilt from a stored result."""
+        return {
+            "sentiment_score": result.sentiment_score,
+            "summary": result.summary,
+            "complaints": result.complaints or [],
+            "praises": result.praises or [],
+            "recommended_actions": result.recommended_actions or [],
+            "reviews_analyzed": result.reviews_analyzed,
+        }
@@ -1,10 +1,28 @@
-from typing import Optional, List
-from sqlalchemy import select
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple
+from sqlalchemy import select, update, func, case, and_, or_, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.review import RawReview
+from app.models.review import RawReview, Review, ScrapePayload
+from app.services.payload_archive import PAYLOAD_KIND_REVIEWS
+from app.services.scraper import review_signature_hash, parse_review_date
+
+# Rows per INSERT statement (asyncpg allows at most 32767 bind parameters)
+UPSERT_CHUNK_SIZE = 1000
+
+# Parser output that upsert_many(reparse=True) overwrites on stored rows
+REPARSED_COLUMNS = ("author", "rating", "date_text", "published_at")
+
+# Columns copied into the import staging table, in COPY order
+COPY_COLUMNS = (
+    "place_key", "signature", "source_review_id", "author", "text",
+    "rating", "date_text", "published_at", "profile_picture",
+)
+
 
 class ReviewRepository:
-    """Repository for RawReview model database operations."""
+    """Repository for RawReview and Review model database operations."""
     
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -32,3 +50,202 @@ class ReviewRepository:
         
         new_review = RawReview(query=query, **kwargs)
         return await self.create(new_review)
+
+    async def upsert_many(
+        self,
+        place_key: str,
+        reviews: List[Dict[str, Any]],
+        scraped_at: Optional[datetime] = None,
+        reparse: bool = False
+    ) -> int:
+        """
+        Insert scraped reviews for a place, or refresh ones already stored.
+        With `reparse` (replaying archived payloads after a parser fix) the
+        parsed fields of stored rows are overwritten too, not just refreshed.
+        One INSERT ... ON CONFLICT per chunk; does not commit.
+        Returns the number of rows written.
+        """
+        rows = {}
+        for r in reviews:
+            signature = review_signature_hash(r)
+            # Same dedupe rule as the scraper: keep the longest text
+            if signature in rows and len(rows[signature]["text"] or "") >= len(r.get("text") or ""):
+                continue
+            rows[signature] = {
+                "place_key": place_key,
+                "signature": signature,
+                "source_review_id": str(r["review_id"])[:255] if r.get("review_id") else None,
+                "author": (r.get("author") or "")[:255],
+                "text": r.get("text"),
+                "rating": r.get("rating"),
+                "date_text": (r.get("date_text") or "")[:100],
+                "published_at": parse_review_date(r.get("date_text"), scraped_at),
+                "profile_picture": r.get("profile_picture"),
+            }
+
+        values = list(rows.values())
+        for start in range(0, len(values), UPSERT_CHUNK_SIZE):
+            stmt = insert(Review).values(values[start:start + UPSERT_CHUNK_SIZE])
+            set_ = {
+                "text": case(
+                    (func.length(stmt.excluded.text) > func.coalesce(func.length(Review.text), 0), stmt.excluded.text),
+                    else_=Review.text
+                ),
+                "profile_picture": stmt.excluded.profile_picture,
+                "last_seen_at": func.now(),
+            }
+            if reparse:
+                for column in REPARSED_COLUMNS:
+                    set_[column] = getattr(stmt.excluded, column)
+            stmt = stmt.on_conflict_do_update(constraint="uq_reviews_place_signature", set_=set_)
+            await self.db.execute(stmt)
+
+        return len(values)
+
+    async def copy_many(self, rows: List[Tuple]) -> int:
+        """
+        Bulk-load review rows (tuples in COPY_COLUMNS order, unique per
+        place_key/signature) with COPY into a session temp table, then merge
+        them into `reviews` in one statement using the same rules as
+        upsert_many. Does not commit. Returns the number of rows written.
+        """
+        if not rows:
+            return 0
+        await self.db.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS reviews_import_staging ("
+            " place_key text, signature text, source_review_id text, author text, text text,"
+            " rating float8, date_text text, published_at timestamptz, profile_picture text"
+            ") ON COMMIT DELETE ROWS"
+        ))
+        # Several batches may share one transaction
+        await self.db.execute(text("TRUNCATE reviews_import_staging"))
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "reviews_import_staging", records=rows, columns=list(COPY_COLUMNS)
+        )
+        columns = ", ".join(COPY_COLUMNS)
+        result = await self.db.execute(text(
+            f"INSERT INTO reviews ({columns}) SELECT {columns} FROM reviews_import_staging "
+            "ON CONFLICT ON CONSTRAINT uq_reviews_place_signature DO UPDATE SET "
+            "text = CASE WHEN length(EXCLUDED.text) > coalesce(length(reviews.text), 0) "
+            "THEN EXCLUDED.text ELSE reviews.text END, "
+            "profile_picture = coalesce(EXCLUDED.profile_picture, reviews.profile_picture), "
+            "last_seen_at = now()"
+        ))
+        return result.rowcount
+
+    async def upsert_scrape_metadata(
+        self,
+        place_key: str,
+        restaurant_info: Dict[str, Any],
+        total_reviews_collected: int,
+        scraped_at: datetime
+    ) -> None:
+        """One metadata row per place, written with a single upsert. Does not commit."""
+        stmt = insert(RawReview).values(
+            query=place_key,
+            restaurant_info=restaurant_info,
+            reviews=[],  # Legacy blob; rows live in `reviews`
+            total_reviews_collected=total_reviews_collected,
+            scraped_at=scraped_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RawReview.query],
+            set_={
+                "restaurant_info": stmt.excluded.restaurant_info,
+                "reviews": stmt.excluded.reviews,
+                "total_reviews_collected": stmt.excluded.total_reviews_collected,
+                "scraped_at": stmt.excluded.scraped_at,
+            }
+        )
+        await self.db.execute(stmt)
+
+    async def link_payload(
+        self,
+        place_key: Optional[str],
+        query: str,
+        payload: Dict[str, Any],
+        kind: str = PAYLOAD_KIND_REVIEWS
+    ) -> int:
+        """
+        Record which archived Gosom download a scrape or search came from.
+        The place key may not be known yet (set_payload_place). Does not commit.
+        """
+        fetched_at = datetime.fromisoformat(payload["fetched_at"])
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        result = await self.db.execute(
+            insert(ScrapePayload).values(
+                kind=kind,
+                place_key=place_key,
+                query=query[:2048],
+                job_id=payload.get("job_id"),
+                content_hash=payload["content_hash"],
+                content_type=payload.get("content_type"),
+                size_bytes=payload.get("size_bytes"),
+                compressed_bytes=payload.get("compressed_bytes"),
+                fetched_at=fetched_at,
+            ).returning(ScrapePayload.id)
+        )
+        return result.scalar_one()
+
+    async def set_payload_place(self, link_id: int, place_key: str) -> None:
+        """Attach the place a linked download turned out to be. Does not commit."""
+        await self.db.execute(
+            update(ScrapePayload).where(ScrapePayload.id == link_id).values(place_key=place_key)
+        )
+
+    async def count_for_place(self, place_key: str, as_of: Optional[datetime] = None) -> int:
+        """Number of stored reviews for a place (first seen by `as_of`, if given)."""
+        query = select(func.count()).select_from(Review).where(Review.place_key == place_key)
+        if as_of is not None:
+            query = query.where(Review.first_seen_at <= as_of)
+        result = await self.db.execute(query)
+        return result.scalar() or 0
+
+    async def list_page(
+        self,
+        place_key: str,
+        limit: int,
+        after: Optional[Tuple[Optional[datetime], int]] = None,
+        offset: int = 0,
+        as_of: Optional[datetime] = None
+    ) -> List[Row]:
+        """
+        Newest-first page of reviews for a place; undated reviews go last.
+        Returns plain rows with just the columns the API serves.
+        `after` is the (published_at, id) of the previous page's last row and
+        turns the query into an index range scan (keyset pagination).
+        `offset` is only for clients that still jump to page numbers.
+        `as_of` hides reviews first seen after that time (e.g. a report's
+        creation), which keeps the list for a report fixed.
+        """
+        query = select(
+            Review.id,
+            Review.published_at,
+            Review.text,
+            Review.rating,
+            Review.author,
+            Review.date_text,
+            Review.profile_picture,
+        ).where(Review.place_key == place_key)
+        if as_of is not None:
+            query = query.where(Review.first_seen_at <= as_of)
+
+        if after is not None:
+            after_published, after_id = after
+            if after_published is not None:
+                query = query.where(or_(
+                    Review.published_at < after_published,
+                    and_(Review.published_at == after_published, Review.id < after_id),
+                    Review.published_at.is_(None)
+                ))
+            else:
+                query = query.where(Review.published_at.is_(None), Review.id < after_id)
+        elif offset:
+            query = query.offset(offset)
+
+        query = query.order_by(Review.published_at.desc().nullslast(), Review.id.desc()).limit(limit)
+        result = await self.db.execute(query)
+        return list(result.all())
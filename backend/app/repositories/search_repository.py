@@ -0,0 +1,107 @@
+"""Full-text search over a user's report findings and scraped reviews."""
+from typing import List
+from sqlalchemy import select, func
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.restaurant import AnalysisReport, AnalysisResult, Restaurant, SEARCH_CONFIG
+from app.models.review import Review
+
+# ts_headline options: short fragments around the matched terms
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+def _query(text: str):
+    """Parse user input with web-search syntax ("cold food" -delivery OR late)."""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, text)
+
+
+class SearchRepository:
+    """Ranked, paginated search backed by the GIN tsvector indexes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search_findings(self, user_id: str, text: str, limit: int, offset: int = 0) -> List[Row]:
+        """
+        A user's reports whose complaints, praises or summary match `text`,
+        best match first. Headlines are only built for the returned page.
+        """
+        tsquery = _query(text)
+        ranked = (
+            select(
+                AnalysisReport.id,
+                AnalysisReport.result_id,
+                func.ts_rank_cd(AnalysisResult.findings_tsv, tsquery).label("rank"),
+            )
+            .join(AnalysisResult, AnalysisResult.id == AnalysisReport.result_id)
+            .where(AnalysisReport.user_id == user_id, AnalysisResult.findings_tsv.op("@@")(tsquery))
+            .order_by(func.ts_rank_cd(AnalysisResult.findings_tsv, tsquery).desc(), AnalysisReport.id.desc())
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        query = (
+            select(
+                AnalysisReport.id,
+                AnalysisReport.created_at,
+                AnalysisReport.sentiment_score,
+                Restaurant.name.label("restaurant_name"),
+                Restaurant.google_maps_url,
+                ranked.c.rank,
+                func.ts_headline(SEARCH_CONFIG, AnalysisResult.complaints, tsquery, HEADLINE_OPTIONS).label("complaints"),
+                func.ts_headline(SEARCH_CONFIG, AnalysisResult.praises, tsquery, HEADLINE_OPTIONS).label("praises"),
+                func.ts_headline(SEARCH_CONFIG, func.coalesce(AnalysisResult.summary, ""), tsquery, HEADLINE_OPTIONS).label("summary"),
+            )
+            .join(ranked, ranked.c.id == AnalysisReport.id)
+            .join(AnalysisResult, AnalysisResult.id == ranked.c.result_id)
+            .outerjoin(Restaurant, Restaurant.id == AnalysisReport.restaurant_id)
+            .order_by(ranked.c.rank.desc(), AnalysisReport.id.desc())
+        )
+        result = await self.db.execute(query)
+        return result.all()
+
+    async def search_reviews(self, user_id: str, text: str, limit: int, offset: int = 0) -> List[Row]:
+        """Reviews of restaurants the user has analyzed that match `text`, best match first."""
+        tsquery = _query(text)
+        places = (
+            select(
+                func.coalesce(Restaurant.place_key, Restaurant.google_maps_url).label("place_key"),
+                Restaurant.google_maps_url,
+                Restaurant.name,
+            )
+            .join(AnalysisReport, AnalysisReport.restaurant_id == Restaurant.id)
+            .where(AnalysisReport.user_id == user_id)
+            .distinct()
+            .subquery()
+        )
+        ranked = (
+            select(
+                Review.id,
+                places.c.name.label("restaurant_name"),
+                places.c.google_maps_url,
+                func.ts_rank_cd(Review.text_tsv, tsquery).label("rank"),
+            )
+            .join(places, places.c.place_key == Review.place_key)
+            .where(Review.text_tsv.op("@@")(tsquery))
+            .order_by(func.ts_rank_cd(Review.text_tsv, tsquery).desc(), Review.id.desc())
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        query = (
+            select(
+                Review.id,
+                ranked.c.google_maps_url,
+                Review.author,
+                Review.rating,
+                Review.date_text,
+                ranked.c.restaurant_name,
+                ranked.c.rank,
+                func.ts_headline(SEARCH_CONFIG, func.coalesce(Review.text, ""), tsquery, HEADLINE_OPTIONS).label("headline"),
+            )
+            .join(ranked, ranked.c.id == Review.id)
+            .order_by(ranked.c.rank.desc(), Review.id.desc())
+        )
+        result = await self.db.execute(query)
+        return result.all()
@@ -0,0 +1,184 @@
+"""Dashboard statistics repository backed by the user_daily_stats rollup."""
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, update, delete, func, case, cast, Date
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.restaurant import AnalysisReport
+from app.models.stats import UserDailyStats
+
+# Sentiment distribution thresholds (score > POSITIVE is positive, > NEUTRAL is neutral)
+POSITIVE_THRESHOLD = 0.6
+NEUTRAL_THRESHOLD = 0.2
+
+
+def sentiment_bucket(score: Optional[float]) -> str:
+    """Distribution bucket for a sentiment score."""
+    score = score or 0
+    if score > POSITIVE_THRESHOLD:
+        return "positive"
+    if score > NEUTRAL_THRESHOLD:
+        return "neutral"
+    return "negative"
+
+
+def rollup_day(created_at: datetime) -> date:
+    """The UTC day a report is counted under."""
+    return created_at.astimezone(timezone.utc).date() if created_at.tzinfo else created_at.date()
+
+
+class StatsRepository:
+    """Repository for dashboard statistics."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record_report(self, user_id: str, created_at: datetime, sentiment_score: Optional[float]) -> None:
+        """Fold one new report into the user's daily rollup. Does not commit."""
+        bucket = sentiment_bucket(sentiment_score)
+        stmt = insert(UserDailyStats).values(
+            user_id=user_id,
+            day=rollup_day(created_at),
+            report_count=1,
+            sentiment_sum=sentiment_score or 0,
+            positive_count=int(bucket == "positive"),
+            neutral_count=int(bucket == "neutral"),
+            negative_count=int(bucket == "negative"),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserDailyStats.user_id, UserDailyStats.day],
+            set_={
+                "report_count": UserDailyStats.report_count + stmt.excluded.report_count,
+                "sentiment_sum": UserDailyStats.sentiment_sum + stmt.excluded.sentiment_sum,
+                "positive_count": UserDailyStats.positive_count + stmt.excluded.positive_count,
+                "neutral_count": UserDailyStats.neutral_count + stmt.excluded.neutral_count,
+                "negative_count": UserDailyStats.negative_count + stmt.excluded.negative_count,
+                "updated_at": func.now(),
+            }
+        )
+        await self.db.execute(stmt)
+
+    async def rescore_reports(self, changes: Iterable[Tuple[str, datetime, Optional[float], Optional[float]]]) -> None:
+        """
+        Move reports whose score changed (user_id, created_at, old_score,
+        new_score) from their old contribution to the new one, with one UPDATE
+        per user and day. Does not commit.
+        """
+        deltas: Dict[Tuple[str, date], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for user_id, created_at, old_score, new_score in changes:
+            delta = deltas[(user_id, rollup_day(created_at))]
+            delta["sentiment_sum"] += (new_score or 0) - (old_score or 0)
+            delta[f"{sentiment_bucket(old_score)}_count"] -= 1
+            delta[f"{sentiment_bucket(new_score)}_count"] += 1
+
+        for (user_id, day), delta in deltas.items():
+            await self.db.execute(
+                update(UserDailyStats)
+                .where(UserDailyStats.user_id == user_id, UserDailyStats.day == day)
+                .values(
+                    updated_at=func.now(),
+                    **{
+                        column: getattr(UserDailyStats, column) + (change if column == "sentiment_sum" else int(change))
+                        for column, change in delta.items() if change
+                    }
+                )
+            )
+
+    async def get_summary(self, user_id: str, start_day: date) -> Dict:
+        """Totals and distribution over the window, summed from the rollup."""
+        result = await self.db.execute(
+            select(
+                func.coalesce(func.sum(UserDailyStats.report_count), 0).label("total"),
+                func.coalesce(func.sum(UserDailyStats.sentiment_sum), 0.0).label("sentiment_sum"),
+                func.coalesce(func.sum(UserDailyStats.positive_count), 0).label("positive"),
+                func.coalesce(func.sum(UserDailyStats.neutral_count), 0).label("neutral"),
+                func.coalesce(func.sum(UserDailyStats.negative_count), 0).label("negative"),
+            ).where(
+                UserDailyStats.user_id == user_id,
+                UserDailyStats.day >= start_day
+            )
+        )
+        row = result.one()
+        return {
+            "total_analyzed": int(row.total),
+            "avg_sentiment": round(row.sentiment_sum / row.total, 2) if row.total else 0,
+            "sentiment_distribution": {
+                "positive": int(row.positive),
+                "neutral": int(row.neutral),
+                "negative": int(row.negative),
+            },
+        }
+
+    async def count_reports(self, user_id: str) -> int:
+        """All of the user's reports, summed from the rollup (one row per active day)."""
+        result = await self.db.execute(
+            select(func.coalesce(func.sum(UserDailyStats.report_count), 0))
+            .where(UserDailyStats.user_id == user_id)
+        )
+        return int(result.scalar_one())
+
+    async def get_daily_trend(self, user_id: str, start_day: date) -> List[Dict]:
+        """One point per day with reports: volume and average sentiment."""
+        result = await self.db.execute(
+            select(UserDailyStats.day, UserDailyStats.report_count, UserDailyStats.sentiment_sum)
+            .where(UserDailyStats.user_id == user_id, UserDailyStats.day >= start_day)
+            .order_by(UserDailyStats.day)
+        )
+        return [
+            {
+                "date": row.day.isoformat(),
+                "volume": row.report_count,
+                "avg_sentiment": round(row.sentiment_sum / row.report_count, 2) if row.report_count else 0,
+            }
+            for row in result.all()
+        ]
+
+    async def rebuild(self, user_id: Optional[str] = None) -> int:
+        """
+        Recompute the rollup from analysis_reports entirely in SQL
+        (UTC date_trunc day buckets, CASE-bucketed distribution).
+        Used to backfill history that predates the rollup. Existing rows of
+        the user (or everyone) are replaced, so days that no longer have
+        reports disappear too. Does not commit.
+        """
+        stale = delete(UserDailyStats)
+        if user_id:
+            stale = stale.where(UserDailyStats.user_id == user_id)
+        await self.db.execute(stale)
+
+        score = func.coalesce(AnalysisReport.sentiment_score, 0)
+        # UTC days like record_report, whatever the session time zone is
+        day = cast(func.date_trunc("day", func.timezone("UTC", AnalysisReport.created_at)), Date)
+        source = select(
+            AnalysisReport.user_id,
+            day.label("day"),
+            func.count().label("report_count"),
+            func.sum(score).label("sentiment_sum"),
+            func.sum(case((score > POSITIVE_THRESHOLD, 1), else_=0)).label("positive_count"),
+            func.sum(case((score > POSITIVE_THRESHOLD, 0), (score > NEUTRAL_THRESHOLD, 1), else_=0)).label("neutral_count"),
+            func.sum(case((score > NEUTRAL_THRESHOLD, 0), else_=1)).label("negative_count"),
+            func.now().label("updated_at"),
+        ).where(AnalysisReport.user_id.is_not(None)).group_by(AnalysisReport.user_id, day)
+        if user_id:
+            source = source.where(AnalysisReport.user_id == user_id)
+
+        stmt = insert(UserDailyStats).from_select(
+            ["user_id", "day", "report_count", "sentiment_sum",
+             "positive_count", "neutral_count", "negative_count", "updated_at"],
+            source
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserDailyStats.user_id, UserDailyStats.day],
+            set_={
+                "report_count": stmt.excluded.report_count,
+                "sentiment_sum": stmt.excluded.sentiment_sum,
+                "positive_count": stmt.excluded.positive_count,
+                "neutral_count": stmt.excluded.neutral_count,
+                "negative_count": stmt.excluded.negative_count,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        )
+        result = await self.db.execute(stmt)
+        return result.rowcount
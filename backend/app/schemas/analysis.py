@@ -12,6 +12,9 @@ class AnalyzeResponse(BaseModel):
     task_id: str
     status: str = "PENDING"
     message: str
+    queue_position: Optional[int] = None
+    estimated_wait_seconds: Optional[float] = None
+    estimated_completion_at: Optional[datetime] = None
 
 
 class TaskStatusResponse(BaseModel):
@@ -41,6 +44,16 @@ class AnalysisResultSchema(BaseModel):
     status: str = "COMPLETED"
 
 
+class AnalysisBatchRequest(BaseModel):
+    user_id: str
+    ids: List[int] = Field(..., min_length=1, description="Analysis IDs to fetch")
+
+
+class AnalysisBatchResponse(BaseModel):
+    items: List[AnalysisResultSchema]  # In the order requested, duplicates removed
+    missing: List[int] = Field(default_factory=list)  # Unknown, not owned by the user, or not finished
+
+
 class RestaurantSchema(BaseModel):
     id: int
     name: str
@@ -70,7 +83,9 @@ class AnalysisHistoryItem(BaseModel):
 
 class AnalysisHistoryResponse(BaseModel):
     items: List[AnalysisHistoryItem]
-    total: int
+    total: int = 0  # From the stats rollup; counted exactly with include_total=true
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
 
 
 class ReviewItem(BaseModel):
@@ -84,5 +99,37 @@ class ReviewItem(BaseModel):
 
 class ReviewListResponse(BaseModel):
     restaurant_name: str
-    total_reviews: int
+    total_reviews: Optional[int] = None  # Omitted when include_total=false
     reviews: List[ReviewItem]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
+
+
+# List endpoints build plain, JSON-ready dicts in the shape of the models above
+# and hand them to ORJSONResponse (and the dashboard cache), skipping per-item
+# model construction, validation and re-encoding. Keep these in step with
+# AnalysisHistoryItem and ReviewItem.
+
+def history_item_dict(row) -> dict:
+    """AnalysisHistoryItem for a history query row."""
+    return {
+        "id": row.id,
+        "restaurant_name": row.restaurant_name or "Unknown Restaurant",
+        "sentiment_score": row.sentiment_score,
+        "summary": row.summary,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "status": "COMPLETED",
+        "recommended_actions": [],
+        "google_maps_url": row.google_maps_url,
+    }
+
+
+def review_item_dict(row) -> dict:
+    """ReviewItem for a reviews row."""
+    return {
+        "text": row.text,
+        "rating": row.rating,
+        "author": row.author,
+        "date": row.date_text,
+        "profile_picture": row.profile_picture,
+        "source": "Google Maps",
+    }
@@ -37,3 +37,45 @@ class AnalyzeByPlaceRequest(BaseModel):
     place_url: str = Field(..., description="Google Maps URL of the place")
     place_name: str = Field(..., description="Name of the place")
     user_id: Optional[str] = Field(None, description="User ID for tracking history")
+
+
+class BulkPlaceItem(BaseModel):
+    """A single place within a bulk analysis request."""
+    place_url: str = Field(..., description="Google Maps URL of the place")
+    place_name: str = Field("", description="Name of the place")
+
+
+class BulkAnalyzeRequest(BaseModel):
+    """Request to analyze many places (e.g. every branch of a chain) at once."""
+    places: List[BulkPlaceItem] = Field(..., min_length=1, description="Places to analyze")
+    user_id: Optional[str] = Field(None, description="User ID for tracking history")
+
+
+class BulkAnalyzeResponse(BaseModel):
+    """Response after a bulk analysis has been queued."""
+    batch_id: str
+    total: int
+    status: str = "PENDING"
+    message: str
+
+
+class BatchItemStatus(BaseModel):
+    """Progress of a single place within a batch."""
+    task_id: str
+    place_url: str
+    place_name: str = ""
+    status: str
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class BatchStatusResponse(BaseModel):
+    """Aggregate progress of a bulk analysis."""
+    batch_id: str
+    status: str
+    total: int
+    completed: int = 0
+    failed: int = 0
+    pending: int = 0
+    progress: float = Field(0.0, description="Finished fraction, 0.0 - 1.0")
+    items: List[BatchItemStatus] = Field(default_factory=list)
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class FindingHit(BaseModel):
+    analysis_id: int
+    restaurant_name: Optional[str] = None
+    google_maps_url: Optional[str] = None
+    sentiment_score: Optional[float] = None
+    created_at: datetime
+    rank: float
+    matched_complaints: List[str] = Field(default_factory=list)  # Highlighted with <mark>
+    matched_praises: List[str] = Field(default_factory=list)
+    summary_headline: Optional[str] = None
+
+
+class ReviewHit(BaseModel):
+    review_id: int
+    restaurant_name: Optional[str] = None
+    google_maps_url: str
+    author: Optional[str] = None
+    rating: Optional[float] = None
+    date: Optional[str] = None
+    rank: float
+    headline: str
+
+
+class SearchResponse(BaseModel):
+    query: str
+    scope: str
+    limit: int
+    offset: int
+    findings: List[FindingHit] = Field(default_factory=list)
+    reviews: List[ReviewHit] = Field(default_factory=list)
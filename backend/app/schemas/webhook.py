@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field, HttpUrl
+from typing import List, Optional
+from datetime import datetime
+
+
+class WebhookEndpointCreate(BaseModel):
+    url: HttpUrl = Field(..., description="HTTPS URL that receives signed event batches")
+    description: Optional[str] = Field(None, max_length=255)
+
+
+class WebhookEndpointUpdate(BaseModel):
+    url: Optional[HttpUrl] = None
+    description: Optional[str] = Field(None, max_length=255)
+    is_active: Optional[bool] = None
+
+
+class WebhookEndpoint(BaseModel):
+    id: int
+    url: str
+    description: Optional[str] = None
+    is_active: bool
+    consecutive_failures: int = 0
+    last_success_at: Optional[datetime] = None
+    last_failure_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookEndpointCreated(WebhookEndpoint):
+    """Returned once on creation; the secret is not shown again."""
+    secret: str
+
+
+class WebhookDelivery(BaseModel):
+    id: int
+    event_id: str
+    event_type: str
+    status: str
+    attempts: int
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    delivered_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookDeliveryList(BaseModel):
+    items: List[WebhookDelivery]
@@ -6,6 +6,10 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt or scoring changes; results from older versions
+# are not reused and can be regenerated with `python -m app.cli.reprocess`.
+PROMPT_VERSION = 1
+
 
 class GeminiAnalyzer:
     
@@ -165,5 +169,6 @@ Rules:
             "complaints": ["Analysis unavailable - AI service error"],
             "praises": ["Analysis unavailable - AI service error"],
             "recommended_actions": [],
-            "reviews_analyzed": len(reviews)
+            "reviews_analyzed": len(reviews),
+            "is_fallback": True  # Never shared with other users (see AnalysisResult)
         }
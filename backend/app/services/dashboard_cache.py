@@ -0,0 +1,114 @@
+"""
+Per-user cache for dashboard endpoints (/analyses, /analyses/stats).
+
+Entries are keyed by a per-user version number. Storing a new report bumps
+the version (and announces it on a pub/sub channel), which makes every
+older entry unreachable at once, so the dashboard never serves stale data
+after a report lands and never needs to hunt down individual keys.
+
+Review pages are per place rather than per user: their entries also carry
+the place's review version, which every review write replaces, and are only
+served while it still matches.
+"""
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "dashboard_invalidations"
+
+
+def _version_key(user_id: str) -> str:
+    return f"dashboard:{user_id}:version"
+
+
+def _reviews_version_key(place_key: str) -> str:
+    return f"reviews:{place_key}:version"
+
+
+def _entry_key(user_id: str, version: str, name: str, params: Dict[str, Any]) -> str:
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    return f"dashboard:{user_id}:v{version}:{name}:{digest}"
+
+
+class DashboardCache:
+    """Read-through helper used by the dashboard endpoints."""
+
+    def __init__(self, client: Optional[redis.Redis]):
+        self.client = client
+
+    async def get(self, user_id: str, name: str, params: Dict[str, Any]) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Return (cached value or None, version).
+        Pass the version back to set() so a value computed while a new
+        report landed is stored under the old, already-dead version.
+        """
+        if not self.client or not user_id:
+            return None, None
+        try:
+            version = await self.client.get(_version_key(user_id)) or "0"
+            raw = await self.client.get(_entry_key(user_id, version, name, params))
+            return (json.loads(raw) if raw else None), version
+        except Exception as e:
+            logger.warning(f"Dashboard cache read failed: {e}")
+            return None, None
+
+    async def set(self, user_id: str, name: str, params: Dict[str, Any], value: Any, version: Optional[str]):
+        if not self.client or not user_id or version is None:
+            return
+        try:
+            await self.client.setex(
+                _entry_key(user_id, version, name, params),
+                settings.DASHBOARD_CACHE_TTL_SECONDS,
+                json.dumps(value, default=str)
+            )
+        except Exception as e:
+            logger.warning(f"Dashboard cache write failed: {e}")
+
+
+async def invalidate_dashboard(client: redis.Redis, user_id: Optional[str]):
+    """Bump the user's dashboard version. Call after the new report is committed."""
+    if not user_id:
+        return
+    try:
+        version = await client.incr(_version_key(user_id))
+        await client.publish(INVALIDATION_CHANNEL, json.dumps({"user_id": user_id, "version": version}))
+    except Exception as e:
+        logger.warning(f"Dashboard cache invalidation failed for {user_id}: {e}")
+
+
+async def reviews_version(client: Optional[redis.Redis], place_key: str) -> Optional[str]:
+    """The place's current review version (None until its reviews are first rewritten)."""
+    if not client:
+        return None
+    try:
+        return await client.get(_reviews_version_key(place_key))
+    except Exception as e:
+        logger.warning(f"Review version read failed for {place_key}: {e}")
+        return None
+
+
+async def invalidate_reviews(client: Optional[redis.Redis], place_keys: Iterable[str]):
+    """
+    Give these places a new review version. Call after review writes are committed.
+    A fresh token rather than a counter, so a version that expired and was set
+    again never matches an entry cached before; it outlives those entries.
+    """
+    place_keys = [key for key in place_keys if key]
+    if not client or not place_keys:
+        return
+    token = str(time.time_ns())
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for place_key in place_keys:
+                pipe.setex(_reviews_version_key(place_key), settings.DASHBOARD_CACHE_TTL_SECONDS, token)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Review version bump failed for {place_keys}: {e}")
@@ -0,0 +1,72 @@
+"""
+Encoders for streamed data exports.
+
+Rows arrive one at a time from a server-side cursor and leave as text
+chunks for a StreamingResponse; nothing is buffered beyond one chunk.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+# Rows encoded per chunk handed to the response
+CHUNK_ROWS = 500
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    """Flatten a value into one CSV cell (lists and objects as JSON)."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def encode_rows(
+    rows: AsyncIterator[Mapping[str, Any]],
+    columns: Sequence[str],
+    export_format: ExportFormat
+) -> AsyncIterator[str]:
+    """Encode rows as NDJSON lines or CSV (with a header), CHUNK_ROWS at a time."""
+    buffer = io.StringIO()
+    writer = None
+    if export_format == ExportFormat.CSV:
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+
+    count = 0
+    async for row in rows:
+        if writer:
+            writer.writerow([_csv_value(row[column]) for column in columns])
+        else:
+            buffer.write(json.dumps({column: row[column] for column in columns}, default=_json_default, ensure_ascii=False))
+            buffer.write("\n")
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,99 @@
+"""
+Content-addressed, zstd-compressed archive of raw Gosom download bodies.
+
+Each body is stored once under `<root>/<hash[:2]>/<hash>.zst`, keyed by
+the SHA-256 of the uncompressed bytes, and linked to its scrape by a
+ScrapePayload row committed right after the write. Review scrapes and
+place searches are both archived (ScrapePayload.kind). Archived review
+payloads can be fed back through parse_gosom_download/build_scrape_result
+(app.cli.replay_payloads) to reprocess or benchmark without touching the
+network.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+import zstandard
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ScrapePayload.kind
+PAYLOAD_KIND_REVIEWS = "reviews"  # One place with its reviews (GoogleMapsScraper)
+PAYLOAD_KIND_SEARCH = "search"  # Place search results (PlaceSearchService)
+
+
+class ArchivedPayload(NamedTuple):
+    content_hash: str
+    size_bytes: int
+    compressed_bytes: int
+
+
+class PayloadArchive:
+    """Filesystem-backed archive (a mounted volume or object-storage FUSE mount)."""
+
+    def __init__(self, root: str = None, level: int = None):
+        self.root = Path(root or settings.PAYLOAD_ARCHIVE_DIR)
+        self.level = level if level is not None else settings.PAYLOAD_ARCHIVE_ZSTD_LEVEL
+
+    def path_for(self, content_hash: str) -> Path:
+        return self.root / content_hash[:2] / f"{content_hash}.zst"
+
+    def store(self, body: bytes) -> ArchivedPayload:
+        """Archive a payload. Identical bodies are stored once."""
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self.path_for(content_hash)
+        if path.exists():
+            return ArchivedPayload(content_hash, len(body), path.stat().st_size)
+
+        compressed = zstandard.ZstdCompressor(level=self.level).compress(body)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return ArchivedPayload(content_hash, len(body), len(compressed))
+
+    def load(self, content_hash: str) -> bytes:
+        with open(self.path_for(content_hash), "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read(), max_output_size=2 ** 31)
+
+    def iter_hashes(self) -> Iterator[str]:
+        """Every archived payload, for replaying the whole corpus."""
+        for path in sorted(self.root.glob("*/*.zst")):
+            yield path.stem
+
+
+async def archive_download(body: bytes, job_id: str, content_type: Optional[str], fetched_at: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Archive a Gosom download off the event loop. Returns what the
+    ScrapePayload link needs, or None when archiving is disabled or fails:
+    archive failures never fail the scrape.
+    """
+    if not settings.PAYLOAD_ARCHIVE_ENABLED:
+        return None
+    try:
+        archived = await asyncio.to_thread(PayloadArchive().store, body)
+    except Exception as e:
+        logger.warning(f"Failed to archive Gosom payload for job {job_id}: {e}")
+        return None
+    return {
+        'content_hash': archived.content_hash,
+        'size_bytes': archived.size_bytes,
+        'compressed_bytes': archived.compressed_bytes,
+        'content_type': (content_type or '')[:100],
+        'job_id': job_id,
+        'fetched_at': fetched_at.isoformat()
+    }
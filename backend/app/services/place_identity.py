@@ -0,0 +1,120 @@
+"""
+Canonical place identity.
+
+Users reach the same branch through many strings: "mcdonalds kazasker",
+"McDonalds  Kazasker", the Maps URL from place search, a shared Maps link.
+Every one of them is normalized into an alias and mapped to a single
+place key derived from Google's place_id, so scrapes, stored reviews,
+restaurants and caches are shared instead of duplicated per spelling.
+"""
+import logging
+import re
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+import redis.asyncio as redis
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.place import PlaceAlias
+
+logger = logging.getLogger(__name__)
+
+ALIAS_CACHE_TTL_SECONDS = 7 * 86400
+
+# Maps URLs carry the place_id as "!19sChIJ..." (place pages) or
+# "query_place_id=ChIJ..." (search links)
+PLACE_ID_PATTERN = re.compile(r"(?:!19s|query_place_id=|place_id[:=])(ChIJ[\w-]+)")
+
+# URL parameters that change per visit but never change the place
+IGNORED_URL_PARAMS = {"hl", "gl", "entry", "g_ep", "authuser", "shorturl", "utm_source", "utm_medium", "utm_campaign"}
+
+
+def normalize_place_alias(query: str) -> str:
+    """Stable lookup form of a free-text query or Maps URL."""
+    query = (query or "").strip()
+    if query.lower().startswith(("http://", "https://")):
+        parts = urlsplit(query)
+        params = sorted((k, v) for k, v in parse_qsl(parts.query) if k not in IGNORED_URL_PARAMS)
+        path = unquote(parts.path).rstrip("/")
+        normalized = f"{parts.netloc.lower()}{path}"
+        return f"{normalized}?{urlencode(params)}" if params else normalized
+    return " ".join(query.casefold().split())
+
+
+def extract_place_id(query: str) -> Optional[str]:
+    """Google place_id embedded in a Maps URL, if any."""
+    match = PLACE_ID_PATTERN.search(unquote(query or ""))
+    return match.group(1) if match else None
+
+
+def canonical_place_key(place_id: Optional[str], query: str) -> str:
+    """Place key for storage and caches; falls back to the alias when Google gave no place_id."""
+    if place_id:
+        return f"place:{place_id}"
+    return f"query:{normalize_place_alias(query)}"
+
+
+def _cache_key(alias: str) -> str:
+    return f"place_alias:{alias}"
+
+
+class PlaceResolver:
+    """Maps queries to canonical place keys (Redis in front of place_aliases)."""
+
+    def __init__(self, db: AsyncSession, redis_client: Optional[redis.Redis] = None):
+        self.db = db
+        self.redis = redis_client
+
+    async def resolve(self, query: str) -> Optional[str]:
+        """Canonical key for a query, or None if the place has never been seen."""
+        place_id = extract_place_id(query)
+        if place_id:
+            return canonical_place_key(place_id, query)
+
+        alias = normalize_place_alias(query)
+        if self.redis:
+            try:
+                cached = await self.redis.get(_cache_key(alias))
+                if cached:
+                    return cached
+            except Exception as e:
+                logger.warning(f"Place alias cache read failed: {e}")
+
+        result = await self.db.execute(select(PlaceAlias.place_key).where(PlaceAlias.alias == alias))
+        place_key = result.scalar_one_or_none()
+        if place_key:
+            await self._cache(alias, place_key)
+        return place_key
+
+    async def record(self, place_key: str, place_id: Optional[str], aliases: Iterable[str]):
+        """Point every alias at the canonical place. Does not commit."""
+        rows = {}
+        for query in aliases:
+            alias = normalize_place_alias(query)
+            if alias:
+                rows[alias] = {"alias": alias[:2048], "place_key": place_key, "place_id": place_id or None}
+        if not rows:
+            return
+
+        stmt = insert(PlaceAlias).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PlaceAlias.alias],
+            set_={
+                "place_key": stmt.excluded.place_key,
+                "place_id": func.coalesce(stmt.excluded.place_id, PlaceAlias.place_id),
+                "last_used_at": func.now(),
+            }
+        )
+        await self.db.execute(stmt)
+        for alias in rows:
+            await self._cache(alias, place_key)
+
+    async def _cache(self, alias: str, place_key: str):
+        if not self.redis:
+            return
+        try:
+            await self.redis.setex(_cache_key(alias), ALIAS_CACHE_TTL_SECONDS, place_key)
+        except Exception as e:
+            logger.warning(f"Place alias cache write failed: {e}")
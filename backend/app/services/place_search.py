@@ -12,7 +12,11 @@ import time
 from typing import Any, Dict, List
 
 import json
-from app.core.database import RedisClient
+from datetime import datetime
+from app.core.database import RedisClient, async_session_maker
+from app.repositories.review_repository import ReviewRepository
+from app.services.payload_archive import PAYLOAD_KIND_SEARCH, archive_download
+from app.services.place_identity import PlaceResolver, canonical_place_key, normalize_place_alias
 import httpx
 
 # Increase CSV field size limit
@@ -52,7 +56,7 @@ class PlaceSearchService:
 
         # Check Cache
         try:
-            cache_key = f"place_search:{query.lower().strip()}:{limit}"
+            cache_key = f"place_search:{normalize_place_alias(query)}:{limit}"
             redis_client = RedisClient.get_client()
             
             if redis_client:
@@ -94,7 +98,7 @@ class PlaceSearchService:
                     status = (job_status.get("Status") or job_status.get("status", "")).lower()
 
                     if status in ["completed", "ok", "done", "success"]:
-                        results = await self._download_and_parse_places(job_id)
+                        results = await self._download_and_parse_places(job_id, query)
                         
                         # Cache results
                         try:
@@ -102,7 +106,8 @@ class PlaceSearchService:
                                 await redis_client.setex(cache_key, 86400, json.dumps(results))
                         except Exception as e:
                             logger.error(f"Redis set error: {e}")
-                            
+                        
+                        await self._remember_places(results, redis_client)
                         return results
                     elif status in ["failed", "error"]:
                         logger.error(f"Search job failed: {job_status}")
@@ -117,12 +122,41 @@ class PlaceSearchService:
             logger.error(f"Place search error: {e}")
             return []
 
-    async def _download_and_parse_places(self, job_id: str) -> List[Dict[str, Any]]:
-        """Download and parse place results from Gosom."""
+    async def _remember_places(self, places: List[Dict[str, Any]], redis_client=None):
+        """Record each result's Maps link as an alias of its canonical place."""
+        known = [p for p in places if p.get("place_id") and p.get("link")]
+        if not known:
+            return
+        try:
+            async with async_session_maker() as session:
+                resolver = PlaceResolver(session, redis_client)
+                for place in known:
+                    await resolver.record(canonical_place_key(place["place_id"], place["link"]), place["place_id"], [place["link"]])
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to record place aliases: {e}")
+
+    async def _archive_results(self, query: str, job_id: str, results_res: httpx.Response):
+        """Keep the raw search download, linked in its own commit. Never fails the search."""
+        archived = await archive_download(
+            results_res.content, job_id, results_res.headers.get("content-type"), datetime.utcnow()
+        )
+        if not archived:
+            return
+        try:
+            async with async_session_maker() as session:
+                await ReviewRepository(session).link_payload(None, query, archived, kind=PAYLOAD_KIND_SEARCH)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to link archived search payload {archived['content_hash']}: {e}")
+
+    async def _download_and_parse_places(self, job_id: str, query: str) -> List[Dict[str, Any]]:
+        """Download, archive and parse place results from Gosom."""
         try:
             results_res = await self.client.get(f"{self.base_url}/api/v1/jobs/{job_id}/download")
             if results_res.status_code != 200:
                 return []
+            await self._archive_results(query, job_id, results_res)
 
             # Try JSON first
             try:
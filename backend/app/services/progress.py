@@ -0,0 +1,141 @@
+"""
+Stage-level task progress events over Redis pub/sub.
+
+Workers publish an event each time an analysis moves to a new stage. The
+latest event is also kept under a short-lived key so a client that connects
+late (or reconnects) immediately gets the current stage before live updates.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional
+
+import redis.asyncio as redis
+from redis import Redis
+
+from app.core.config import settings
+from app.core.database import create_redis_client
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TTL_SECONDS = 3600
+
+
+class TaskStage:
+    QUEUED = "queued"
+    STARTED = "started"
+    SCRAPING = "scraping"
+    SCRAPED = "scraped"
+    ANALYZING = "analyzing"
+    STORING = "storing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+TERMINAL_STAGES = {TaskStage.COMPLETED, TaskStage.FAILED}
+
+
+def progress_channel(task_id: str) -> str:
+    return f"task_progress:{task_id}"
+
+
+def progress_last_key(task_id: str) -> str:
+    return f"task_progress:{task_id}:last"
+
+
+class ProgressPublisher:
+    """Publishes progress events for one task. Failures never break the task."""
+
+    def __init__(self, task_id: str, client: Optional[redis.Redis] = None):
+        self.task_id = task_id
+        self._owns_client = client is None
+        self.client = client or create_redis_client()
+
+    async def publish(self, stage: str, **data):
+        event = {
+            "task_id": self.task_id,
+            "stage": stage,
+            "timestamp": datetime.utcnow().isoformat(),
+            **data
+        }
+        payload = json.dumps(event, default=str)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.setex(progress_last_key(self.task_id), PROGRESS_TTL_SECONDS, payload)
+                pipe.publish(progress_channel(self.task_id), payload)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish progress for task {self.task_id}: {e}")
+
+    async def close(self):
+        if self._owns_client:
+            await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+def publish_failure_sync(task_id: str, error: str):
+    """
+    Worker side: mark a task FAILED unless it already reached a terminal stage.
+    For tasks that died without publishing (hard time limit, lost worker,
+    revoke), so progress streams waiting on them can close.
+    """
+    try:
+        client = Redis.from_url(settings.redis_url)
+        last = client.get(progress_last_key(task_id))
+        if last and json.loads(last).get("stage") in TERMINAL_STAGES:
+            client.close()
+            return
+        payload = json.dumps({
+            "task_id": task_id,
+            "stage": TaskStage.FAILED,
+            "timestamp": datetime.utcnow().isoformat(),
+            "error": error,
+        })
+        pipe = client.pipeline(transaction=False)
+        pipe.setex(progress_last_key(task_id), PROGRESS_TTL_SECONDS, payload)
+        pipe.publish(progress_channel(task_id), payload)
+        pipe.execute()
+        client.close()
+    except Exception as e:
+        logger.warning(f"Failed to publish failure for task {task_id}: {e}")
+
+
+async def stream_progress(
+    client: redis.Redis,
+    task_id: str,
+    keepalive_seconds: float = 15.0
+) -> AsyncIterator[Optional[Dict]]:
+    """
+    Yield progress events for a task until it reaches a terminal stage.
+    Yields None every `keepalive_seconds` without events so callers can
+    send keep-alives and notice disconnected clients.
+    """
+    pubsub = client.pubsub()
+    # Subscribe before reading the last event so nothing published in between is lost
+    await pubsub.subscribe(progress_channel(task_id))
+    try:
+        last = await client.get(progress_last_key(task_id))
+        if last:
+            event = json.loads(last)
+            yield event
+            if event.get("stage") in TERMINAL_STAGES:
+                return
+
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=keepalive_seconds)
+            if message is None:
+                yield None
+                continue
+
+            event = json.loads(message["data"])
+            yield event
+            if event.get("stage") in TERMINAL_STAGES:
+                return
+    finally:
+        await pubsub.unsubscribe(progress_channel(task_id))
+        await pubsub.close()
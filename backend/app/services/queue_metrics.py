@@ -0,0 +1,163 @@
+"""
+Queue depth, worker capacity and stage-duration tracking.
+
+Workers report how long each analysis stage takes (exponential moving
+average) and advertise their concurrency with a heartbeat in a registry
+(a sorted set of last-beat times plus a hash of concurrencies). The API
+combines those with the broker queue length to estimate how long a new
+request will wait, to refuse work it cannot finish within the SLO, and to
+give the autoscaler the same numbers.
+"""
+import logging
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STAGE_EWMA_KEY = "metrics:stage_ewma"
+WORKERS_SEEN_KEY = "workers:seen"  # Sorted set: hostname -> last heartbeat (epoch seconds)
+WORKERS_CONCURRENCY_KEY = "workers:concurrency"  # Hash: hostname -> concurrency
+WORKER_HEARTBEAT_SECONDS = 10
+# A worker that missed this many heartbeats is considered gone
+WORKER_EXPIRY_SECONDS = WORKER_HEARTBEAT_SECONDS * 3
+EWMA_WEIGHT = 0.2
+
+# Used until workers have reported real durations
+DEFAULT_STAGE_SECONDS = {
+    "scrape": 90.0,
+    "analyze": 20.0,
+    "store": 1.0,
+    "total": 120.0,
+}
+
+# Matches broker_transport_options in celery_app: priority 0 lives in the
+# bare queue key, the rest in "<queue>:<priority>".
+DEFAULT_QUEUE = "celery"
+PRIORITY_STEPS = range(10)
+
+
+def _queue_key(priority: int) -> str:
+    return DEFAULT_QUEUE if priority == 0 else f"{DEFAULT_QUEUE}:{priority}"
+
+
+class QueueEstimate(NamedTuple):
+    queue_depth: int  # Messages that will be served before this one
+    capacity: int  # Tasks the live workers run concurrently
+    wait_seconds: float
+    completion_seconds: float
+
+
+async def record_stage_durations(client: aioredis.Redis, durations: Dict[str, float]):
+    """Fold one task's stage durations into the moving averages."""
+    try:
+        current = await client.hgetall(STAGE_EWMA_KEY)
+        updated = {}
+        for stage, seconds in durations.items():
+            previous = float(current[stage]) if stage in current else None
+            updated[stage] = seconds if previous is None else EWMA_WEIGHT * seconds + (1 - EWMA_WEIGHT) * previous
+        if updated:
+            await client.hset(STAGE_EWMA_KEY, mapping=updated)
+    except Exception as e:
+        logger.warning(f"Failed to record stage durations: {e}")
+
+
+class QueueMetrics:
+    """Reads queue, worker and duration metrics (API side)."""
+
+    _broker: aioredis.Redis = None
+
+    def __init__(self, client: aioredis.Redis):
+        self.client = client
+        # The broker may live in a different Redis database than the cache
+        if QueueMetrics._broker is None:
+            QueueMetrics._broker = aioredis.from_url(settings.CELERY_BROKER_URL, decode_responses=True)
+        self.broker = QueueMetrics._broker
+
+    async def queue_depth_by_priority(self) -> Dict[int, int]:
+        async with self.broker.pipeline(transaction=False) as pipe:
+            for priority in PRIORITY_STEPS:
+                pipe.llen(_queue_key(priority))
+            lengths = await pipe.execute()
+        return dict(zip(PRIORITY_STEPS, lengths))
+
+    async def worker_capacity(self) -> Dict[str, int]:
+        """Concurrency of every worker with a recent heartbeat, in one round trip."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zrangebyscore(WORKERS_SEEN_KEY, time.time() - WORKER_EXPIRY_SECONDS, "+inf")
+            pipe.hgetall(WORKERS_CONCURRENCY_KEY)
+            live, concurrency = await pipe.execute()
+        return {hostname: int(concurrency[hostname]) for hostname in live if hostname in concurrency}
+
+    async def stage_seconds(self) -> Dict[str, float]:
+        averages = dict(DEFAULT_STAGE_SECONDS)
+        stored = await self.client.hgetall(STAGE_EWMA_KEY)
+        averages.update({stage: float(value) for stage, value in stored.items()})
+        return averages
+
+    async def estimate(self, priority: int = 0) -> Optional[QueueEstimate]:
+        """Wait estimate for a new task at `priority`. None if no worker is alive."""
+        depths = await self.queue_depth_by_priority()
+        capacity = sum((await self.worker_capacity()).values())
+        if not capacity:
+            return None
+
+        ahead = sum(depth for p, depth in depths.items() if p <= priority)
+        task_seconds = (await self.stage_seconds())["total"]
+        wait = ahead / capacity * task_seconds
+        return QueueEstimate(ahead, capacity, round(wait, 1), round(wait + task_seconds, 1))
+
+    async def snapshot(self) -> Dict:
+        """Everything an autoscaler needs in one document."""
+        depths = await self.queue_depth_by_priority()
+        workers = await self.worker_capacity()
+        stages = await self.stage_seconds()
+        capacity = sum(workers.values())
+        depth = sum(depths.values())
+        return {
+            "queue_depth": depth,
+            "queue_depth_by_priority": depths,
+            "workers": len(workers),
+            "capacity": capacity,
+            "avg_stage_seconds": stages,
+            "estimated_drain_seconds": round(depth / capacity * stages["total"], 1) if capacity else None,
+        }
+
+
+def send_worker_heartbeat(client: redis.Redis, hostname: str, concurrency: int):
+    """Register the worker and drop workers that stopped beating from the registry."""
+    now = time.time()
+    pipe = client.pipeline(transaction=False)
+    pipe.zadd(WORKERS_SEEN_KEY, {hostname: now})
+    pipe.hset(WORKERS_CONCURRENCY_KEY, hostname, concurrency)
+    pipe.zrangebyscore(WORKERS_SEEN_KEY, "-inf", f"({now - WORKER_EXPIRY_SECONDS}")
+    gone = pipe.execute()[-1]
+    if gone:
+        pipe = client.pipeline(transaction=False)
+        pipe.zrem(WORKERS_SEEN_KEY, *gone)
+        pipe.hdel(WORKERS_CONCURRENCY_KEY, *gone)
+        pipe.execute()
+
+
+def start_worker_heartbeat(hostname: str, concurrency: int):
+    """Advertise a worker's concurrency until the process exits (worker side)."""
+    client = redis.Redis.from_url(settings.redis_url)
+
+    def send():
+        try:
+            send_worker_heartbeat(client, hostname, concurrency)
+        except Exception as e:
+            logger.warning(f"Worker heartbeat failed: {e}")
+
+    def beat():
+        stopped = threading.Event()
+        while not stopped.wait(WORKER_HEARTBEAT_SECONDS):
+            send()
+
+    send()
+    threading.Thread(target=beat, name="queue-metrics-heartbeat", daemon=True).start()
@@ -0,0 +1,111 @@
+"""
+Redis-backed limits shared by every API process and Celery worker.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+
+class DistributedSemaphore:
+    """
+    Cross-process semaphore stored in a Redis sorted set.
+
+    Each holder adds a unique token scored with its acquisition time.
+    Tokens older than `lease_seconds` are treated as abandoned (crashed
+    worker) and pruned, so a lost release never blocks the pool forever.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        name: str,
+        limit: int,
+        lease_seconds: int = 900,
+        poll_interval: float = 1.0
+    ):
+        self.client = client
+        self.key = f"semaphore:{name}"
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._token = None
+
+    async def try_acquire(self) -> bool:
+        """Take a slot if one is free. Returns True on success."""
+        token = uuid.uuid4().hex
+        now = time.time()
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(self.key, 0, now - self.lease_seconds)
+            pipe.zadd(self.key, {token: now})
+            pipe.zrank(self.key, token)
+            pipe.expire(self.key, self.lease_seconds)
+            _, _, rank, _ = await pipe.execute()
+
+        if rank is not None and rank < self.limit:
+            self._token = token
+            return True
+
+        await self.client.zrem(self.key, token)
+        return False
+
+    async def acquire(self, timeout: float = None):
+        """Wait until a slot is free (or raise TimeoutError after `timeout` seconds)."""
+        started = time.time()
+        while not await self.try_acquire():
+            if timeout is not None and time.time() - started > timeout:
+                raise TimeoutError(f"Timed out waiting for {self.key}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def release(self):
+        if self._token:
+            await self.client.zrem(self.key, self._token)
+            self._token = None
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.release()
+
+
+class HourlyBudget:
+    """
+    Fixed-window usage counter for an external service (Gosom, Gemini).
+
+    Every consumer records what it uses; background work asks for the
+    remaining allowance before dispatching so it never eats into the
+    capacity interactive users need.
+    """
+
+    def __init__(self, client: redis.Redis, name: str, limit: int):
+        self.client = client
+        self.name = name
+        self.limit = limit
+
+    def _key(self, now: datetime = None) -> str:
+        now = now or datetime.utcnow()
+        return f"budget:{self.name}:{now.strftime('%Y%m%d%H')}"
+
+    async def used(self) -> int:
+        value = await self.client.get(self._key())
+        return int(value or 0)
+
+    async def remaining(self) -> int:
+        return max(self.limit - await self.used(), 0)
+
+    async def consume(self, amount: int = 1) -> int:
+        """Record usage. Returns the total used in the current hour."""
+        key = self._key()
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.incrby(key, amount)
+            pipe.expire(key, 7200)
+            used, _ = await pipe.execute()
+        return used
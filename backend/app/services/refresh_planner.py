@@ -0,0 +1,76 @@
+"""
+Refresh cadence planning for tracked restaurants.
+
+A restaurant that gets dozens of reviews a day is refreshed often; a quiet
+one is refreshed rarely. Refreshes are only dispatched inside the off-peak
+window and are spread over it so they never arrive as a burst.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.config import settings
+
+# Weight of the newest observation in the review-velocity moving average
+VELOCITY_SMOOTHING = 0.5
+
+
+def update_review_velocity(
+    previous_velocity: Optional[float],
+    previous_count: Optional[int],
+    current_count: Optional[int],
+    elapsed: Optional[timedelta]
+) -> Optional[float]:
+    """Exponentially smoothed new-reviews-per-day estimate."""
+    if previous_count is None or current_count is None or not elapsed:
+        return previous_velocity
+
+    elapsed_days = elapsed.total_seconds() / 86400
+    if elapsed_days <= 0:
+        return previous_velocity
+
+    observed = max(current_count - previous_count, 0) / elapsed_days
+    if previous_velocity is None:
+        return observed
+    return VELOCITY_SMOOTHING * observed + (1 - VELOCITY_SMOOTHING) * previous_velocity
+
+
+def compute_refresh_interval(reviews_per_day: Optional[float]) -> timedelta:
+    """Time until roughly REFRESH_TARGET_NEW_REVIEWS new reviews are expected."""
+    minimum = timedelta(hours=settings.REFRESH_MIN_INTERVAL_HOURS)
+    maximum = timedelta(days=settings.REFRESH_MAX_INTERVAL_DAYS)
+
+    if not reviews_per_day or reviews_per_day <= 0:
+        return maximum
+
+    interval = timedelta(days=settings.REFRESH_TARGET_NEW_REVIEWS / reviews_per_day)
+    return max(minimum, min(interval, maximum))
+
+
+def next_refresh_time(now: datetime, reviews_per_day: Optional[float]) -> datetime:
+    """Next due time, with +/-10% jitter so restaurants tracked together drift apart."""
+    interval = compute_refresh_interval(reviews_per_day)
+    jitter = interval.total_seconds() * random.uniform(-0.1, 0.1)
+    return now + interval + timedelta(seconds=jitter)
+
+
+def in_refresh_window(now: datetime) -> bool:
+    """Whether `now` (UTC) falls inside the off-peak refresh window."""
+    start, end = settings.REFRESH_WINDOW_START_HOUR, settings.REFRESH_WINDOW_END_HOUR
+    if start <= end:
+        return start <= now.hour < end
+    # Window wraps midnight, e.g. 22 -> 5
+    return now.hour >= start or now.hour < end
+
+
+def refresh_slots_for_tick(now: datetime, remaining_budget: int) -> int:
+    """
+    How many refreshes to dispatch on this scheduler tick.
+    The hour's remaining budget is divided evenly over the ticks left in
+    the hour, so dispatches are paced instead of spent on the first tick.
+    """
+    if remaining_budget <= 0:
+        return 0
+    seconds_left = 3600 - (now.minute * 60 + now.second)
+    ticks_left = max(seconds_left // max(settings.REFRESH_TICK_SECONDS, 1), 1)
+    return max(remaining_budget // ticks_left, 1)
@@ -0,0 +1,335 @@
+"""
+Streaming import of historical review dumps.
+
+Accepts the `raw_res.json` export format (one document per restaurant with
+restaurant_name, total_reviews and a reviews array) and NDJSON, where each
+line is either such a document or a single review carrying its
+restaurant_name. NDJSON is read line by line and a JSON array is decoded
+one element at a time, so memory is bounded by the batch size and the
+largest restaurant document, however large the file is.
+
+Records are normalized to the scraper's review shape, keyed with the same
+signature hash the scraper dedupes on, and written with one COPY plus one
+merge statement per batch. Each imported place also gets a RawReview row,
+so the worker can analyze it from storage without scraping.
+"""
+import codecs
+import io
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.repositories.review_repository import ReviewRepository
+from app.services.dashboard_cache import invalidate_reviews
+from app.services.place_identity import PlaceResolver, canonical_place_key
+from app.services.scraper import review_signature_hash, parse_review_date
+
+logger = logging.getLogger(__name__)
+
+JSON_DOCUMENT_EXTENSIONS = {".json"}
+PROGRESS_LOG_ROWS = 100000
+READ_CHUNK_CHARS = 1 << 20
+
+
+def open_dump(path: str) -> io.TextIOWrapper:
+    """
+    Open a dump as text, detecting the encoding from its BOM.
+    Windows exports (like raw_res.json) are UTF-16 with CRLF line endings.
+    """
+    raw = open(path, "rb")
+    head = raw.peek(4)[:4]
+    if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+        encoding = "utf-16"
+    else:
+        encoding = "utf-8-sig"
+    return io.TextIOWrapper(raw, encoding=encoding, errors="replace")
+
+
+def iter_json_values(f: io.TextIOBase, chunk_chars: int = READ_CHUNK_CHARS) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time (or the value
+    itself if it is not an array), decoding from a sliding text buffer
+    instead of loading the whole file.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    started = in_array = False
+
+    def read_more(size: int):
+        nonlocal buffer, pos, eof
+        chunk = f.read(size)
+        buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+    while True:
+        # Whitespace, and inside the array the separators between elements
+        while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ",")):
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                return
+            read_more(chunk_chars)
+            continue
+
+        if not started:
+            started = True
+            if buffer[pos] == "[":
+                in_array = True
+                pos += 1
+                continue
+        elif in_array and buffer[pos] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Element not complete yet; read at least as much again so a
+            # large element is re-decoded a logarithmic number of times
+            read_more(max(chunk_chars, len(buffer) - pos))
+            continue
+        if end == len(buffer) and not eof:
+            # A number at the end of the buffer may continue in the next chunk
+            read_more(chunk_chars)
+            continue
+        pos = end
+        yield value
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def normalize_review(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The scraper's review shape for a dump record, or None if it has no content.
+    Field defaults match build_scrape_result so signatures line up with scraped rows.
+    """
+    text = record.get("text") or ""
+    author = record.get("author") or record.get("reviewerName") or "Anonymous"
+    if not text and not record.get("rating"):
+        return None
+    return {
+        "text": text,
+        "rating": _to_float(record.get("rating")),
+        "author": author,
+        "date_text": record.get("date_text") or record.get("date") or "",
+        "profile_picture": record.get("profile_picture") or "",
+        "review_id": record.get("review_id"),
+    }
+
+
+class ReviewImporter:
+    """Streams one dump file into the reviews table. Commits once per batch."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        redis_client: Optional[redis.Redis] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.db = db
+        self.redis_client = redis_client
+        self.reviews = ReviewRepository(db)
+        self.resolver = PlaceResolver(db, redis_client)
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.imported_at = datetime.now(timezone.utc)
+        # restaurant name -> place key; one entry per place in the dump
+        self._place_keys: Dict[str, str] = {}
+        # place key -> restaurant_info / reviews seen, for RawReview metadata
+        self.places: Dict[str, Dict[str, Any]] = {}
+        # place key -> restaurant name not yet recorded as a place alias
+        self._new_aliases: Dict[str, str] = {}
+        self.stats = {"records": 0, "skipped": 0, "duplicates": 0, "rows_written": 0, "batches": 0}
+
+    def iter_records(self, path: str) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Yield (restaurant document, review record) pairs from a dump."""
+        with open_dump(path) as f:
+            if os.path.splitext(path)[1].lower() in JSON_DOCUMENT_EXTENSIONS:
+                for document in iter_json_values(f):
+                    yield from self._document_records(document)
+                return
+
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    document = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping malformed line {line_number} of {path}")
+                    self.stats["skipped"] += 1
+                    continue
+                yield from self._document_records(document)
+
+    def _document_records(self, document: Any) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        if not isinstance(document, dict):
+            self.stats["skipped"] += 1
+            return
+        if isinstance(document.get("reviews"), list):
+            for record in document["reviews"]:
+                if isinstance(record, dict):
+                    yield document, record
+                else:
+                    self.stats["skipped"] += 1
+        else:
+            # A single review line: the restaurant fields travel with it
+            yield document, document
+
+    async def _place_key(self, document: Dict[str, Any]) -> Optional[str]:
+        name = (document.get("restaurant_name") or document.get("name") or "").strip()
+        if not name:
+            return None
+        place_key = self._place_keys.get(name)
+        if place_key is None:
+            place_key = await self.resolver.resolve(name) or canonical_place_key(None, name)
+            self._place_keys[name] = place_key
+            self.places[place_key] = {
+                "name": name,
+                "total_reviews": int(_to_float(document.get("total_reviews"))),
+                # Documents carry the restaurant rating; review lines only their own
+                "rating": _to_float(document.get("rating")) if "reviews" in document else 0.0,
+                "imported": 0,
+            }
+            self._new_aliases[place_key] = name
+        return place_key
+
+    async def import_file(self, path: str) -> Dict[str, Any]:
+        """Import every review in `path`. Returns counts and throughput."""
+        started = time.monotonic()
+        batch: Dict[Tuple[str, str], Tuple] = {}
+        next_log = PROGRESS_LOG_ROWS
+
+        for document, record in self.iter_records(path):
+            self.stats["records"] += 1
+            place_key = await self._place_key(document)
+            review = normalize_review(record)
+            if not place_key or not review:
+                self.stats["skipped"] += 1
+                continue
+
+            signature = review_signature_hash(review)
+            key = (place_key, signature)
+            existing = batch.get(key)
+            if existing is not None:
+                self.stats["duplicates"] += 1
+                # Same dedupe rule as the scraper: keep the longest text
+                if len(existing[4] or "") >= len(review["text"]):
+                    continue
+            batch[key] = (
+                place_key,
+                signature,
+                str(review["review_id"])[:255] if review["review_id"] else None,
+                review["author"][:255],
+                review["text"],
+                review["rating"],
+                review["date_text"][:100],
+                parse_review_date(review["date_text"], self.imported_at),
+                review["profile_picture"] or None,
+            )
+
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = {}
+                if self.stats["rows_written"] >= next_log:
+                    self._log_progress(started)
+                    next_log += PROGRESS_LOG_ROWS
+
+        await self._flush(batch)
+
+        seconds = time.monotonic() - started
+        self.stats.update({
+            "places": len(self.places),
+            "seconds": round(seconds, 1),
+            "rows_per_second": round(self.stats["rows_written"] / seconds, 1) if seconds else 0,
+        })
+        logger.info(f"Imported {path}: {self.stats}")
+        return self.stats
+
+    async def _flush(self, batch: Dict[Tuple[str, str], Tuple]):
+        """Write one batch and the metadata of the places it touched in one transaction."""
+        if not batch:
+            return
+        touched = set()
+        for place_key, _ in batch:
+            self.places[place_key]["imported"] += 1
+            touched.add(place_key)
+
+        try:
+            written = await self.reviews.copy_many(list(batch.values()))
+            for place_key in touched:
+                place = self.places[place_key]
+                await self.reviews.upsert_scrape_metadata(
+                    place_key,
+                    {
+                        "name": place["name"],
+                        "rating": place["rating"],
+                        "total_reviews": place["total_reviews"] or place["imported"],
+                        "address": "",
+                        "place_id": "",
+                        "link": "",
+                    },
+                    place["imported"],
+                    self.imported_at,
+                )
+                if place_key in self._new_aliases:
+                    await self.resolver.record(place_key, None, [self._new_aliases[place_key]])
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        await invalidate_reviews(self.redis_client, touched)
+        for place_key in touched:
+            self._new_aliases.pop(place_key, None)
+        self.stats["rows_written"] += written
+        self.stats["batches"] += 1
+
+    def _log_progress(self, started: float):
+        seconds = time.monotonic() - started
+        rate = self.stats["rows_written"] / seconds if seconds else 0
+        logger.info(
+            f"Import progress: {self.stats['rows_written']} rows in {seconds:.0f}s "
+            f"({rate:.0f} rows/s, {len(self.places)} places)"
+        )
+
+
+async def queue_imported_analyses(
+    importer: ReviewImporter,
+    user_id: Optional[str],
+    redis_client: redis.Redis
+) -> Dict[str, Any]:
+    """
+    Queue a stored-only analysis of every imported place in the bulk lane,
+    in batches trackable at /places/batches/{batch_id}. Stops at the user's
+    in-flight cap; the rest can be queued again once those finish.
+    """
+    from app.exceptions.analysis import TaskQuotaExceededException
+    from app.worker.scheduling import TaskLane, enqueue_analysis_batch
+
+    names = [place["name"] for place in importer.places.values()]
+    summary = {"batch_ids": [], "queued": 0, "not_queued": 0}
+    for start in range(0, len(names), settings.BULK_ANALYZE_MAX_PLACES):
+        chunk = names[start:start + settings.BULK_ANALYZE_MAX_PLACES]
+        try:
+            group_result = await enqueue_analysis_batch(
+                chunk, user_id, TaskLane.BULK, stored_only=True, client=redis_client
+            )
+        except TaskQuotaExceededException as e:
+            logger.warning(f"Stopped queueing imported analyses: {e.message}")
+            summary["not_queued"] = len(names) - start
+            break
+
+        summary["batch_ids"].append(group_result.id)
+        summary["queued"] += len(chunk)
+    return summary
@@ -1,16 +1,23 @@
 import asyncio
 import csv
+import hashlib
 import io
 import json as json_lib
 import logging
 import os
 import sys
 import time
-from datetime import datetime, timedelta
-from typing import Any, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import httpx
 
+from app.core.config import settings
+from app.core.database import create_redis_client
+from app.exceptions.analysis import ScraperBusyException
+from app.services.rate_limit import DistributedSemaphore
+from app.services.payload_archive import archive_download
+
 # Increase CSV field size limit to handle large review data
 csv.field_size_limit(sys.maxsize)
 
@@ -34,6 +41,208 @@ def generate_review_signature(review: Dict[str, Any]) -> str:
     return f"{author}|{rating}|{date}|{text_snippet}"
 
 
+def review_signature_hash(review: Dict[str, Any]) -> str:
+    """Fixed-length digest of the review signature, used as the stored dedupe key."""
+    return hashlib.sha1(generate_review_signature(review).encode("utf-8")).hexdigest()
+
+
+def review_set_hash(reviews: List[Dict[str, Any]]) -> str:
+    """
+    Digest of a set of reviews, independent of order and duplicates.
+    Two scrapes that return the same reviews produce the same hash.
+    """
+    signatures = sorted({review_signature_hash(r) for r in reviews})
+    return hashlib.sha1("\n".join(signatures).encode("utf-8")).hexdigest()
+
+
+def parse_review_date(date_text: str, reference: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Resolve a review date string to a UTC timestamp.
+    Handles ISO timestamps, YYYY-MM-DD dates and relative dates ("2 weeks ago")
+    relative to `reference` (the scrape time). Returns None if unparseable.
+    """
+    if not date_text or date_text == "Unknown Date":
+        return None
+
+    try:
+        if "T" in date_text:
+            parsed = datetime.fromisoformat(date_text.replace("Z", "+00:00"))
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+        if "-" in date_text:
+            try:
+                return datetime.strptime(date_text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                pass
+
+        date_str = date_text.lower()
+        now = reference or datetime.now(timezone.utc)
+        if not now.tzinfo:
+            now = now.replace(tzinfo=timezone.utc)
+
+        if "ago" in date_str:
+            digits = ''.join(filter(str.isdigit, date_str))
+            val = int(digits) if digits else 1  # "a week ago"
+
+            if "minute" in date_str or "hour" in date_str:
+                return now
+            elif "day" in date_str:
+                return now - timedelta(days=val)
+            elif "week" in date_str:
+                return now - timedelta(weeks=val)
+            elif "month" in date_str:
+                return now - timedelta(days=val * 30)
+            elif "year" in date_str:
+                return now - timedelta(days=val * 365)
+    except Exception:
+        pass
+
+    return None
+
+
+def parse_gosom_download(body: bytes) -> List[Dict[str, Any]]:
+    """
+    Place rows from a Gosom job download (JSON, or CSV with JSON-encoded
+    review columns). Pure function of the payload, so archived downloads
+    can be replayed through it offline.
+    """
+    try:
+        results = json_lib.loads(body)
+        if isinstance(results, list):
+            return results
+    except Exception:
+        logger.info("JSON parse failed, attempting CSV parse...")
+
+    csv_text = body.decode("utf-8", errors="replace")
+    reader = csv.DictReader(io.StringIO(csv_text))
+    results = []
+    for row in reader:
+        # Prioritize extended reviews. If we have them, ignore the basic 'reviews' to avoid duplicates.
+        reviews_data = []
+        has_extended = False
+        
+        ext_key = next((k for k in ['user_reviews_extended', 'UserReviewsExtended'] if k in row), None)
+        if ext_key and row[ext_key]:
+            try:
+                parsed = json_lib.loads(row[ext_key])
+                if isinstance(parsed, list) and len(parsed) > 0:
+                    reviews_data.extend(parsed)
+                    has_extended = True
+            except Exception:
+                pass
+
+        # Only look at basic reviews if we didn't get any extended ones
+        if not has_extended:
+            review_key = next((k for k in ['user_reviews', 'UserReviews', 'reviews'] if k in row), None)
+            if review_key and row[review_key]:
+                try:
+                    parsed = json_lib.loads(row[review_key])
+                    if isinstance(parsed, list):
+                        reviews_data.extend(parsed)
+                except Exception:
+                    pass
+
+        row['reviews'] = reviews_data
+        results.append(row)
+    return results
+
+
+def _get_val(data, *keys):
+    for k in keys:
+        if k in data:
+            return data[k]
+        if k.title() in data:
+            return data[k.title()]
+    return None
+
+
+def build_scrape_result(results: List[Dict[str, Any]], max_reviews: int, fetched_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Restaurant info and deduplicated recent reviews of the best matching place.
+    `fetched_at` (naive UTC) anchors the recency window, so a replayed payload
+    yields what the original scrape did.
+    """
+    fetched_at = fetched_at or datetime.utcnow()
+    place_data = results[0] if results else {}
+    get_val = _get_val
+
+    restaurant_info = {
+        'name': get_val(place_data, 'title', 'name', 'Title', 'Name') or "Unknown",
+        'rating': float(get_val(place_data, 'totalScore', 'rating', 'review_rating', 'Rating') or 0),
+        'total_reviews': int(get_val(place_data, 'reviewsCount', 'reviews_count', 'review_count', 'ReviewsCount') or 0),
+        'address': get_val(place_data, 'address', 'Address', 'complete_address') or '',
+        'place_id': get_val(place_data, 'place_id', 'placeId', 'PlaceID') or '',
+        'link': get_val(place_data, 'link', 'url', 'Link') or ''
+    }
+
+    raw_reviews = get_val(place_data, 'reviews', 'Reviews', 'user_reviews') or []
+    if isinstance(raw_reviews, str):
+        try:
+            raw_reviews = json_lib.loads(raw_reviews)
+        except Exception:
+            raw_reviews = []
+
+    reviews_map = {}
+    
+    for r in raw_reviews:
+        # Extract fields first to generate signature
+        text = get_val(r, 'text', 'caption', 'Text', 'Description') or ''
+        rating = float(get_val(r, 'stars', 'rating', 'Rating') or 0)
+        author = get_val(r, 'reviewerName', 'name', 'Name') or 'Anonymous'
+        date_text = get_val(r, 'publishedAtDate', 'relativePublishTimeDescription', 'date', 'When') or ''
+        profile_picture = get_val(r, 'reviewerPhotoUrl', 'ProfilePicture', 'profile_picture') or ''
+        
+        # Original ID from source (still kept for reference)
+        original_id = get_val(r, 'reviewId', 'googleMapsReviewId', 'id_review')
+        
+        review_obj = {
+            'text': text,
+            'rating': rating,
+            'author': author,
+            'date_text': date_text,
+            'profile_picture': profile_picture
+        }
+        
+        # Generate robust content-based signature
+        signature = generate_review_signature(review_obj)
+        
+        # If we have a real ID, use it as part of the object, else generate one
+        review_obj['review_id'] = original_id or str(hash(signature))
+
+        # Deduplicate based on signature
+        if signature not in reviews_map:
+            reviews_map[signature] = review_obj
+        else:
+            # If we already have this review, check if the new one has more data (e.g. longer text)
+            existing = reviews_map[signature]
+            if len(text) > len(existing['text']):
+                reviews_map[signature] = review_obj
+    
+    reviews = list(reviews_map.values())
+
+    recent_reviews = []
+    cutoff = fetched_at - timedelta(days=30)  # Only reviews from last 30 days
+
+    for r in reviews:
+        try:
+            d_str = r['date_text']
+            if d_str and 'T' in d_str:
+                dt = datetime.fromisoformat(d_str.replace('Z', '+00:00'))
+                if dt >= cutoff.replace(tzinfo=dt.tzinfo):
+                    recent_reviews.append(r)
+            else:
+                recent_reviews.append(r)
+        except Exception:
+            recent_reviews.append(r)
+
+    return {
+        'restaurant_info': restaurant_info,
+        'reviews': recent_reviews[:max_reviews],
+        'total_reviews_collected': len(recent_reviews[:max_reviews]),
+        'scraped_at': fetched_at.isoformat()
+    }
+
+
 GOSOM_URL = os.getenv("GOSOM_URL", "http://gosom-scraper:8080")
 
 
@@ -42,9 +251,36 @@ class GoogleMapsScraper:
     def __init__(self, headless: bool = True):
         self.base_url = GOSOM_URL
         self.client = httpx.AsyncClient(timeout=300.0)
+        self.redis = create_redis_client()
+        # Shared across workers so a large batch cannot flood Gosom
+        self.job_slots = DistributedSemaphore(
+            self.redis, "gosom_jobs", settings.GOSOM_MAX_CONCURRENT_JOBS, lease_seconds=1200
+        )
 
     async def close(self):
         await self.client.aclose()
+        await self.redis.close()
+
+    async def _acquire_job_slot(self) -> bool:
+        """
+        Wait for a free Gosom job slot. Returns False if Redis is unavailable.
+        Raises ScraperBusyException after GOSOM_JOB_SLOT_WAIT_SECONDS: the
+        analysis task is then retried later instead of idling a worker.
+        """
+        try:
+            await self.job_slots.acquire(timeout=settings.GOSOM_JOB_SLOT_WAIT_SECONDS)
+            return True
+        except TimeoutError:
+            raise ScraperBusyException(settings.GOSOM_JOB_SLOT_WAIT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Gosom job limiter unavailable, scraping without it: {e}")
+            return False
+
+    async def _release_job_slot(self):
+        try:
+            await self.job_slots.release()
+        except Exception as e:
+            logger.warning(f"Failed to release Gosom job slot: {e}")
 
     async def __aenter__(self):
         return self
@@ -55,7 +291,17 @@ class GoogleMapsScraper:
     def scrape_reviews(self, query: str, max_reviews: int = 100) -> Dict[str, Any]:
         return asyncio.run(self._scrape_reviews_async(query, max_reviews))
 
-    async def _scrape_reviews_async(self, query: str, max_reviews: int) -> Dict[str, Any]:
+    async def _scrape_reviews_async(
+        self,
+        query: str,
+        max_reviews: int,
+        on_archived: Optional[Callable[[Dict[str, Any]], Awaitable[Optional[int]]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Scrape one place. `on_archived` is called with the archived download
+        before it is parsed, to link it in its own transaction; the link id it
+        returns is passed back as scrape_result['payload']['link_id'].
+        """
         logger.info(f"Submitting scrape job to {self.base_url} for {query}")
 
         payload = {
@@ -70,6 +316,7 @@ class GoogleMapsScraper:
             "extra_reviews": True  # Fetch extended reviews (up to ~300)
         }
 
+        await self._acquire_job_slot()
         try:
             response = await self.client.post(f"{self.base_url}/api/v1/jobs", json=payload)
             if response.status_code not in [200, 201]:
@@ -81,6 +328,8 @@ class GoogleMapsScraper:
             logger.info(f"Job created: {job_id}")
 
             results = None
+            archived = None
+            fetched_at = None
             start_time = time.time()
             max_wait = 900
 
@@ -93,41 +342,12 @@ class GoogleMapsScraper:
                     if status in ["completed", "ok", "done", "success"]:
                         results_res = await self.client.get(f"{self.base_url}/api/v1/jobs/{job_id}/download")
                         if results_res.status_code == 200:
-                            try:
-                                results = results_res.json()
-                            except Exception:
-                                logger.info("JSON parse failed, attempting CSV parse...")
-                                csv_text = results_res.text
-                                reader = csv.DictReader(io.StringIO(csv_text))
-                                results = []
-                                for row in reader:
-                                    # Prioritize extended reviews. If we have them, ignore the basic 'reviews' to avoid duplicates.
-                                    reviews_data = []
-                                    has_extended = False
-                                    
-                                    ext_key = next((k for k in ['user_reviews_extended', 'UserReviewsExtended'] if k in row), None)
-                                    if ext_key and row[ext_key]:
-                                        try:
-                                            parsed = json_lib.loads(row[ext_key])
-                                            if isinstance(parsed, list) and len(parsed) > 0:
-                                                reviews_data.extend(parsed)
-                                                has_extended = True
-                                        except Exception:
-                                            pass
-
-                                    # Only look at basic reviews if we didn't get any extended ones
-                                    if not has_extended:
-                                        review_key = next((k for k in ['user_reviews', 'UserReviews', 'reviews'] if k in row), None)
-                                        if review_key and row[review_key]:
-                                            try:
-                                                parsed = json_lib.loads(row[review_key])
-                                                if isinstance(parsed, list):
-                                                    reviews_data.extend(parsed)
-                                            except Exception:
-                                                pass
-
-                                    row['reviews'] = reviews_data
-                                    results.append(row)
+                            body = results_res.content
+                            fetched_at = datetime.utcnow()
+                            archived = await archive_download(body, job_id, results_res.headers.get("content-type"), fetched_at)
+                            if archived and on_archived:
+                                archived['link_id'] = await on_archived(archived)
+                            results = parse_gosom_download(body)
                             break
                     elif status in ["failed", "error"]:
                         logger.error(f"Job {job_id} failed: {job_status.get('error') or job_status.get('Error')}")
@@ -144,94 +364,15 @@ class GoogleMapsScraper:
                     'scraped_at': datetime.utcnow().isoformat()
                 }
 
-            place_data = results[0] if results else {}
-
-            def get_val(data, *keys):
-                for k in keys:
-                    if k in data:
-                        return data[k]
-                    if k.title() in data:
-                        return data[k.title()]
-                return None
-
-            restaurant_info = {
-                'name': get_val(place_data, 'title', 'name', 'Title', 'Name') or "Unknown",
-                'rating': float(get_val(place_data, 'totalScore', 'rating', 'review_rating', 'Rating') or 0),
-                'total_reviews': int(get_val(place_data, 'reviewsCount', 'reviews_count', 'review_count', 'ReviewsCount') or 0),
-                'address': get_val(place_data, 'address', 'Address', 'complete_address') or ''
-            }
-
-            raw_reviews = get_val(place_data, 'reviews', 'Reviews', 'user_reviews') or []
-            if isinstance(raw_reviews, str):
-                try:
-                    raw_reviews = json_lib.loads(raw_reviews)
-                except Exception:
-                    raw_reviews = []
-
-            reviews = []
-            reviews_map = {}
-            
-            for r in raw_reviews:
-                # Extract fields first to generate signature
-                text = get_val(r, 'text', 'caption', 'Text', 'Description') or ''
-                rating = float(get_val(r, 'stars', 'rating', 'Rating') or 0)
-                author = get_val(r, 'reviewerName', 'name', 'Name') or 'Anonymous'
-                date_text = get_val(r, 'publishedAtDate', 'relativePublishTimeDescription', 'date', 'When') or ''
-                profile_picture = get_val(r, 'reviewerPhotoUrl', 'ProfilePicture', 'profile_picture') or ''
-                
-                # Original ID from source (still kept for reference)
-                original_id = get_val(r, 'reviewId', 'googleMapsReviewId', 'id_review')
-                
-                review_obj = {
-                    'text': text,
-                    'rating': rating,
-                    'author': author,
-                    'date_text': date_text,
-                    'profile_picture': profile_picture
-                }
-                
-                # Generate robust content-based signature
-                signature = generate_review_signature(review_obj)
-                
-                # If we have a real ID, use it as part of the object, else generate one
-                review_obj['review_id'] = original_id or str(hash(signature))
-
-                # Deduplicate based on signature
-                if signature not in reviews_map:
-                    reviews_map[signature] = review_obj
-                else:
-                    # If we already have this review, check if the new one has more data (e.g. longer text)
-                    existing = reviews_map[signature]
-                    if len(text) > len(existing['text']):
-                        reviews_map[signature] = review_obj
-            
-            reviews = list(reviews_map.values())
-
-            recent_reviews = []
-            cutoff = datetime.utcnow() - timedelta(days=30)  # Only reviews from last 30 days
-
-            for r in reviews:
-                try:
-                    d_str = r['date_text']
-                    if d_str and 'T' in d_str:
-                        dt = datetime.fromisoformat(d_str.replace('Z', '+00:00'))
-                        if dt >= cutoff.replace(tzinfo=dt.tzinfo):
-                            recent_reviews.append(r)
-                    else:
-                        recent_reviews.append(r)
-                except Exception:
-                    recent_reviews.append(r)
-
-            return {
-                'restaurant_info': restaurant_info,
-                'reviews': recent_reviews[:max_reviews],
-                'total_reviews_collected': len(recent_reviews[:max_reviews]),
-                'scraped_at': datetime.utcnow().isoformat()
-            }
+            scrape_result = build_scrape_result(results, max_reviews, fetched_at)
+            scrape_result['payload'] = archived
+            return scrape_result
 
         except Exception as e:
             logger.error(f"Gosom scrape failed: {e}")
             raise
+        finally:
+            await self._release_job_slot()
 
 
 def get_reviews(query: str, max_reviews: int = 100) -> Dict[str, Any]:
@@ -0,0 +1,121 @@
+"""
+Two-tier cache of authenticated users (get_current_user).
+
+Every authenticated request resolves its token subject to a user. The
+resolved profile is kept in a small in-process LRU (a few seconds) backed by
+Redis (about a minute), so /auth/me, /users/me and friends stop costing a
+database round trip each. Only profile columns are cached: the password hash
+and the Google refresh token never leave the database.
+
+Writes that change a user call invalidate_user(), which drops the Redis entry
+and this process's copy. Other API processes may serve their local copy until
+it expires, which is what bounds USER_CACHE_LOCAL_TTL_SECONDS.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+CACHED_COLUMNS = (
+    "id", "email", "first_name", "last_name", "profile_picture",
+    "google_account_connected", "is_active", "created_at", "updated_at",
+)
+DATETIME_COLUMNS = ("created_at", "updated_at")
+
+# subject -> (expires_at, profile)
+_local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _key(subject: str) -> str:
+    return f"user:{subject}"
+
+
+def _to_profile(user: User) -> Dict[str, Any]:
+    profile = {column: getattr(user, column) for column in CACHED_COLUMNS}
+    for column in DATETIME_COLUMNS:
+        if profile[column] is not None:
+            profile[column] = profile[column].isoformat()
+    return profile
+
+
+def _to_user(profile: Dict[str, Any]) -> User:
+    """
+    A transient User carrying the cached columns. It is not attached to any
+    session: handlers that modify the user must load it first.
+    """
+    values = dict(profile)
+    for column in DATETIME_COLUMNS:
+        if values.get(column):
+            values[column] = datetime.fromisoformat(values[column])
+    return User(**values)
+
+
+def _local_get(subject: str) -> Optional[Dict[str, Any]]:
+    entry = _local.get(subject)
+    if entry is None:
+        return None
+    expires_at, profile = entry
+    if expires_at < time.monotonic():
+        del _local[subject]
+        return None
+    _local.move_to_end(subject)
+    return profile
+
+
+def _local_set(subject: str, profile: Dict[str, Any]):
+    _local[subject] = (time.monotonic() + settings.USER_CACHE_LOCAL_TTL_SECONDS, profile)
+    _local.move_to_end(subject)
+    while len(_local) > settings.USER_CACHE_LOCAL_MAX_ENTRIES:
+        _local.popitem(last=False)
+
+
+class UserCache:
+    """Read-through helper used by get_current_user."""
+
+    def __init__(self, client: Optional[redis.Redis]):
+        self.client = client
+
+    async def get(self, subject: str) -> Optional[User]:
+        profile = _local_get(subject)
+        if profile is None and self.client:
+            try:
+                raw = await self.client.get(_key(subject))
+            except Exception as e:
+                logger.warning(f"User cache read failed: {e}")
+                raw = None
+            if raw:
+                profile = json.loads(raw)
+                _local_set(subject, profile)
+        return _to_user(profile) if profile is not None else None
+
+    async def set(self, subject: str, user: User):
+        profile = _to_profile(user)
+        _local_set(subject, profile)
+        if not self.client:
+            return
+        try:
+            await self.client.setex(_key(subject), settings.USER_CACHE_TTL_SECONDS, json.dumps(profile))
+        except Exception as e:
+            logger.warning(f"User cache write failed: {e}")
+
+
+async def invalidate_user(client: Optional[redis.Redis], subject: Optional[str]):
+    """Forget a user (by token subject, i.e. email). Call after the change is committed."""
+    if not subject:
+        return
+    _local.pop(subject, None)
+    if not client:
+        return
+    try:
+        await client.delete(_key(subject))
+    except Exception as e:
+        logger.warning(f"User cache invalidation failed for {subject}: {e}")
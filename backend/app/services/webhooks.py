@@ -0,0 +1,299 @@
+"""
+Signed completion webhooks with a durable outbox.
+
+Events are written to webhook_deliveries in the same transaction as the
+data they announce, so a notification is never lost and never sent for
+work that was rolled back. A worker on its own queue claims due rows,
+POSTs them to each endpoint in batches signed with HMAC-SHA256, and
+reschedules failures with exponential backoff.
+
+Receivers verify `X-Webhook-Signature: sha256=<hex>`, computed over
+"<X-Webhook-Timestamp>.<raw body>" with the endpoint secret, and dedupe on
+each event's `id` (retries resend the same id).
+
+Endpoint URLs must be https and resolve only to public addresses, checked
+at registration and again before every delivery, which connects to the
+address it checked so a DNS change in between cannot redirect it to an
+internal service.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import random
+import secrets
+import socket
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import select, update, func, literal
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.webhook import WebhookEndpoint, WebhookDelivery
+
+logger = logging.getLogger(__name__)
+
+EVENT_ANALYSIS_COMPLETED = "analysis.completed"
+EVENT_ANALYSIS_FAILED = "analysis.failed"
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Webhook-Timestamp"
+USER_AGENT = "RestaurantAnalysis-Webhooks/1.0"
+
+# A claimed batch is retried by the next sweep if its worker dies mid-delivery
+CLAIM_LEASE_SECONDS = 120
+
+
+class UnsafeWebhookURL(ValueError):
+    """The URL is not https, or its host is (or resolves to) a non-public address."""
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    # is_global excludes loopback, link-local, private, shared and reserved ranges
+    return ip.is_global and not ip.is_multicast
+
+
+def check_webhook_url(url: str) -> httpx.URL:
+    """Checks that need no DNS: https, a host, and not a non-public IP literal."""
+    try:
+        parsed = httpx.URL(url)
+    except httpx.InvalidURL as e:
+        raise UnsafeWebhookURL(f"Invalid URL: {e}")
+    if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+        if parsed.scheme not in ("http", "https") or not parsed.host:
+            raise UnsafeWebhookURL("Webhook URLs must be http(s) URLs")
+        return parsed
+    if parsed.scheme != "https":
+        raise UnsafeWebhookURL("Webhook URLs must use https")
+    host = parsed.host
+    if not host:
+        raise UnsafeWebhookURL("Webhook URLs must have a host")
+    if host == "localhost" or host.endswith(".localhost"):
+        raise UnsafeWebhookURL(f"{host} is not a public host")
+    try:
+        public = _is_public(host)
+    except ValueError:
+        return parsed  # A name; resolve_webhook_url checks its addresses
+    if not public:
+        raise UnsafeWebhookURL(f"{host} is not a public address")
+    return parsed
+
+
+async def resolve_webhook_url(url: str) -> Tuple[httpx.URL, Dict[str, str], Dict[str, Any]]:
+    """
+    Check the URL and every address its host resolves to. Returns the URL
+    pinned to the first checked address, with the Host header and TLS server
+    name (request extensions) that keep the original host for the receiver
+    and for certificate verification. Raises UnsafeWebhookURL.
+    """
+    parsed = check_webhook_url(url)
+    if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+        return parsed, {}, {}
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            parsed.host, parsed.port or 443, type=socket.SOCK_STREAM
+        )
+    except socket.gaierror as e:
+        raise UnsafeWebhookURL(f"{parsed.host} does not resolve: {e}")
+    addresses = [info[4][0] for info in infos]
+    if not addresses:
+        raise UnsafeWebhookURL(f"{parsed.host} does not resolve")
+    for address in addresses:
+        if not _is_public(address):
+            raise UnsafeWebhookURL(f"{parsed.host} resolves to non-public address {address}")
+    pinned = parsed.copy_with(host=addresses[0].split("%", 1)[0])
+    return pinned, {"Host": parsed.netloc.decode("ascii")}, {"sni_hostname": parsed.host}
+
+
+def generate_secret() -> str:
+    return secrets.token_hex(32)
+
+
+def sign_payload(secret: str, timestamp: int, body: bytes) -> str:
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret: str, timestamp: int, body: bytes, signature: str, tolerance_seconds: int = 300) -> bool:
+    """Receiver-side check: valid signature over a recent timestamp."""
+    if abs(time.time() - timestamp) > tolerance_seconds:
+        return False
+    return hmac.compare_digest(sign_payload(secret, timestamp, body), signature)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts` (1-based): doubling, capped, +/-20% jitter."""
+    delay = min(
+        settings.WEBHOOK_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+        settings.WEBHOOK_BACKOFF_MAX_SECONDS
+    )
+    return delay * random.uniform(0.8, 1.2)
+
+
+def build_event(event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "type": event_type,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "data": data,
+    }
+
+
+async def enqueue_event(db: AsyncSession, user_id: Optional[str], event_type: str, data: Dict[str, Any]) -> int:
+    """
+    Add the event to the outbox of every active endpoint of the user, in one
+    INSERT ... SELECT. Does not commit. Returns the number of rows queued.
+    """
+    if not user_id:
+        return 0
+    event = build_event(event_type, data)
+    source = select(
+        WebhookEndpoint.id,
+        literal(event["id"]),
+        literal(event_type),
+        literal(event, type_=JSONB),
+    ).where(WebhookEndpoint.user_id == user_id, WebhookEndpoint.is_active.is_(True))
+    result = await db.execute(
+        insert(WebhookDelivery).from_select(["endpoint_id", "event_id", "event_type", "payload"], source)
+    )
+    return result.rowcount
+
+
+async def post_batch(client: httpx.AsyncClient, url: str, secret: str, events: List[Dict[str, Any]]) -> Optional[str]:
+    """POST one signed batch. Returns None on a 2xx, otherwise the error."""
+    try:
+        target, headers, extensions = await resolve_webhook_url(url)
+    except UnsafeWebhookURL as e:
+        return f"Refused: {e}"
+    body = json.dumps({"events": events}, separators=(",", ":"), default=str).encode()
+    timestamp = int(time.time())
+    headers.update({
+        "Content-Type": "application/json",
+        "User-Agent": USER_AGENT,
+        TIMESTAMP_HEADER: str(timestamp),
+        SIGNATURE_HEADER: sign_payload(secret, timestamp, body),
+    })
+    try:
+        response = await client.post(target, content=body, headers=headers, extensions=extensions)
+    except httpx.HTTPError as e:
+        return f"{type(e).__name__}: {e}"
+    if response.is_success:
+        return None
+    return f"HTTP {response.status_code}: {response.text[:200]}"
+
+
+class WebhookDispatcher:
+    """Claims due outbox rows and delivers them, batched per endpoint."""
+
+    def __init__(self, db: AsyncSession, client: httpx.AsyncClient):
+        self.db = db
+        self.client = client
+        self._semaphore = asyncio.Semaphore(settings.WEBHOOK_CONCURRENCY)
+
+    async def _claim(self, limit: int) -> List:
+        """
+        Lease up to `limit` due rows (SKIP LOCKED, so concurrent sweeps split
+        the work) and count the attempt. Commits so the lease is visible.
+        """
+        due = (
+            select(WebhookDelivery.id)
+            .where(WebhookDelivery.status == "pending", WebhookDelivery.next_attempt_at <= func.now())
+            .order_by(WebhookDelivery.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(
+            update(WebhookDelivery)
+            .where(WebhookDelivery.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=WebhookDelivery.attempts + 1,
+                next_attempt_at=func.now() + timedelta(seconds=CLAIM_LEASE_SECONDS),
+            )
+            .returning(WebhookDelivery.id, WebhookDelivery.endpoint_id, WebhookDelivery.payload, WebhookDelivery.attempts)
+        )
+        rows = result.all()
+        await self.db.commit()
+        return rows
+
+    async def _deliver(self, endpoint: WebhookEndpoint, rows: List) -> Optional[str]:
+        async with self._semaphore:
+            return await post_batch(self.client, endpoint.url, endpoint.secret, [row.payload for row in rows])
+
+    async def dispatch(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """One sweep: claim, deliver and record outcomes. Returns counts."""
+        rows = await self._claim(limit or settings.WEBHOOK_SWEEP_LIMIT)
+        stats = {"claimed": len(rows), "delivered": 0, "retrying": 0, "failed": 0}
+        if not rows:
+            return stats
+
+        by_endpoint = defaultdict(list)
+        for row in rows:
+            by_endpoint[row.endpoint_id].append(row)
+        result = await self.db.execute(select(WebhookEndpoint).where(WebhookEndpoint.id.in_(list(by_endpoint))))
+        endpoints = {endpoint.id: endpoint for endpoint in result.scalars().all()}
+
+        batches = []
+        for endpoint_id, endpoint_rows in by_endpoint.items():
+            for start in range(0, len(endpoint_rows), settings.WEBHOOK_BATCH_SIZE):
+                batches.append((endpoint_id, endpoint_rows[start:start + settings.WEBHOOK_BATCH_SIZE]))
+
+        async def run(endpoint_id: int, batch: List) -> Optional[str]:
+            endpoint = endpoints.get(endpoint_id)
+            if endpoint is None or not endpoint.is_active:
+                return "endpoint disabled"
+            return await self._deliver(endpoint, batch)
+
+        errors = await asyncio.gather(*(run(endpoint_id, batch) for endpoint_id, batch in batches))
+
+        now = datetime.now(timezone.utc)
+        updates = []
+        for (endpoint_id, batch), error in zip(batches, errors):
+            endpoint = endpoints.get(endpoint_id)
+            if error is None:
+                stats["delivered"] += len(batch)
+                updates.extend(
+                    {"id": row.id, "status": "delivered", "delivered_at": now, "last_error": None}
+                    for row in batch
+                )
+                if endpoint:
+                    endpoint.consecutive_failures = 0
+                    endpoint.last_success_at = now
+                continue
+
+            logger.warning(f"Webhook delivery to endpoint {endpoint_id} failed: {error}")
+            if endpoint:
+                endpoint.consecutive_failures += 1
+                endpoint.last_failure_at = now
+            for row in batch:
+                if error == "endpoint disabled" or row.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                    stats["failed"] += 1
+                    updates.append({"id": row.id, "status": "failed", "last_error": error})
+                else:
+                    stats["retrying"] += 1
+                    updates.append({
+                        "id": row.id,
+                        "last_error": error,
+                        "next_attempt_at": now + timedelta(seconds=backoff_seconds(row.attempts)),
+                    })
+
+        # Rows differ in which columns change, so group them into one executemany per shape
+        by_shape = defaultdict(list)
+        for values in updates:
+            by_shape[tuple(sorted(values))].append(values)
+        for shaped in by_shape.values():
+            await self.db.execute(update(WebhookDelivery), shaped)
+        await self.db.commit()
+
+        logger.info(f"Webhook sweep: {stats}")
+        return stats
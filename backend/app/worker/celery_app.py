@@ -2,6 +2,7 @@
 Celery configuration and task definitions
 """
 from celery import Celery
+from celery.signals import celeryd_after_setup
 from app.core.config import settings
 import logging
 
@@ -24,7 +25,43 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=600,  # 10 minutes max
     task_soft_time_limit=540,  # 9 minutes soft limit
+    # Priority lanes (see app.worker.scheduling). Redis emulates priorities
+    # with one list per level; 0 is the highest priority.
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+    },
+    task_default_priority=5,
+    # Fetch one message at a time so a newly queued high-priority task is
+    # not stuck behind messages a worker already reserved.
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    # Webhook delivery waits on customer servers; keep it off the analysis workers
+    task_routes={
+        'tasks.deliver_webhooks': {'queue': settings.WEBHOOK_QUEUE},
+    },
+    beat_schedule={
+        'schedule-refreshes': {
+            'task': 'tasks.schedule_refreshes',
+            'schedule': settings.REFRESH_TICK_SECONDS,
+        },
+        'sweep-webhooks': {
+            'task': 'tasks.deliver_webhooks',
+            'schedule': settings.WEBHOOK_SWEEP_SECONDS,
+        },
+    },
 )
 
+@celeryd_after_setup.connect
+def _advertise_worker_capacity(sender, instance, **kwargs):
+    """Let the API see live workers and their concurrency for queue ETAs."""
+    from app.services.queue_metrics import start_worker_heartbeat, DEFAULT_QUEUE
+    # Webhook-only workers do not run analyses
+    if DEFAULT_QUEUE not in set(instance.app.amqp.queues.consume_from):
+        return
+    start_worker_heartbeat(sender, instance.concurrency)
+
+
 # Import tasks to register them
 from app.worker import tasks
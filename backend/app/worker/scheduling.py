@@ -0,0 +1,284 @@
+"""
+Priority lanes and per-user fair queuing for analysis tasks.
+
+All analyses share one Celery queue, but each message carries a broker
+priority (0 = highest, 9 = lowest). The priority is derived from the lane
+the request came from and from how many analyses the same user already has
+in flight, so a user bulk-submitting hundreds of places sinks behind
+everyone else instead of starving them.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from enum import Enum
+from typing import List, NamedTuple, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.core.database import RedisClient
+from app.exceptions.analysis import TaskQuotaExceededException, QueueOverloadedException
+from app.services.queue_metrics import QueueEstimate, QueueMetrics
+
+logger = logging.getLogger(__name__)
+
+# Each in-flight task is a member of a per-user sorted set scored with its
+# lease deadline. Expired members (a worker killed mid-task, a lost message)
+# are pruned on every reservation, so a slot that is never released frees
+# itself instead of counting against the user for good.
+INFLIGHT_QUEUED_LEASE_SECONDS = 6 * 3600  # Queued: long enough for a bulk batch to drain
+INFLIGHT_RUNNING_LEASE_SECONDS = 900  # Running: beyond the 600 s task_time_limit
+ANONYMOUS_USER = "anonymous"
+
+
+class TaskLane(str, Enum):
+    """Where an analysis request came from."""
+    INTERACTIVE = "interactive"  # A user waiting on /analyze or /places/analyze
+    BULK = "bulk"  # Batch submissions
+    SCHEDULED = "scheduled"  # Background refreshes
+
+
+# (best, worst) broker priority per lane. The ranges do not overlap, so a
+# busy interactive user still outranks every bulk or scheduled message.
+LANE_PRIORITY_RANGE = {
+    TaskLane.INTERACTIVE: (0, 2),
+    TaskLane.BULK: (3, 6),
+    TaskLane.SCHEDULED: (7, 9),
+}
+
+
+def _inflight_key(user_id: Optional[str], lane: TaskLane) -> str:
+    bucket = "interactive" if lane == TaskLane.INTERACTIVE else "background"
+    return f"inflight_tasks:{bucket}:{user_id or ANONYMOUS_USER}"
+
+
+def _inflight_limit(lane: TaskLane) -> int:
+    if lane == TaskLane.INTERACTIVE:
+        return settings.USER_MAX_INFLIGHT_TASKS
+    return settings.USER_MAX_INFLIGHT_BULK_TASKS
+
+
+def compute_priority(lane: TaskLane, inflight: int) -> int:
+    """Broker priority for a user's next task given their in-flight count."""
+    best, worst = LANE_PRIORITY_RANGE[lane]
+    penalty = max(inflight - 1, 0) // max(settings.INFLIGHT_PENALTY_STEP, 1)
+    return min(best + penalty, worst)
+
+
+async def acquire_inflight_slots(user_id: Optional[str], lane: TaskLane, task_ids: List[str], client=None) -> int:
+    """
+    Reserve an in-flight slot per task id for the user.
+    Returns the user's in-flight total after the reservation.
+    Raises TaskQuotaExceededException if the lane cap would be exceeded.
+    """
+    redis_client = client or RedisClient.get_client()
+    if not redis_client:
+        logger.warning("Redis unavailable, skipping in-flight cap check")
+        return len(task_ids)
+
+    key = _inflight_key(user_id, lane)
+    limit = _inflight_limit(lane)
+    now = time.time()
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.zadd(key, {task_id: now + INFLIGHT_QUEUED_LEASE_SECONDS for task_id in task_ids})
+        pipe.zcard(key)
+        pipe.expire(key, INFLIGHT_QUEUED_LEASE_SECONDS)
+        _, _, inflight, _ = await pipe.execute()
+
+    if inflight > limit:
+        await redis_client.zrem(key, *task_ids)
+        logger.info(f"User {user_id or ANONYMOUS_USER} hit {lane.value} in-flight cap ({limit})")
+        raise TaskQuotaExceededException(user_id or ANONYMOUS_USER, limit)
+
+    return inflight
+
+
+async def release_inflight_slots_async(user_id: Optional[str], lane: TaskLane, task_ids: List[str], client=None):
+    """Give back slots reserved by acquire_inflight_slots."""
+    redis_client = client or RedisClient.get_client()
+    if not redis_client or not task_ids:
+        return
+    await redis_client.zrem(_inflight_key(user_id, lane), *task_ids)
+
+
+def renew_inflight_slot(user_id: Optional[str], lane: str, task_id: str, seconds: int):
+    """Extend a task's slot lease: when it starts running, or is retried (worker side, synchronous)."""
+    try:
+        client = redis.Redis.from_url(settings.redis_url)
+        key = _inflight_key(user_id, TaskLane(lane))
+        deadline = time.time() + seconds
+        pipe = client.pipeline(transaction=False)
+        # Re-added if it was already pruned: the task is evidently still alive
+        pipe.zadd(key, {task_id: deadline})
+        pipe.expire(key, INFLIGHT_QUEUED_LEASE_SECONDS)
+        pipe.execute()
+        client.close()
+    except Exception as e:
+        logger.error(f"Failed to renew in-flight slot for {user_id}: {e}")
+
+
+def release_inflight_slot(user_id: Optional[str], lane: str, task_id: str):
+    """Give back a task's slot once it finishes (worker side, synchronous)."""
+    try:
+        client = redis.Redis.from_url(settings.redis_url)
+        client.zrem(_inflight_key(user_id, TaskLane(lane)), task_id)
+        client.close()
+    except Exception as e:
+        logger.error(f"Failed to release in-flight slot for {user_id}: {e}")
+
+
+class QueuedAnalysis(NamedTuple):
+    task_id: str
+    lane: TaskLane
+    priority: int
+    estimate: Optional[QueueEstimate]  # None when no worker is reporting capacity
+
+    @property
+    def deferred(self) -> bool:
+        return self.lane != TaskLane.INTERACTIVE
+
+
+async def _admit(lane: TaskLane, priority: int) -> Tuple[TaskLane, int, Optional[QueueEstimate]]:
+    """
+    Admission control for interactive requests.
+    Past ANALYSIS_QUEUE_SLO_SECONDS the request is rejected (429) or, in
+    "defer" mode, demoted to the bulk lane.
+    """
+    redis_client = RedisClient.get_client()
+    if not redis_client:
+        return lane, priority, None
+
+    try:
+        metrics = QueueMetrics(redis_client)
+        estimate = await metrics.estimate(priority)
+    except Exception as e:
+        logger.warning(f"Queue estimate unavailable, admitting without it: {e}")
+        return lane, priority, None
+
+    slo = settings.ANALYSIS_QUEUE_SLO_SECONDS
+    if lane != TaskLane.INTERACTIVE or not estimate or estimate.wait_seconds <= slo:
+        return lane, priority, estimate
+
+    if settings.ANALYSIS_ADMISSION_MODE == "defer":
+        deferred_priority = LANE_PRIORITY_RANGE[TaskLane.BULK][0]
+        logger.info(f"Deferring analysis to bulk lane (estimated wait {estimate.wait_seconds}s > SLO {slo}s)")
+        return TaskLane.BULK, deferred_priority, await metrics.estimate(deferred_priority)
+
+    retry_after = max(int(math.ceil(estimate.wait_seconds - slo)), 1)
+    raise QueueOverloadedException(estimate.wait_seconds, retry_after)
+
+
+async def enqueue_analysis(query: str, user_id: Optional[str], lane: TaskLane = TaskLane.INTERACTIVE) -> QueuedAnalysis:
+    """
+    Queue an analysis task with a fair-share priority.
+    Raises TaskQuotaExceededException when the user is over their cap and
+    QueueOverloadedException when the queue cannot meet the wait SLO.
+    """
+    from celery.utils import uuid
+    from app.services.progress import ProgressPublisher, TaskStage
+    from app.worker.tasks import analyze_restaurant_task
+
+    task_id = uuid()
+    inflight = await acquire_inflight_slots(user_id, lane, [task_id])
+    try:
+        admitted_lane, priority, estimate = await _admit(lane, compute_priority(lane, inflight))
+    except QueueOverloadedException:
+        await release_inflight_slots_async(user_id, lane, [task_id])
+        raise
+
+    # Publish "queued" before the message exists so it can never overwrite a worker's later stage
+    redis_client = RedisClient.get_client()
+    if redis_client:
+        await ProgressPublisher(task_id, client=redis_client).publish(
+            TaskStage.QUEUED,
+            lane=admitted_lane.value,
+            estimated_wait_seconds=estimate.wait_seconds if estimate else None
+        )
+
+    try:
+        analyze_restaurant_task.apply_async(
+            args=[query, user_id],
+            # The slot was reserved in the original lane's bucket, so release it there
+            kwargs={"lane": lane.value},
+            priority=priority,
+            task_id=task_id,
+        )
+    except Exception:
+        await release_inflight_slots_async(user_id, lane, [task_id])
+        raise
+
+    logger.info(f"Queued {admitted_lane.value} analysis {task_id} for user {user_id} at priority {priority} ({inflight} in flight)")
+    return QueuedAnalysis(task_id, admitted_lane, priority, estimate)
+
+
+def batch_key(batch_id: str) -> str:
+    return f"batch:{batch_id}"
+
+
+async def enqueue_analysis_batch(
+    queries: List[str],
+    user_id: Optional[str],
+    lane: TaskLane = TaskLane.BULK,
+    stored_only: bool = False,
+    client=None,
+    place_names: Optional[List[Optional[str]]] = None
+):
+    """
+    Fan a list of queries out as one Celery group.
+    The whole batch is admitted (or rejected) against the user's cap at once;
+    later items get progressively lower priority so other users interleave.
+    `stored_only` analyzes reviews already in Postgres (e.g. imported) and
+    never scrapes. Pass `client` when calling from a worker.
+
+    The batch record read by /places/batches/{batch_id} is written before
+    anything is published, so a queued batch is always trackable.
+    """
+    from celery import group
+    from celery.utils import uuid
+    from app.worker.tasks import analyze_restaurant_task
+
+    redis_client = client or RedisClient.get_client()
+    count = len(queries)
+    batch_id = uuid()
+    task_ids = [uuid() for _ in queries]
+    inflight = await acquire_inflight_slots(user_id, lane, task_ids, client=client)
+    first = inflight - count
+
+    kwargs = {"lane": lane.value}
+    if stored_only:
+        kwargs["stored_only"] = True
+    signatures = [
+        analyze_restaurant_task.signature(
+            args=[query, user_id],
+            kwargs=kwargs,
+            priority=compute_priority(lane, first + i + 1),
+            task_id=task_id,
+        )
+        for i, (query, task_id) in enumerate(zip(queries, task_ids))
+    ]
+    batch = {
+        "user_id": user_id,
+        "items": [
+            {"task_id": task_id, "place_url": query, "place_name": name}
+            for task_id, query, name in zip(task_ids, queries, place_names or queries)
+        ],
+    }
+
+    recorded = False
+    try:
+        await redis_client.setex(batch_key(batch_id), settings.BATCH_TTL_SECONDS, json.dumps(batch))
+        recorded = True
+        # Publishing is synchronous (one message per item); keep it off the event loop
+        group_result = await asyncio.to_thread(group(signatures).apply_async, task_id=batch_id)
+    except Exception:
+        await release_inflight_slots_async(user_id, lane, task_ids, client=client)
+        if recorded:
+            await redis_client.delete(batch_key(batch_id))
+        raise
+
+    logger.info(f"Queued {lane.value} batch {group_result.id} of {count} analyses for user {user_id}")
+    return group_result
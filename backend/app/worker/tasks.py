@@ -1,33 +1,206 @@
-import asyncio
 import logging
-from typing import Dict
+import os
+import time
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
 from app.worker.celery_app import celery_app
-from app.services.scraper import GoogleMapsScraper
+from app.services.scraper import GoogleMapsScraper, review_set_hash
 from app.services.ai_analyzer import GeminiAnalyzer
-from app.models.restaurant import Restaurant, AnalysisReport
+from app.models.restaurant import RefreshSchedule
+from app.repositories.stats_repository import StatsRepository
+from app.repositories.restaurant_repository import RestaurantRepository, AnalysisReportRepository, AnalysisResultRepository
+from app.core.config import settings
+from app.core.database import create_redis_client
+from app.core.instrumentation import run_monitored
+from app.services.progress import ProgressPublisher, TaskStage, publish_failure_sync
+from app.services.rate_limit import HourlyBudget
+from app.services.queue_metrics import record_stage_durations
+from app.services.dashboard_cache import invalidate_dashboard, invalidate_reviews
+from app.services.place_identity import PlaceResolver, canonical_place_key
+from app.services.webhooks import enqueue_event, EVENT_ANALYSIS_COMPLETED, EVENT_ANALYSIS_FAILED
+from app.services.refresh_planner import (
+    update_review_velocity, next_refresh_time, in_refresh_window, refresh_slots_for_tick
+)
+from app.worker.scheduling import (
+    TaskLane, compute_priority, acquire_inflight_slots, release_inflight_slot, renew_inflight_slot,
+    INFLIGHT_QUEUED_LEASE_SECONDS, INFLIGHT_RUNNING_LEASE_SECONDS,
+)
+from app.exceptions.analysis import TaskQuotaExceededException, ScraperBusyException
+from celery.signals import task_failure, task_revoked
+from redis.exceptions import LockNotOwnedError
 from sqlalchemy import select
-from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import NullPool
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timedelta, timezone
+import random
 
 logger = logging.getLogger(__name__)
 
 
 @celery_app.task(bind=True, name="tasks.analyze_restaurant")
-def analyze_restaurant_task(self, query: str, user_id: str = None) -> Dict:
+def analyze_restaurant_task(
+    self,
+    query: str,
+    user_id: str = None,
+    lane: str = TaskLane.INTERACTIVE.value,
+    stored_only: bool = False
+) -> Dict:
     task_id = self.request.id
-    logger.info(f"Starting analysis task {task_id} for '{query}' (user_id: {user_id})")
+    logger.info(f"Starting {lane} analysis task {task_id} for '{query}' (user_id: {user_id})")
+    can_retry = self.request.retries < settings.GOSOM_JOB_SLOT_MAX_RETRIES
+    retrying = False
+    # Running now: a worker killed mid-task leaks the slot for minutes, not hours
+    renew_inflight_slot(user_id, lane, task_id, INFLIGHT_RUNNING_LEASE_SECONDS)
     
     try:
-        return asyncio.run(_async_analyze_restaurant(query, task_id, user_id))
+        return run_monitored(
+            "tasks.analyze_restaurant",
+            _async_analyze_restaurant(query, task_id, user_id, stored_only, retry_when_busy=can_retry)
+        )
+    except ScraperBusyException as e:
+        if not can_retry:
+            logger.error(f"Task {task_id} failed: {e.message}")
+            raise
+        # Free the worker while Gosom is saturated; the task stays in flight
+        countdown = settings.GOSOM_JOB_SLOT_RETRY_SECONDS * random.uniform(0.8, 1.2)
+        logger.info(f"Task {task_id}: {e.message}, retrying in {countdown:.0f}s")
+        retry = self.retry(exc=e, countdown=countdown, max_retries=None, throw=False)
+        retrying = True
+        renew_inflight_slot(user_id, lane, task_id, INFLIGHT_QUEUED_LEASE_SECONDS)
+        raise retry
     except Exception as e:
         logger.error(f"Task {task_id} failed: {str(e)}", exc_info=True)
         raise
+    finally:
+        if not retrying:
+            release_inflight_slot(user_id, lane, task_id)
+
+
+def _close_dead_analysis(task_id: str, args, kwargs, error: str):
+    """
+    Terminal bookkeeping for an analysis that ended outside its own code
+    (killed at the hard time limit, worker lost, revoked): the task never got
+    to publish FAILED or release its in-flight slot.
+    """
+    publish_failure_sync(task_id, error)
+    args, kwargs = args or (), kwargs or {}
+    user_id = args[1] if len(args) > 1 else kwargs.get("user_id")
+    release_inflight_slot(user_id, kwargs.get("lane", TaskLane.INTERACTIVE.value), task_id)
+
+
+@task_failure.connect
+def _on_analysis_failure(sender=None, task_id=None, exception=None, args=None, kwargs=None, **_):
+    if getattr(sender, "name", None) != analyze_restaurant_task.name:
+        return
+    _close_dead_analysis(task_id, args, kwargs, str(exception) or type(exception).__name__)
+
+
+@task_revoked.connect
+def _on_analysis_revoked(sender=None, request=None, expired=False, **_):
+    if getattr(sender, "name", None) != analyze_restaurant_task.name or request is None:
+        return
+    _close_dead_analysis(request.id, request.args, request.kwargs, "Task expired" if expired else "Task was cancelled")
+
+
+@asynccontextmanager
+async def _task_session() -> AsyncIterator[AsyncSession]:
+    """
+    The one database session a task run uses for all its reads and writes.
+    Each run gets its own event loop (asyncio.run), so connections cannot be
+    pooled across runs: NullPool opens one per transaction and closes it.
+    """
+    engine = create_async_engine(settings.postgres_url, echo=True, future=True, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    finally:
+        await engine.dispose()
+
+
+async def _async_analyze_restaurant(
+    query: str,
+    task_id: str,
+    user_id: str = None,
+    stored_only: bool = False,
+    retry_when_busy: bool = False
+) -> Dict:
+    redis_client = create_redis_client()
+    progress = ProgressPublisher(task_id, client=redis_client)
+    try:
+        async with _task_session() as session:
+            return await _run_analysis(query, task_id, user_id, progress, redis_client, session, stored_only)
+    except Exception as e:
+        if retry_when_busy and isinstance(e, ScraperBusyException):
+            # Not a failure: the task runs again once a scraper slot frees up
+            await progress.publish(TaskStage.QUEUED, waiting_for="scraper")
+        else:
+            await progress.publish(TaskStage.FAILED, error=str(e))
+            await _notify_failure(task_id, query, user_id, str(e))
+        raise
+    finally:
+        await redis_client.close()
+
+
+async def _notify_failure(task_id: str, query: str, user_id: str, error: str):
+    """Queue an analysis.failed webhook so integrations never have to poll."""
+    if not user_id:
+        return
+    try:
+        async with _task_session() as session:
+            queued = await enqueue_event(session, user_id, EVENT_ANALYSIS_FAILED, {
+                "task_id": task_id,
+                "query": query,
+                "error": error,
+            })
+            await session.commit()
+        if queued:
+            deliver_webhooks_task.delay()
+    except Exception as e:
+        logger.warning(f"Failed to queue failure webhook for task {task_id}: {e}")
+
+
+async def _consume_budget(redis_client, name: str, limit: int):
+    try:
+        await HourlyBudget(redis_client, name, limit).consume()
+    except Exception as e:
+        logger.warning(f"Failed to record {name} budget usage: {e}")
 
 
-async def _async_analyze_restaurant(query: str, task_id: str, user_id: str = None) -> Dict:
+async def _run_analysis(
+    query: str,
+    task_id: str,
+    user_id: str,
+    progress: ProgressPublisher,
+    redis_client,
+    session: AsyncSession,
+    stored_only: bool = False
+) -> Dict:
+    await progress.publish(TaskStage.STARTED, query=query)
     logger.info(f"Step 1: Searching Google Maps for '{query}'")
+    await progress.publish(TaskStage.SCRAPING)
+    started = time.monotonic()
+    durations = {}
     
-    scraper = GoogleMapsScraper(headless=True)
-    scrape_result = await scraper._scrape_reviews_async(query, max_reviews=100)
+    # Another spelling or URL of the same place may have been scraped moments ago
+    place_key = await _resolve_place(session, query, redis_client)
+    scrape_result = await _load_recent_scrape(session, place_key, fresh_only=not stored_only) if place_key else None
+    # End the read transaction so no connection is held while scraping
+    await session.commit()
+    if stored_only and not scrape_result:
+        raise ValueError(f"No stored reviews for '{query}'")
+    if scrape_result:
+        logger.info(f"Reusing recent scrape of {place_key} for '{query}'")
+    else:
+        async with GoogleMapsScraper(headless=True) as scraper:
+            scrape_result = await scraper._scrape_reviews_async(
+                query, max_reviews=100, on_archived=lambda payload: _link_payload(session, query, payload)
+            )
+        await _consume_budget(redis_client, "gosom", settings.GOSOM_HOURLY_BUDGET)
+        place_key = canonical_place_key(scrape_result['restaurant_info'].get('place_id'), query)
+        if scrape_result['reviews']:
+            await _store_scrape(session, place_key, query, scrape_result, redis_client)
+    durations["scrape"] = time.monotonic() - started
     
     restaurant_info = scrape_result['restaurant_info']
     reviews = scrape_result['reviews']
@@ -35,19 +208,40 @@ async def _async_analyze_restaurant(query: str, task_id: str, user_id: str = Non
     if not reviews:
         raise ValueError(f"No reviews found for '{query}'")
     
-    logger.info(f"Step 2: Storing {len(reviews)} raw reviews in PostgreSQL")
-    await _store_raw_reviews_postgres(query, scrape_result)
+    await progress.publish(TaskStage.SCRAPED, reviews_parsed=len(reviews), restaurant_name=restaurant_info['name'])
     
-    logger.info("Step 3: Analyzing reviews with Gemini AI")
-    analyzer = GeminiAnalyzer()
-    # Clean reviews for AI (remove images/profile_pics to keep payload lean)
-    ai_reviews = [{k: v for k, v in r.items() if k != 'profile_picture'} for r in reviews]
-    analysis_result = await analyzer.analyze_reviews(ai_reviews, restaurant_info['name'])
+    logger.info("Step 2: Analyzing reviews with Gemini AI")
+    await progress.publish(TaskStage.ANALYZING, reviews_parsed=len(reviews))
+    stage_started = time.monotonic()
+    # The analysis depends only on the place and its reviews: reuse it across users
+    set_hash = review_set_hash(reviews)
+    result_repo = AnalysisResultRepository(session)
+    shared = await result_repo.get_reusable(place_key, set_hash)
+    await session.commit()
+    if shared:
+        logger.info(f"Reusing analysis result {shared.id} for {place_key}")
+        analysis_result = result_repo.to_dict(shared)
+    else:
+        analyzer = GeminiAnalyzer()
+        # Clean reviews for AI (remove images/profile_pics to keep payload lean)
+        ai_reviews = [{k: v for k, v in r.items() if k != 'profile_picture'} for r in reviews]
+        analysis_result = await analyzer.analyze_reviews(ai_reviews, restaurant_info['name'])
+        await _consume_budget(redis_client, "gemini", settings.GEMINI_HOURLY_BUDGET)
+    durations["analyze"] = time.monotonic() - stage_started
     
-    logger.info("Step 4: Storing analysis results in PostgreSQL")
-    analysis_id = await _store_analysis_postgres(
-        query, restaurant_info, analysis_result, task_id, user_id
+    logger.info("Step 3: Storing the analysis in PostgreSQL")
+    await progress.publish(TaskStage.STORING)
+    stage_started = time.monotonic()
+    analysis_id, rescored_users, analysis_result = await _persist_analysis(
+        session, place_key, query, scrape_result, analysis_result, set_hash, task_id, user_id, redis_client
     )
+    # The report is committed; retire the cached dashboards it changed
+    for affected_user in {user_id, *rescored_users}:
+        await invalidate_dashboard(redis_client, affected_user)
+    durations["store"] = time.monotonic() - stage_started
+    durations["total"] = time.monotonic() - started
+    await record_stage_durations(redis_client, durations)
+    await progress.publish(TaskStage.COMPLETED, analysis_id=analysis_id)
     
     return {
         "id": analysis_id,
@@ -64,97 +258,368 @@ async def _async_analyze_restaurant(query: str, task_id: str, user_id: str = Non
     }
 
 
-async def _store_raw_reviews_postgres(query: str, scrape_result: Dict):
-    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-    from app.core.config import settings
-    from app.models.review import RawReview
+async def _resolve_place(session: AsyncSession, query: str, redis_client) -> Optional[str]:
+    try:
+        return await PlaceResolver(session, redis_client).resolve(query)
+    except Exception as e:
+        logger.warning(f"Place resolution failed for '{query}': {e}")
+        await session.rollback()
+        return None
+
+
+async def _load_recent_scrape(session: AsyncSession, place_key: str, fresh_only: bool = True) -> Optional[Dict]:
+    """
+    The place's last scrape (or import), rebuilt from storage, if it is
+    fresh enough to reuse. `fresh_only=False` accepts any age.
+    """
+    from app.models.review import RawReview, Review
     
-    engine = create_async_engine(settings.postgres_url, echo=True, future=True)
-    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    query = select(RawReview).where(RawReview.query == place_key)
+    if fresh_only:
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.SCRAPE_REUSE_MINUTES)
+        query = query.where(RawReview.scraped_at >= cutoff)
+    result = await session.execute(query)
+    raw = result.scalar_one_or_none()
+    if not raw:
+        return None
     
-    async with session_maker() as session:
-        # Check if already exists for this query
-        result = await session.execute(
-            select(RawReview).where(RawReview.query == query)
+    # Rows touched by that scrape (inserted or refreshed after it started)
+    result = await session.execute(
+        select(Review)
+        .where(Review.place_key == place_key, Review.last_seen_at >= raw.scraped_at)
+        .order_by(Review.published_at.desc().nullslast(), Review.id.desc())
+        .limit(100)
+    )
+    reviews = [
+        {
+            'text': r.text or '',
+            'rating': r.rating,
+            'author': r.author,
+            'date_text': r.date_text,
+            'profile_picture': r.profile_picture,
+            'review_id': r.source_review_id or r.signature,
+        }
+        for r in result.scalars().all()
+    ]
+    if not reviews:
+        return None
+    return {
+        'restaurant_info': raw.restaurant_info,
+        'reviews': reviews,
+        'total_reviews_collected': len(reviews),
+        'scraped_at': raw.scraped_at.isoformat()
+    }
+
+
+def _scraped_at(scrape_result: Dict) -> datetime:
+    scraped_at = scrape_result['scraped_at']
+    if isinstance(scraped_at, str):
+        scraped_at = datetime.fromisoformat(scraped_at)
+    return scraped_at if scraped_at.tzinfo else scraped_at.replace(tzinfo=timezone.utc)
+
+
+async def _link_payload(session: AsyncSession, query: str, payload: Dict) -> Optional[int]:
+    """
+    Link an archived download in its own commit, before it is parsed, so a
+    download whose parse or storage fails can still be replayed. Never fails
+    the scrape.
+    """
+    from app.repositories.review_repository import ReviewRepository
+    
+    try:
+        link_id = await ReviewRepository(session).link_payload(None, query, payload)
+        await session.commit()
+        return link_id
+    except Exception as e:
+        await session.rollback()
+        logger.warning(f"Failed to link archived payload {payload['content_hash']}: {e}")
+        return None
+
+
+async def _store_scrape(session: AsyncSession, place_key: str, query: str, scrape_result: Dict, redis_client=None):
+    """
+    Commit a fresh scrape on its own, before the AI step: its reviews, scrape
+    metadata, the place of its payload link and aliases. If Gemini then fails, the
+    retry finds the scrape through _load_recent_scrape instead of spending
+    Gosom budget on it again.
+    """
+    from app.repositories.review_repository import ReviewRepository
+    
+    restaurant_info = scrape_result['restaurant_info']
+    scraped_at = _scraped_at(scrape_result)
+    try:
+        review_repo = ReviewRepository(session)
+        written = await review_repo.upsert_many(place_key, scrape_result['reviews'], scraped_at)
+        await review_repo.upsert_scrape_metadata(
+            place_key, restaurant_info, scrape_result['total_reviews_collected'], scraped_at
+        )
+        link_id = (scrape_result.get('payload') or {}).get('link_id')
+        if link_id:
+            await review_repo.set_payload_place(link_id, place_key)
+        # Both the user's wording and the place's Maps link now lead here
+        await PlaceResolver(session, redis_client).record(
+            place_key, restaurant_info.get('place_id') or None, [query, restaurant_info.get('link') or '']
         )
-        existing = result.scalar_one_or_none()
-        
-        if existing:
-            # Update existing
-            existing.restaurant_info = scrape_result['restaurant_info']
-            existing.reviews = scrape_result['reviews']
-            existing.total_reviews_collected = scrape_result['total_reviews_collected']
-            existing.scraped_at = datetime.fromisoformat(scrape_result['scraped_at']) if isinstance(scrape_result['scraped_at'], str) else scrape_result['scraped_at']
-        else:
-            # Create new
-            new_raw = RawReview(
-                query=query,
-                restaurant_info=scrape_result['restaurant_info'],
-                reviews=scrape_result['reviews'],
-                total_reviews_collected=scrape_result['total_reviews_collected']
-            )
-            session.add(new_raw)
-            
         await session.commit()
-    logger.info(f"Stored raw data in PostgreSQL")
+    except Exception:
+        await session.rollback()
+        raise
+    await invalidate_reviews(redis_client, [place_key])
+    logger.info(f"Stored {written} scraped reviews for {place_key}")
 
 
-async def _store_analysis_postgres(
+async def _persist_analysis(
+    session: AsyncSession,
+    place_key: str,
     query: str,
-    restaurant_info: Dict,
+    scrape_result: Dict,
     analysis_result: Dict,
+    set_hash: str,
     task_id: str,
-    user_id: str = None
-) -> int:
-    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-    from app.core.config import settings
-    
-    engine = create_async_engine(settings.postgres_url, echo=True, future=True)
-    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    user_id: str = None,
+    redis_client=None
+) -> Tuple[int, Set[str], Dict]:
+    """
+    Write what a finished analysis produces in one transaction: restaurant,
+    shared result, the user's report entry, refresh schedule, the stats
+    rollup and the webhook outbox. The scrape itself was already committed
+    by _store_scrape. Each write is a single upsert/insert statement.
+    Returns the report id, the other users whose reports were rescored, and
+    the analysis as stored (which may be a real result the fallback lost to).
+    """
+    restaurant_info = scrape_result['restaurant_info']
+    place_id = restaurant_info.get('place_id') or None
     
-    async with session_maker() as session:
-        result = await session.execute(
-            select(Restaurant).where(Restaurant.google_maps_url == query)
+    try:
+        restaurants = RestaurantRepository(session)
+        restaurant_id = await restaurants.upsert_by_place_key(
+            place_key,
+            name=restaurant_info['name'],
+            google_maps_url=restaurant_info.get('link') or query,
+            place_id=place_id,
+            address=restaurant_info.get('address'),
+            rating=restaurant_info.get('rating'),
+            total_reviews=restaurant_info.get('total_reviews')
         )
-        restaurant = result.scalar_one_or_none()
         
-        if not restaurant:
-            try:
-                restaurant = Restaurant(
-                    name=restaurant_info['name'],
-                    google_maps_url=query,
-                    address=restaurant_info.get('address'),
-                    rating=restaurant_info.get('rating'),
-                    total_reviews=restaurant_info.get('total_reviews')
-                )
-                session.add(restaurant)
-                await session.flush()
-            except Exception:
-                # Fallback in case of race condition: try to fetch again
-                await session.rollback()
-                result = await session.execute(
-                    select(Restaurant).where(Restaurant.google_maps_url == query)
-                )
-                restaurant = result.scalar_one_or_none()
-                if not restaurant:
-                    raise  # Re-raise if still not found
-        
-        analysis_report = AnalysisReport(
-            restaurant_id=restaurant.id,
+        result_repo = AnalysisResultRepository(session)
+        stored = await result_repo.upsert(place_key, set_hash, analysis_result)
+        result_id = stored.id
+        # A fallback that raced a stored real result keeps the real one: report that
+        analysis_result = result_repo.to_dict(stored)
+        rescored = []
+        if not stored.is_fallback:
+            # A real result may just have replaced a fallback other reports show
+            rescored = await result_repo.sync_report_scores(result_id)
+            await StatsRepository(session).rescore_reports(rescored)
+        analysis_id, created_at = await AnalysisReportRepository(session).insert(
+            restaurant_id=restaurant_id,
+            result_id=result_id,
             task_id=task_id,
             user_id=user_id,
-            sentiment_score=analysis_result['sentiment_score'],
-            summary=analysis_result['summary'],
-            complaints=analysis_result['complaints'],
-            praises=analysis_result['praises'],
-            recommended_actions=analysis_result.get('recommended_actions', []),
-            reviews_analyzed=analysis_result['reviews_analyzed'],
-            raw_ai_response=analysis_result
+            sentiment_score=analysis_result['sentiment_score']
         )
         
-        session.add(analysis_report)
+        await _update_refresh_schedule(session, restaurant_id, query, restaurant_info, user_id)
+        if user_id:
+            await StatsRepository(session).record_report(user_id, created_at, analysis_result['sentiment_score'])
+        webhooks_queued = await enqueue_event(session, user_id, EVENT_ANALYSIS_COMPLETED, {
+            "task_id": task_id,
+            "analysis_id": analysis_id,
+            "query": query,
+            "restaurant_name": restaurant_info['name'],
+            "restaurant_rating": restaurant_info.get('rating'),
+            "google_maps_url": restaurant_info.get('link') or query,
+            "sentiment_score": analysis_result['sentiment_score'],
+            "summary": analysis_result['summary'],
+            "complaints": analysis_result['complaints'],
+            "praises": analysis_result['praises'],
+            "recommended_actions": analysis_result.get('recommended_actions', []),
+            "reviews_analyzed": analysis_result['reviews_analyzed'],
+            "created_at": created_at.isoformat(),
+        })
         await session.commit()
-        await session.refresh(analysis_report)
-        
-        logger.info(f"Stored analysis in PostgreSQL for restaurant_id={restaurant.id}, report_id={analysis_report.id}")
-        return analysis_report.id
+    except Exception:
+        await session.rollback()
+        raise
+    
+    if restaurants.moved_keys:
+        await invalidate_reviews(redis_client, [place_key, *restaurants.moved_keys])
+    logger.info(f"Stored report_id={analysis_id} for restaurant_id={restaurant_id}")
+    if webhooks_queued:
+        deliver_webhooks_task.delay()
+    return analysis_id, {row.user_id for row in rescored}, analysis_result
+
+
+async def _update_refresh_schedule(session, restaurant_id: int, query: str, restaurant_info: Dict, user_id: str = None):
+    """Start tracking a restaurant, or re-plan its cadence from the review velocity just observed."""
+    now = datetime.now(timezone.utc)
+    review_count = restaurant_info.get('total_reviews')
+
+    result = await session.execute(
+        select(
+            RefreshSchedule.reviews_per_day,
+            RefreshSchedule.last_review_count,
+            RefreshSchedule.last_refreshed_at
+        ).where(RefreshSchedule.restaurant_id == restaurant_id)
+    )
+    previous = result.one_or_none()
+
+    reviews_per_day = None
+    if previous:
+        reviews_per_day = update_review_velocity(
+            previous.reviews_per_day,
+            previous.last_review_count,
+            review_count,
+            now - previous.last_refreshed_at if previous.last_refreshed_at else None
+        )
+
+    values = {
+        "last_review_count": review_count,
+        "reviews_per_day": reviews_per_day,
+        "last_refreshed_at": now,
+        "next_refresh_at": next_refresh_time(now, reviews_per_day),
+    }
+    if user_id:
+        values["user_id"] = user_id
+    stmt = insert(RefreshSchedule).values(restaurant_id=restaurant_id, query=query, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=[RefreshSchedule.restaurant_id], set_=values)
+    await session.execute(stmt)
+
+
+@celery_app.task(bind=True, name="tasks.import_reviews", time_limit=None, soft_time_limit=None)
+def import_reviews_task(self, path: str, user_id: str = None, analyze: bool = False) -> Dict:
+    """Import an uploaded review dump; the file is removed afterwards, even if the import fails."""
+    logger.info(f"Starting review import task {self.request.id} for {path} (user_id: {user_id})")
+    try:
+        return run_monitored("tasks.import_reviews", _async_import_reviews(path, user_id, analyze))
+    except Exception as e:
+        logger.error(f"Review import {self.request.id} failed: {str(e)}", exc_info=True)
+        raise
+    finally:
+        with suppress(FileNotFoundError):
+            os.remove(path)
+
+
+async def _async_import_reviews(path: str, user_id: str = None, analyze: bool = False) -> Dict:
+    from app.services.review_importer import ReviewImporter, queue_imported_analyses
+
+    redis_client = create_redis_client()
+    try:
+        async with _task_session() as session:
+            importer = ReviewImporter(session, redis_client)
+            result = await importer.import_file(path)
+        if analyze:
+            result["analysis"] = await queue_imported_analyses(importer, user_id, redis_client)
+        return result
+    finally:
+        await redis_client.close()
+
+
+@celery_app.task(name="tasks.deliver_webhooks")
+def deliver_webhooks_task() -> Dict:
+    """
+    Deliver due webhook outbox rows (routed to the webhook queue). Triggered
+    after each commit that queues events; the beat sweep picks up retries.
+    """
+    return run_monitored("tasks.deliver_webhooks", _async_deliver_webhooks())
+
+
+async def _async_deliver_webhooks() -> Dict:
+    import httpx
+    from app.services.webhooks import WebhookDispatcher
+
+    totals = {"claimed": 0, "delivered": 0, "retrying": 0, "failed": 0}
+    async with _task_session() as session:
+        async with httpx.AsyncClient(timeout=settings.WEBHOOK_TIMEOUT_SECONDS) as client:
+            dispatcher = WebhookDispatcher(session, client)
+            # Drain what is due now, but leave a backlog to the next sweep
+            for _ in range(10):
+                stats = await dispatcher.dispatch()
+                for key, value in stats.items():
+                    totals[key] += value
+                if stats["claimed"] < settings.WEBHOOK_SWEEP_LIMIT:
+                    break
+    return totals
+
+
+@celery_app.task(name="tasks.schedule_refreshes")
+def schedule_refreshes_task() -> Dict:
+    """Beat entry point: dispatch due restaurant refreshes within the hourly budget."""
+    if not settings.REFRESH_ENABLED:
+        return {"dispatched": 0, "reason": "disabled"}
+    return run_monitored("tasks.schedule_refreshes", _async_schedule_refreshes())
+
+
+async def _async_schedule_refreshes() -> Dict:
+    from celery.utils import uuid
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+    now = datetime.now(timezone.utc)
+    if not in_refresh_window(now):
+        return {"dispatched": 0, "reason": "outside refresh window"}
+
+    redis_client = create_redis_client()
+    # Only one beat/worker node plans refreshes per tick
+    lock = redis_client.lock("lock:refresh_scheduler", timeout=settings.REFRESH_TICK_SECONDS, blocking=False)
+    if not await lock.acquire():
+        await redis_client.close()
+        return {"dispatched": 0, "reason": "another scheduler holds the lock"}
+
+    try:
+        remaining = min(
+            await HourlyBudget(redis_client, "gosom", settings.GOSOM_HOURLY_BUDGET).remaining(),
+            await HourlyBudget(redis_client, "gemini", settings.GEMINI_HOURLY_BUDGET).remaining(),
+        )
+        slots = refresh_slots_for_tick(now, remaining)
+        if not slots:
+            return {"dispatched": 0, "reason": "hourly budget exhausted"}
+
+        engine = create_async_engine(settings.postgres_url, future=True)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        dispatched = 0
+
+        async with session_maker() as session:
+            result = await session.execute(
+                select(RefreshSchedule)
+                .where(RefreshSchedule.next_refresh_at <= now)
+                .order_by(RefreshSchedule.next_refresh_at)
+                .limit(slots)
+                .with_for_update(skip_locked=True)
+            )
+            due = result.scalars().all()
+
+            for schedule in due:
+                task_id = uuid()
+                try:
+                    inflight = await acquire_inflight_slots(
+                        schedule.user_id, TaskLane.SCHEDULED, [task_id], client=redis_client
+                    )
+                except TaskQuotaExceededException:
+                    # The owner is busy with their own work; try again next tick
+                    continue
+
+                analyze_restaurant_task.apply_async(
+                    args=[schedule.query, schedule.user_id],
+                    kwargs={"lane": TaskLane.SCHEDULED.value},
+                    task_id=task_id,
+                    priority=compute_priority(TaskLane.SCHEDULED, inflight),
+                    # Spread this tick's refreshes over the tick instead of sending a burst
+                    countdown=random.uniform(0, settings.REFRESH_TICK_SECONDS),
+                )
+                # Provisional: re-planned from real velocity when the refresh stores its report
+                schedule.next_refresh_at = now + timedelta(hours=settings.REFRESH_MIN_INTERVAL_HOURS)
+                dispatched += 1
+
+            await session.commit()
+        await engine.dispose()
+
+        logger.info(f"Dispatched {dispatched} scheduled refreshes ({remaining} budget left this hour)")
+        return {"dispatched": dispatched, "budget_remaining": remaining}
+    finally:
+        try:
+            await lock.release()
+        except LockNotOwnedError:
+            # The tick outlived the lock and another node may already be planning
+            logger.warning("Refresh scheduler lock expired before the tick finished")
+        await redis_client.close()
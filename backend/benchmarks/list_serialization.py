@@ -0,0 +1,147 @@
+"""
+Benchmark the list endpoints' serialization paths, without a database.
+
+Serves the same in-memory review and history rows two ways:
+  models: one Pydantic item per row, validated again via response_model
+  fast:   plain dicts encoded by ORJSONResponse (what the API now does)
+and reports requests/s and latency percentiles per page size, optionally
+with gzip. Requests go through the ASGI stack in-process (httpx ASGITransport),
+so the numbers isolate framework + serialization cost.
+
+Usage:
+    python -m benchmarks.list_serialization [--sizes 20,100,500,1000] [--requests 300] [--concurrency 10] [--gzip]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.core.middleware import CompressionMiddleware
+from app.schemas.analysis import (
+    AnalysisHistoryItem, AnalysisHistoryResponse, ReviewItem, ReviewListResponse,
+    history_item_dict, review_item_dict
+)
+
+ReviewRow = namedtuple("ReviewRow", "id published_at text rating author date_text profile_picture")
+HistoryRow = namedtuple("HistoryRow", "id sentiment_score summary created_at restaurant_name google_maps_url")
+
+TEXT = "The lahmacun was crisp and the service quick, but the ayran was warm and the tables sticky. " * 3
+
+
+def make_rows(size: int):
+    now = datetime.now(timezone.utc)
+    reviews = [
+        ReviewRow(i, now - timedelta(hours=i), TEXT, 4.0, f"Reviewer {i}", "2 weeks ago",
+                  f"https://lh3.googleusercontent.com/a/{i}=s120")
+        for i in range(size)
+    ]
+    history = [
+        HistoryRow(i, 0.42, TEXT, now - timedelta(hours=i), f"Restaurant {i}",
+                   f"https://www.google.com/maps/place/?q=place_id:ChIJ{i}")
+        for i in range(size)
+    ]
+    return reviews, history
+
+
+def build_app(size: int, gzip: bool) -> FastAPI:
+    reviews, history = make_rows(size)
+    app = FastAPI()
+    if gzip:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024, compresslevel=5)
+
+    @app.get("/models/reviews", response_model=ReviewListResponse)
+    async def models_reviews():
+        items = [
+            ReviewItem(text=r.text, rating=r.rating, author=r.author, date=r.date_text,
+                       profile_picture=r.profile_picture, source="Google Maps")
+            for r in reviews
+        ]
+        return ReviewListResponse(restaurant_name="Kebapci", total_reviews=size, reviews=items)
+
+    @app.get("/fast/reviews")
+    async def fast_reviews():
+        return ORJSONResponse({
+            "restaurant_name": "Kebapci",
+            "total_reviews": size,
+            "reviews": [review_item_dict(r) for r in reviews],
+            "next_cursor": None,
+        })
+
+    @app.get("/models/history", response_model=AnalysisHistoryResponse)
+    async def models_history():
+        items = [
+            AnalysisHistoryItem(id=r.id, restaurant_name=r.restaurant_name, sentiment_score=r.sentiment_score,
+                                summary=r.summary, created_at=r.created_at, status="COMPLETED",
+                                google_maps_url=r.google_maps_url)
+            for r in history
+        ]
+        return AnalysisHistoryResponse(items=items, total=size)
+
+    @app.get("/fast/history")
+    async def fast_history():
+        return ORJSONResponse({"items": [history_item_dict(r) for r in history], "total": size, "next_cursor": None})
+
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int, gzip: bool):
+    headers = {"Accept-Encoding": "gzip" if gzip else "identity"}
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    sizes = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up
+        for _ in range(5):
+            await client.get(path, headers=headers)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                sizes.append(int(response.headers.get("content-length", len(response.content))))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+    return requests / elapsed, statistics.median(latencies) * 1000, p99 * 1000, statistics.mean(sizes)
+
+
+async def main_async(sizes, requests: int, concurrency: int, gzip: bool):
+    print(f"{'endpoint':<10}{'items':>7}  {'path':<8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'bytes':>10}")
+    for size in sizes:
+        app = build_app(size, gzip)
+        for endpoint in ("reviews", "history"):
+            for variant in ("models", "fast"):
+                rps, p50, p99, body = await run(app, f"/{variant}/{endpoint}", requests, concurrency, gzip)
+                print(f"{endpoint:<10}{size:>7}  {variant:<8}{rps:>9.0f}{p50:>9.2f}{p99:>9.2f}{body:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization")
+    parser.add_argument("--sizes", default="20,100,500,1000", help="Comma-separated page sizes")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint and size")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--gzip", action="store_true", help="Send Accept-Encoding: gzip")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    asyncio.run(main_async(sizes, args.requests, args.concurrency, args.gzip))
+
+
+if __name__ == "__main__":
+    main()
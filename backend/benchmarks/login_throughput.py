@@ -0,0 +1,187 @@
+"""
+Benchmark login and Google OAuth callback throughput, and what they do to
+the rest of the API while they run.
+
+Drives the real auth router in-process (httpx ASGITransport) with a user
+table held in memory, and points GOOGLE_TOKEN_URI at a local stand-in token
+endpoint that answers after --token-latency-ms. While the auth load runs, a
+probe requests a trivial route every 10 ms; its p99/max show how long other
+requests wait behind auth work on the event loop.
+
+--inline runs the blocking calls directly in the handlers (the old
+behaviour) for comparison with the bounded pools.
+
+Usage:
+    python -m benchmarks.login_throughput [--scenario login|oauth] [--requests 200] [--concurrency 20] [--token-latency-ms 100] [--inline]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.v1 import auth
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_password_hash
+from app.models.user import User
+
+EMAIL = "bench@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+def start_token_endpoint(latency: float):
+    """Stand-in for Google's token endpoint."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps({
+                "access_token": "bench-access", "refresh_token": "bench-refresh", "token_type": "Bearer",
+                "expires_in": 3600, "scope": " ".join(auth.SCOPES),
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/token"
+
+
+class MemorySession:
+    """Just enough of AsyncSession for the auth handlers, without a database."""
+
+    def __init__(self, user: User):
+        self.user = user
+
+    async def execute(self, _statement):
+        return self
+
+    def scalar_one_or_none(self):
+        return self.user
+
+    def add(self, _obj):
+        pass
+
+    async def commit(self):
+        pass
+
+
+class InlinePool:
+    """The pre-pool behaviour: call the blocking function on the event loop."""
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def build_app(inline: bool) -> FastAPI:
+    user = User(id=1, email=EMAIL, hashed_password=get_password_hash(PASSWORD), is_active=True)
+    if inline:
+        auth.password_pool = auth.oauth_pool = InlinePool()
+
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.dependency_overrides[get_db] = lambda: MemorySession(user)
+
+    @app.get("/probe")
+    async def probe():
+        return {"ok": True}
+
+    return app
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] * 1000 if values else 0.0
+
+
+async def run(app: FastAPI, scenario: str, requests: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    latencies, probes, statuses = [], [], {}
+    remaining = [requests]
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def call():
+            if scenario == "oauth":
+                return await client.get("/auth/google/callback", params={"code": "bench-code", "state": EMAIL})
+            return await client.post("/auth/token", data={"username": EMAIL, "password": PASSWORD})
+
+        async def worker():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                started = time.perf_counter()
+                response = await call()
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            # Measured from when the probe was due, so time spent waiting
+            # for a blocked event loop to wake it up counts too
+            while True:
+                due = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                await client.get("/probe")
+                probes.append(time.perf_counter() - due)
+                if done.is_set():
+                    break
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    return {
+        "req/s": requests / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p99 ms": percentile(latencies, 0.99),
+        "probe p99 ms": percentile(probes, 0.99),
+        "probe max ms": max(probes) * 1000 if probes else 0.0,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login / OAuth callback throughput")
+    parser.add_argument("--scenario", choices=["login", "oauth"], default="login")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--token-latency-ms", type=float, default=100, help="Stand-in token endpoint latency")
+    parser.add_argument("--inline", action="store_true", help="Run blocking calls on the event loop (old behaviour)")
+    args = parser.parse_args()
+
+    # The stand-in speaks plain HTTP
+    os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
+    server, token_uri = start_token_endpoint(args.token_latency_ms / 1000)
+    settings.GOOGLE_TOKEN_URI = token_uri
+    settings.AUTH_GOOGLE_ID = settings.AUTH_GOOGLE_ID or "bench-client"
+    settings.AUTH_GOOGLE_SECRET = settings.AUTH_GOOGLE_SECRET or "bench-secret"
+
+    try:
+        stats = asyncio.run(run(build_app(args.inline), args.scenario, args.requests, args.concurrency))
+    finally:
+        server.shutdown()
+
+    mode = "inline" if args.inline else "pool"
+    print(f"{args.scenario} ({mode}, {args.requests} requests, concurrency {args.concurrency})")
+    for name, value in stats.items():
+        print(f"  {name:<14}{value:.2f}" if isinstance(value, float) else f"  {name:<14}{value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints import get_analyses_batch
+from app.core.config import settings
+from app.models.restaurant import AnalysisReport, AnalysisResult, Restaurant
+from app.schemas.analysis import AnalysisBatchRequest
+
+
+def _report(report_id, user_id, with_result=True):
+    return AnalysisReport(
+        id=report_id,
+        user_id=user_id,
+        sentiment_score=0.5,
+        created_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+        restaurant=Restaurant(name=f"Place {report_id}", rating=4.2, google_maps_url=f"https://maps/{report_id}"),
+        result=AnalysisResult(summary="ok", complaints=[], praises=[], recommended_actions=[], reviews_analyzed=10)
+        if with_result else None,
+    )
+
+
+class StoreSession:
+    """Applies the query's id list and user filter to reports held in memory."""
+
+    def __init__(self, reports):
+        self.reports = reports
+        self.queries = []
+
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        self.queries.append(str(compiled))
+        ids = next(v for k, v in compiled.params.items() if k.startswith("id_"))
+        user_id = next(v for k, v in compiled.params.items() if k.startswith("user_id_"))
+        matches = [r for r in self.reports if r.id in ids and r.user_id == user_id]
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: matches))
+
+
+def _batch(session, ids, user_id="u1"):
+    return asyncio.run(get_analyses_batch(AnalysisBatchRequest(user_id=user_id, ids=ids), db=session))
+
+
+def test_batch_keeps_request_order_and_reports_missing_ids():
+    session = StoreSession([_report(1, "u1"), _report(2, "u1"), _report(3, "u2"), _report(4, "u1", with_result=False)])
+
+    response = _batch(session, [2, 3, 1, 2, 4, 99])
+
+    assert [item.id for item in response.items] == [2, 1]
+    # Another user's report, one without a result yet and an unknown id
+    assert response.missing == [3, 4, 99]
+    # One query, with duplicates removed
+    assert len(session.queries) == 1
+    assert "analysis_reports.id IN" in session.queries[0]
+
+
+def test_batch_over_the_limit_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_BATCH_MAX_IDS", 3)
+    session = StoreSession([])
+
+    with pytest.raises(HTTPException) as exc:
+        _batch(session, [1, 2, 3, 4])
+    assert exc.value.status_code == 400
+    assert session.queries == []
+
+    # Duplicates do not count against the limit
+    assert _batch(session, [1, 2, 3, 3, 1]).missing == [1, 2, 3]
@@ -0,0 +1,45 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.blocking import BlockingPool
+from app.exceptions.base import ServiceBusyException
+
+
+def test_runs_off_the_event_loop():
+    pool = BlockingPool("test", workers=2, max_pending=4)
+
+    async def run():
+        return await pool.run(threading.get_ident)
+
+    try:
+        assert asyncio.run(run()) != threading.get_ident()
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+
+def test_rejects_past_max_pending_and_frees_slots():
+    pool = BlockingPool("test", workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def run():
+        held = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(ServiceBusyException) as busy:
+            await pool.run(lambda: None)
+        release.set()
+        await asyncio.gather(*held)
+        return busy.value
+
+    try:
+        busy = asyncio.run(run())
+        assert busy.status_code == 503 and busy.retry_after_seconds >= 1
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
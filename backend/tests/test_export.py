@@ -0,0 +1,49 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services import export
+from app.services.export import ExportFormat, encode_rows
+
+COLUMNS = ("id", "created_at", "complaints", "summary")
+ROWS = [
+    {"id": i, "created_at": datetime(2026, 1, 20, tzinfo=timezone.utc), "complaints": ["Cold food"], "summary": None}
+    for i in range(5)
+]
+
+
+async def _rows():
+    for row in ROWS:
+        yield row
+
+
+def _collect(export_format):
+    async def run():
+        return [chunk async for chunk in encode_rows(_rows(), COLUMNS, export_format)]
+    return asyncio.run(run())
+
+
+def test_ndjson_is_one_object_per_line(monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_ROWS", 2)
+    chunks = _collect(ExportFormat.NDJSON)
+
+    assert len(chunks) == 3
+    lines = "".join(chunks).splitlines()
+    assert json.loads(lines[0]) == {
+        "id": 0, "created_at": "2026-01-20T00:00:00+00:00", "complaints": ["Cold food"], "summary": None
+    }
+    assert len(lines) == 5
+
+
+def test_csv_has_header_and_json_cells():
+    rows = list(csv.reader(io.StringIO("".join(_collect(ExportFormat.CSV)))))
+
+    assert rows[0] == list(COLUMNS)
+    assert rows[1] == ["0", "2026-01-20T00:00:00+00:00", '["Cold food"]', ""]
+    assert len(rows) == 6
@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.scraper import parse_gosom_download, build_scrape_result
+from app.services.payload_archive import PayloadArchive
+
+LONG_TEXT = "Great adana and the best lahmacun in the whole neighbourhood."
+PLACE = {
+    "title": "Kebapci",
+    "review_rating": "4.5",
+    "review_count": "120",
+    "place_id": "ChIJabc",
+    "link": "https://www.google.com/maps/place/Kebapci",
+    "user_reviews": [
+        {"Name": "Ayse", "Rating": 5, "Description": LONG_TEXT, "When": "2026-01-10T12:00:00Z"},
+        {"Name": "Ayse", "Rating": 5, "Description": LONG_TEXT + " Friendly staff.", "When": "2026-01-10T12:00:00Z"},
+        {"Name": "Old", "Rating": 1, "Description": "Cold food", "When": "2025-06-01T12:00:00Z"},
+    ],
+}
+
+
+def test_replayed_payload_uses_its_fetch_time():
+    body = json.dumps([PLACE]).encode()
+    result = build_scrape_result(parse_gosom_download(body), 100, datetime(2026, 1, 20))
+
+    assert result["restaurant_info"]["place_id"] == "ChIJabc"
+    # Duplicate keeps the longer text; the review older than 30 days is dropped
+    assert [r["text"] for r in result["reviews"]] == [LONG_TEXT + " Friendly staff."]
+    assert result["scraped_at"] == "2026-01-20T00:00:00"
+
+
+def test_archive_round_trip_is_content_addressed(tmp_path):
+    archive = PayloadArchive(root=str(tmp_path), level=3)
+    body = json.dumps([PLACE]).encode()
+
+    first = archive.store(body)
+    second = archive.store(body)
+
+    assert first.content_hash == second.content_hash
+    assert archive.path_for(first.content_hash).parent.name == first.content_hash[:2]
+    assert archive.load(first.content_hash) == body
+    assert list(archive.iter_hashes()) == [first.content_hash]
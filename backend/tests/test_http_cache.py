@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.http_cache import make_etag, etag_matches, conditional_response
+
+
+def test_etag_is_strong_and_depends_on_version():
+    etag = make_etag("analysis", "user-1", 42, 7, 1)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("analysis", "user-1", 42, 7, 1)
+    assert etag != make_etag("analysis", "user-1", 42, 8, 2)
+    assert etag != make_etag("analysis", "user-2", 42, 7, 1)
+
+
+def test_if_none_match_lists_and_weak_tags():
+    etag = make_etag("analysis", "user-1", 42)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_conditional_response():
+    etag = make_etag("analysis", "user-1", 42)
+
+    not_modified = conditional_response(etag, etag, {"id": 42})
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == etag
+
+    full = conditional_response('"stale"', etag, {"id": 42})
+    assert full.status_code == 200
+    assert full.body == b'{"id":42}'
+    assert full.headers["cache-control"].startswith("private, max-age=")
+
+
+class DictRedis:
+    def __init__(self, data):
+        self.data = dict(data)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, _ttl, value):
+        self.data[key] = value
+
+
+class NoReportSession:
+    async def execute(self, _statement):
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: None))
+
+
+def _reviews_page(monkeypatch, current_version):
+    from app.api.v1 import endpoints
+    from app.services import dashboard_cache
+
+    params = {"id": 42, "skip": 0, "limit": 20, "cursor": None, "include_total": True}
+    entry = {"etag": '"cached"', "body": {"reviews": []}, "place_key": "place:ChIJk", "reviews_version": "v1"}
+    client = DictRedis({
+        dashboard_cache._entry_key("user-1", "0", "analysis_reviews", params): json.dumps(entry),
+        dashboard_cache._reviews_version_key("place:ChIJk"): current_version,
+    })
+    monkeypatch.setattr(endpoints.RedisClient, "get_client", staticmethod(lambda: client))
+    return asyncio.run(endpoints.get_analysis_reviews(
+        42, "user-1", skip=0, limit=20, cursor=None, include_total=True, if_none_match=None, db=NoReportSession()
+    ))
+
+
+def test_cached_review_page_is_served_while_reviews_are_unchanged(monkeypatch):
+    response = _reviews_page(monkeypatch, "v1")
+    assert response.headers["etag"] == '"cached"'
+
+
+def test_cached_review_page_is_dropped_after_reviews_change(monkeypatch):
+    # Falls through to the database, which no longer has the report
+    with pytest.raises(HTTPException) as e:
+        _reviews_page(monkeypatch, "v2")
+    assert e.value.status_code == 404
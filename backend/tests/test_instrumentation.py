@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import instrumentation
+from app.core.instrumentation import LoopMonitor, operation
+
+
+class FakeClock:
+    """Monotonic time that only moves when a test says so."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _run_with_monitor(monitor, main):
+    async def run():
+        monitor.start()
+        try:
+            await main()
+        finally:
+            await monitor.stop()
+    asyncio.run(run())
+
+
+def test_blocking_step_is_attributed_with_its_stack(monkeypatch):
+    clock = FakeClock()
+    monitor = LoopMonitor("test", threshold_ms=50, clock=clock)
+    monkeypatch.setattr(instrumentation, "_monitor", monitor)
+
+    async def slow_parse():
+        # Blocks the loop for 300 ms, noticed by the watchdog while it lasts
+        clock.advance(0.3)
+        monitor._check_stall()
+
+    async def main():
+        await asyncio.sleep(0.05)
+        with operation("GET /api/v1/analyses"):
+            # A child task: attributed through the task factory
+            await asyncio.gather(slow_parse())
+        await asyncio.sleep(0.05)
+
+    _run_with_monitor(monitor, main)
+
+    stats = monitor.snapshot()
+    assert list(stats) == ["GET /api/v1/analyses"]
+    entry = stats["GET /api/v1/analyses"]
+    assert entry["count"] == 1
+    # Late by the block minus the heartbeat interval it was due after
+    assert entry["max_ms"] == pytest.approx((0.3 - monitor.interval) * 1000)
+    assert "slow_parse" in entry["last_stack"]
+
+
+def test_heartbeats_on_time_do_not_count_as_blocking():
+    clock = FakeClock()
+    monitor = LoopMonitor("test", threshold_ms=50, clock=clock)
+
+    # An idle loop (awaiting sleeps, threads, sockets) wakes the heartbeat on time
+    due = clock()
+    for _ in range(100):
+        due = monitor._wake(due)
+        clock.advance(monitor.interval)
+    assert monitor.snapshot() == {}
+
+    # Slightly late but under the threshold
+    clock.advance(0.04)
+    due = monitor._wake(due)
+    assert monitor.snapshot() == {}
+
+    clock.advance(monitor.interval + 0.08)
+    monitor._wake(due)
+    assert monitor.snapshot()["unknown"]["count"] == 1
+
+
+def test_route_templates_are_matched_once_per_path():
+    from types import SimpleNamespace
+    from starlette.routing import Match
+    from app.core.middleware import OperationMiddleware
+
+    calls = []
+
+    class Route:
+        path = "/api/v1/analyses/{analysis_id}"
+
+        def matches(self, scope):
+            calls.append(scope["path"])
+            return (Match.FULL if scope["path"].startswith("/api/v1/analyses/") else Match.NONE), {}
+
+    middleware = OperationMiddleware(app=None)
+    app = SimpleNamespace(routes=[Route()])
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/analyses/7", "app": app}
+
+    assert middleware._route_path(scope) == Route.path
+    assert middleware._route_path(dict(scope)) == Route.path
+    assert middleware._route_path({**scope, "path": "/health"}) == "<unmatched>"
+    assert calls == ["/api/v1/analyses/7", "/health"]
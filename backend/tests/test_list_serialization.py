@@ -0,0 +1,28 @@
+import os
+import sys
+from collections import namedtuple
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.schemas.analysis import AnalysisHistoryItem, ReviewItem, history_item_dict, review_item_dict
+
+HistoryRow = namedtuple("HistoryRow", "id sentiment_score summary created_at restaurant_name google_maps_url")
+ReviewRow = namedtuple("ReviewRow", "id published_at text rating author date_text profile_picture")
+
+
+def test_history_dict_matches_model():
+    row = HistoryRow(1, 0.5, "Good", datetime(2024, 1, 2, tzinfo=timezone.utc), None, "https://maps/x")
+    item = history_item_dict(row)
+
+    assert set(item) == set(AnalysisHistoryItem.model_fields)
+    assert AnalysisHistoryItem.model_validate(item).restaurant_name == "Unknown Restaurant"
+    assert item["created_at"] == "2024-01-02T00:00:00+00:00"
+
+
+def test_review_dict_matches_model():
+    row = ReviewRow(1, None, "Tasty", 5.0, "Ayse", "a week ago", None)
+    item = review_item_dict(row)
+
+    assert set(item) == set(ReviewItem.model_fields)
+    assert ReviewItem.model_validate(item).date == "a week ago"
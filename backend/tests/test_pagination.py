@@ -0,0 +1,31 @@
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.pagination import encode_cursor, decode_cursor, parse_cursor_datetime
+
+
+def test_cursor_round_trip():
+    published = datetime(2026, 1, 20, 10, 30, tzinfo=timezone.utc)
+    cursor = encode_cursor([published, 42])
+
+    value, last_id = decode_cursor(cursor, 2)
+    assert parse_cursor_datetime(value) == published
+    assert last_id == 42
+
+
+def test_cursor_with_null_sort_key():
+    value, last_id = decode_cursor(encode_cursor([None, 7]), 2)
+    assert parse_cursor_datetime(value) is None
+    assert last_id == 7
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1, 2, 3]), encode_cursor(["x"])])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
@@ -0,0 +1,28 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.place_identity import normalize_place_alias, extract_place_id, canonical_place_key
+
+
+def test_free_text_queries_normalize_to_one_alias():
+    assert normalize_place_alias("McDonalds  Kazasker ") == normalize_place_alias("mcdonalds kazasker")
+
+
+def test_url_alias_ignores_visit_specific_params():
+    a = "https://www.google.com/maps/place/McDonald's/data=!4m2!3m1!1s0x0:0x1?hl=en&entry=ttu"
+    b = "https://WWW.google.com/maps/place/McDonald%27s/data=!4m2!3m1!1s0x0:0x1/"
+    assert normalize_place_alias(a) == normalize_place_alias(b)
+
+
+def test_place_id_is_read_from_maps_urls():
+    url = "https://www.google.com/maps/place/X/data=!4m7!3m6!1s0x0:0x1!8m2!3d41!4d29!16s%2Fg%2F1!19sChIJabc-123_x?hl=en"
+    assert extract_place_id(url) == "ChIJabc-123_x"
+    assert extract_place_id("https://www.google.com/maps/search/?api=1&query=x&query_place_id=ChIJzz9") == "ChIJzz9"
+    assert extract_place_id("mcdonalds kazasker") is None
+
+
+def test_canonical_key_prefers_place_id():
+    assert canonical_place_key("ChIJabc", "anything") == "place:ChIJabc"
+    assert canonical_place_key(None, "McDonalds Kazasker") == "query:mcdonalds kazasker"
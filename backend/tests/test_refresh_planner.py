@@ -0,0 +1,38 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+from app.services.refresh_planner import (
+    compute_refresh_interval, update_review_velocity, in_refresh_window, refresh_slots_for_tick
+)
+
+
+def test_busy_restaurants_refresh_more_often():
+    quiet = compute_refresh_interval(0.5)
+    busy = compute_refresh_interval(20)
+    assert busy < quiet
+    assert busy >= timedelta(hours=settings.REFRESH_MIN_INTERVAL_HOURS)
+    assert compute_refresh_interval(None) == timedelta(days=settings.REFRESH_MAX_INTERVAL_DAYS)
+
+
+def test_velocity_is_smoothed_and_ignores_missing_data():
+    first = update_review_velocity(None, 100, 110, timedelta(days=1))
+    assert first == 10
+    assert update_review_velocity(first, 110, 110, timedelta(days=1)) == 5
+    assert update_review_velocity(first, None, 120, timedelta(days=1)) == first
+
+
+def test_refresh_window_and_pacing():
+    start = settings.REFRESH_WINDOW_START_HOUR
+    assert in_refresh_window(datetime(2026, 1, 5, start, 30))
+    assert not in_refresh_window(datetime(2026, 1, 5, settings.REFRESH_WINDOW_END_HOUR, 0))
+
+    # At the top of the hour the budget is split over every remaining tick
+    top_of_hour = datetime(2026, 1, 5, start, 0)
+    ticks = 3600 // settings.REFRESH_TICK_SECONDS
+    assert refresh_slots_for_tick(top_of_hour, ticks * 3) == 3
+    assert refresh_slots_for_tick(top_of_hour, 0) == 0
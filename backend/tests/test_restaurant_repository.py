@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.restaurant_repository import RestaurantRepository, AnalysisResultRepository
+
+URL = "https://www.google.com/maps/place/Kebapci"
+
+
+class RecordingSession:
+    """Returns canned results in order and keeps the SQL it was given."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self.results.pop(0) if self.results else None
+
+
+class Result:
+    def __init__(self, scalar=None, row=None):
+        self.scalar, self.row = scalar, row
+
+    def scalar_one_or_none(self):
+        return self.scalar
+
+    def one(self):
+        return self.row
+
+
+def _upsert(session, place_key):
+    repo = RestaurantRepository(session)
+    return asyncio.run(repo.upsert_by_place_key(place_key, name="Kebapci", google_maps_url=URL, place_id="ChIJk"))
+
+
+def test_new_place_is_inserted_whichever_key_conflicts():
+    session = RecordingSession([Result(scalar=11)])
+
+    assert _upsert(session, "place:ChIJk") == 11
+    assert "ON CONFLICT DO NOTHING" in session.statements[0]
+    assert len(session.statements) == 1
+
+
+def test_maps_link_stored_under_an_older_key_is_rekeyed():
+    # The link was first stored under a query: key, before the place_id was known
+    existing = SimpleNamespace(id=5, place_key="query:kebapci kadikoy")
+    session = RecordingSession([Result(scalar=None), Result(row=existing)])
+
+    assert _upsert(session, "place:ChIJk") == 5
+
+    lookup = session.statements[1]
+    assert "restaurants.place_key = " in lookup and "restaurants.google_maps_url = " in lookup
+    assert any(s.startswith("UPDATE reviews") for s in session.statements)
+    final = session.statements[-1]
+    assert final.startswith("UPDATE restaurants") and "place_key=" in final
+
+
+def test_same_key_refreshes_details_without_moving_reviews():
+    existing = SimpleNamespace(id=5, place_key="place:ChIJk")
+    session = RecordingSession([Result(scalar=None), Result(row=existing)])
+
+    assert _upsert(session, "place:ChIJk") == 5
+    assert [s.split()[0] for s in session.statements] == ["INSERT", "SELECT", "UPDATE"]
+    assert "place_key=" not in session.statements[-1]
+
+
+def test_result_upsert_returns_the_row_it_kept():
+    # A fallback that conflicts with a stored real result gets the real one back
+    real = SimpleNamespace(id=9, sentiment_score=0.8, is_fallback=False)
+    session = RecordingSession([Result(row=real)])
+    fallback = {"sentiment_score": 0.5, "summary": "", "complaints": [], "praises": [],
+                "reviews_analyzed": 3, "is_fallback": True}
+
+    stored = asyncio.run(AnalysisResultRepository(session).upsert("place:ChIJk", "hash", fallback))
+
+    assert stored is real
+    returning = session.statements[0].split("RETURNING")[1]
+    assert "analysis_results.sentiment_score" in returning and "analysis_results.is_fallback" in returning
@@ -0,0 +1,34 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.scraper import parse_review_date, review_signature_hash
+
+SCRAPED_AT = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_absolute_dates():
+    assert parse_review_date("2026-01-20") == datetime(2026, 1, 20, tzinfo=timezone.utc)
+    assert parse_review_date("2026-01-20T10:30:00Z") == datetime(2026, 1, 20, 10, 30, tzinfo=timezone.utc)
+
+
+def test_relative_dates_use_scrape_time():
+    assert parse_review_date("2 weeks ago", SCRAPED_AT) == SCRAPED_AT - timedelta(weeks=2)
+    assert parse_review_date("a month ago", SCRAPED_AT) == SCRAPED_AT - timedelta(days=30)
+    assert parse_review_date("3 hours ago", SCRAPED_AT) == SCRAPED_AT
+
+
+def test_unknown_dates():
+    assert parse_review_date("") is None
+    assert parse_review_date("Unknown Date") is None
+    assert parse_review_date("last summer", SCRAPED_AT) is None
+
+
+def test_signature_hash_ignores_formatting():
+    a = {"author": "Y. B.", "text": "Great  food", "rating": 5.0, "date_text": "2026-01-20"}
+    b = {"author": "y. b.", "text": "great food ", "rating": 5.0, "date_text": "2026-01-20"}
+    assert review_signature_hash(a) == review_signature_hash(b)
+    assert len(review_signature_hash(a)) == 40
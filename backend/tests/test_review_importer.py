@@ -0,0 +1,64 @@
+import io
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.review_importer import ReviewImporter, iter_json_values, normalize_review, open_dump
+from app.services.scraper import generate_review_signature
+
+DOCUMENT = {
+    "restaurant_name": "Kebapci",
+    "total_reviews": 2,
+    "reviews": [
+        {"text": "Great adana", "rating": 5.0, "author": "Ayse", "date": "2026-01-20", "source": "Google Maps"},
+        {"text": "Cold food", "rating": 1, "author": "Mehmet", "date": "2026-01-18", "source": "Google Maps"},
+    ],
+}
+
+
+def test_utf16_export_is_decoded(tmp_path):
+    path = tmp_path / "raw_res.json"
+    # Windows export: UTF-16 LE with BOM and CRLF line endings
+    path.write_bytes(json.dumps(DOCUMENT, indent=2).replace("\n", "\r\n").encode("utf-16"))
+
+    with open_dump(str(path)) as f:
+        assert json.load(f)["restaurant_name"] == "Kebapci"
+
+
+def test_ndjson_mixes_documents_and_review_lines(tmp_path):
+    path = tmp_path / "dump.ndjson"
+    lines = [
+        json.dumps(DOCUMENT),
+        "not json",
+        json.dumps({"restaurant_name": "Lahmacun Evi", "text": "Crispy", "rating": 4, "author": "Can"}),
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    importer = ReviewImporter(db=None, batch_size=10)
+    records = list(importer.iter_records(str(path)))
+
+    assert [(doc["restaurant_name"], rec.get("author")) for doc, rec in records] == [
+        ("Kebapci", "Ayse"), ("Kebapci", "Mehmet"), ("Lahmacun Evi", "Can"),
+    ]
+    assert importer.stats["skipped"] == 1
+
+
+def test_normalized_signature_matches_scraped_review():
+    review = normalize_review({"text": "Cold food", "rating": 1, "author": "Mehmet", "date": "2026-01-18"})
+    scraped = {"text": "Cold food", "rating": 1.0, "author": "Mehmet", "date_text": "2026-01-18"}
+
+    assert generate_review_signature(review) == generate_review_signature(scraped)
+    assert normalize_review({"text": "", "rating": None}) is None
+
+
+def test_json_array_is_decoded_element_by_element():
+    documents = [DOCUMENT, {"restaurant_name": "Pide Salonu", "reviews": []}, 12345, "text, with ] and ,"]
+    text = json.dumps(documents, indent=2)
+
+    # Chunks far smaller than one document, so elements span many reads
+    for chunk_chars in (1, 7, 64, 1 << 20):
+        assert list(iter_json_values(io.StringIO(text), chunk_chars)) == documents
+    assert list(iter_json_values(io.StringIO(json.dumps(DOCUMENT)), 5)) == [DOCUMENT]
+    assert list(iter_json_values(io.StringIO(" [ ] "), 1)) == []
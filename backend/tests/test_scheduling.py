@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.worker import scheduling
+from app.worker.scheduling import TaskLane, LANE_PRIORITY_RANGE, compute_priority
+
+
+def test_first_task_gets_best_lane_priority():
+    for lane, (best, _) in LANE_PRIORITY_RANGE.items():
+        assert compute_priority(lane, 1) == best
+
+
+def test_busy_user_sinks_within_lane_only():
+    interactive_worst = LANE_PRIORITY_RANGE[TaskLane.INTERACTIVE][1]
+    bulk_best = LANE_PRIORITY_RANGE[TaskLane.BULK][0]
+
+    assert compute_priority(TaskLane.INTERACTIVE, 1000) == interactive_worst
+    assert compute_priority(TaskLane.INTERACTIVE, 1000) < bulk_best
+    assert compute_priority(TaskLane.BULK, 1000) < compute_priority(TaskLane.SCHEDULED, 1)
+
+
+def test_priority_is_monotonic_in_inflight_count():
+    priorities = [compute_priority(TaskLane.BULK, n) for n in range(1, 50)]
+    assert priorities == sorted(priorities)
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def setex(self, key, _ttl, value):
+        self.store[key] = value
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+def _patch_slots(monkeypatch, released):
+    async def acquire(user_id, lane, task_ids, client=None):
+        return len(task_ids)
+
+    async def release(user_id, lane, task_ids, client=None):
+        released.extend(task_ids)
+
+    monkeypatch.setattr(scheduling, "acquire_inflight_slots", acquire)
+    monkeypatch.setattr(scheduling, "release_inflight_slots_async", release)
+
+
+def test_batch_is_recorded_before_publishing(monkeypatch):
+    from celery import group
+
+    client, released, seen = RecordingRedis(), [], {}
+    _patch_slots(monkeypatch, released)
+
+    def apply_async(self, task_id=None, **_):
+        # The record must already be readable when the first task is published
+        seen["record"] = json.loads(client.store[scheduling.batch_key(task_id)])
+        return SimpleNamespace(id=task_id)
+
+    monkeypatch.setattr(group, "apply_async", apply_async)
+    result = asyncio.run(scheduling.enqueue_analysis_batch(["a", "b"], "u1", client=client, place_names=["A", "B"]))
+
+    assert [item["place_name"] for item in seen["record"]["items"]] == ["A", "B"]
+    assert scheduling.batch_key(result.id) in client.store
+    assert released == []
+
+
+def test_failed_publish_drops_record_and_slots(monkeypatch):
+    from celery import group
+
+    client, released = RecordingRedis(), []
+    _patch_slots(monkeypatch, released)
+
+    def apply_async(self, **_):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(group, "apply_async", apply_async)
+    with pytest.raises(ConnectionError):
+        asyncio.run(scheduling.enqueue_analysis_batch(["a", "b"], "u1", client=client))
+
+    assert client.store == {}
+    assert len(released) == 2
@@ -0,0 +1,35 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.stats_repository import StatsRepository
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_rescored_reports_move_between_buckets_once_per_day():
+    session = RecordingSession()
+    day = datetime(2026, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-2)))  # 2 March in UTC
+    asyncio.run(StatsRepository(session).rescore_reports([
+        ("u1", day, 0.0, 0.8),  # fallback (negative) -> positive
+        ("u1", day, 0.3, 0.5),  # stays neutral
+    ]))
+
+    assert len(session.statements) == 1
+    statement = session.statements[0]
+    sql, params = str(statement), statement.params
+    assert params["day_1"].isoformat() == "2026-03-02"
+    assert "neutral_count" not in sql
+    assert abs(params["sentiment_sum_1"] - 1.0) < 1e-9
+    assert params["negative_count_1"] == -1 and params["positive_count_1"] == 1
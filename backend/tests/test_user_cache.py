@@ -0,0 +1,100 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import httpx
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.user import User
+from app.services.user_cache import UserCache, invalidate_user
+
+EMAIL = "cache@example.com"
+
+
+def _user():
+    return User(
+        id=7, email=EMAIL, hashed_password="argon2-hash", google_refresh_token="refresh",
+        first_name="Ada", is_active=True, google_account_connected=True,
+        created_at=datetime(2024, 1, 2, tzinfo=timezone.utc),
+    )
+
+
+def test_cached_user_has_profile_but_no_credentials():
+    async def run():
+        cache = UserCache(None)
+        await cache.set(EMAIL, _user())
+        return await cache.get(EMAIL)
+
+    user = asyncio.run(run())
+
+    assert (user.id, user.first_name, user.is_active) == (7, "Ada", True)
+    assert user.created_at == datetime(2024, 1, 2, tzinfo=timezone.utc)
+    assert user.hashed_password is None
+    assert user.google_refresh_token is None
+
+
+def test_invalidate_drops_local_copy():
+    async def run():
+        cache = UserCache(None)
+        await cache.set(EMAIL, _user())
+        await invalidate_user(None, EMAIL)
+        return await cache.get(EMAIL)
+
+    assert asyncio.run(run()) is None
+
+
+class UserSession:
+    """Serves the stored row by primary key; a subject lookup means the cache was missed."""
+
+    def __init__(self, user):
+        self.user, self.lookups, self.committed = user, 0, False
+
+    async def execute(self, _statement):
+        self.lookups += 1
+        return SimpleNamespace(scalar_one_or_none=lambda: self.user)
+
+    async def get(self, _model, user_id):
+        return self.user if user_id == self.user.id else None
+
+    def add(self, _obj):
+        pass
+
+    async def commit(self):
+        self.committed = True
+
+    async def refresh(self, _obj):
+        pass
+
+
+def test_handlers_work_with_a_cached_user():
+    from fastapi import FastAPI
+    from app.api.v1 import users
+    from app.core.database import get_db
+    from app.core.security import create_access_token
+
+    stored = _user()
+    session = UserSession(stored)
+    app = FastAPI()
+    app.include_router(users.router, prefix="/users")
+    app.dependency_overrides[get_db] = lambda: session
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': EMAIL})}"}
+
+    async def run():
+        await invalidate_user(None, EMAIL)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = await client.get("/users/me", headers=headers)
+            # Served from the cache: a detached User, never lazy-loaded
+            second = await client.get("/users/me", headers=headers)
+            updated = await client.put("/users/me", headers=headers, json={"first_name": "Grace"})
+        return first, second, updated
+
+    first, second, updated = asyncio.run(run())
+
+    assert session.lookups == 1
+    assert second.status_code == 200 and second.json()["first_name"] == "Ada"
+    # The update loads the row through its own session before changing it
+    assert updated.status_code == 200 and updated.json()["first_name"] == "Grace"
+    assert stored.first_name == "Grace" and session.committed
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import httpx
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import HTTPException
+
+from app.api.v1.webhooks import create_webhook
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.webhook import WebhookEndpointCreate
+from app.services.webhooks import (
+    SIGNATURE_HEADER, TIMESTAMP_HEADER, UnsafeWebhookURL, backoff_seconds, build_event,
+    check_webhook_url, post_batch, resolve_webhook_url, verify_signature
+)
+
+SECRET = "s3cret"
+
+
+@pytest.fixture
+def receiver(monkeypatch):
+    """Local stand-in for a customer endpoint; records what it receives."""
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_URLS", True)
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((dict(self.headers), body))
+            self.send_response(self.server.status)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    server.status = 204
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}/hook", received
+    server.shutdown()
+
+
+def _post(url, events):
+    async def run():
+        async with httpx.AsyncClient(timeout=5) as client:
+            return await post_batch(client, url, SECRET, events)
+    return asyncio.run(run())
+
+
+def test_batch_is_signed_and_verifiable(receiver):
+    _, url, received = receiver
+    events = [build_event("analysis.completed", {"analysis_id": i}) for i in range(3)]
+
+    assert _post(url, events) is None
+
+    headers, body = received[0]
+    assert verify_signature(SECRET, int(headers[TIMESTAMP_HEADER]), body, headers[SIGNATURE_HEADER])
+    assert not verify_signature("other", int(headers[TIMESTAMP_HEADER]), body, headers[SIGNATURE_HEADER])
+    assert [e["data"]["analysis_id"] for e in json.loads(body)["events"]] == [0, 1, 2]
+
+
+def test_error_status_is_reported(receiver):
+    server, url, _ = receiver
+    server.status = 503
+
+    assert _post(url, [build_event("analysis.completed", {})]).startswith("HTTP 503")
+
+
+def test_unreachable_endpoint_is_reported(monkeypatch):
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_URLS", True)
+    assert _post("http://127.0.0.1:1/hook", [build_event("analysis.completed", {})]) is not None
+
+
+def test_backoff_doubles_up_to_the_cap():
+    base = settings.WEBHOOK_BACKOFF_BASE_SECONDS
+    assert base * 0.8 <= backoff_seconds(1) <= base * 1.2
+    assert base * 4 * 0.8 <= backoff_seconds(3) <= base * 4 * 1.2
+    assert backoff_seconds(50) <= settings.WEBHOOK_BACKOFF_MAX_SECONDS * 1.2
+
+
+def _resolving_to(monkeypatch, *addresses):
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET6 if ":" in a else socket.AF_INET, socket.SOCK_STREAM, 6, "", (a, port)) for a in addresses]
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+
+@pytest.mark.parametrize("url", [
+    "http://example.com/hook",
+    "https://localhost/hook",
+    "https://127.0.0.1/hook",
+    "https://10.1.2.3/hook",
+    "https://192.168.0.10/hook",
+    "https://169.254.169.254/latest/meta-data",
+    "https://[::1]/hook",
+    "https://[fe80::1]/hook",
+    "https://[::ffff:127.0.0.1]/hook",
+])
+def test_non_https_and_non_public_urls_are_rejected(url):
+    with pytest.raises(UnsafeWebhookURL):
+        check_webhook_url(url)
+
+
+def test_public_https_url_is_accepted():
+    assert check_webhook_url("https://93.184.216.34/hook").host == "93.184.216.34"
+
+
+def test_registration_rejects_unsafe_urls(monkeypatch):
+    _resolving_to(monkeypatch, "10.0.0.5")
+    for url in ("http://example.com/hook", "https://internal.example.com/hook"):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(create_webhook(WebhookEndpointCreate(url=url), current_user=User(id=1), db=None))
+        assert exc.value.status_code == 400
+
+
+def test_name_resolving_to_private_address_is_rejected(monkeypatch):
+    _resolving_to(monkeypatch, "93.184.216.34", "127.0.0.1")
+
+    with pytest.raises(UnsafeWebhookURL):
+        asyncio.run(resolve_webhook_url("https://rebind.example.com/hook"))
+
+
+def test_delivery_is_pinned_to_the_checked_address(monkeypatch):
+    _resolving_to(monkeypatch, "93.184.216.34")
+
+    target, headers, extensions = asyncio.run(resolve_webhook_url("https://hooks.example.com:8443/in?x=1"))
+
+    assert str(target) == "https://93.184.216.34:8443/in?x=1"
+    assert headers == {"Host": "hooks.example.com:8443"}
+    assert extensions == {"sni_hostname": "hooks.example.com"}
+
+
+def test_delivery_refuses_private_addresses(receiver, monkeypatch):
+    _, url, received = receiver
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_URLS", False)
+
+    error = _post(url.replace("http://", "https://"), [build_event("analysis.completed", {})])
+
+    assert error.startswith("Refused")
+    assert received == []
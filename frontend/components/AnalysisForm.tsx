@@ -115,30 +115,46 @@ export default function AnalysisForm() {
             const taskId = data.task_id;
             setStatus("Scraping reviews...");
 
-            // Poll for status
-            const pollInterval = setInterval(async () => {
-                try {
-                    const statusRes = await fetch(`http://localhost:8000/api/v1/status/${taskId}`);
-                    const statusData = await statusRes.json();
-
-                    if (statusData.status === "SUCCESS") {
-                        clearInterval(pollInterval);
-                        setLoading(false);
-                        setStatus("Complete!");
-                        // Redirect to the detail page (which uses the new design)
-                        router.push(`/dashboard/analysis/${statusData.result.id}`);
-                    } else if (statusData.status === "FAILURE") {
-                        clearInterval(pollInterval);
-                        throw new Error(statusData.error || "Analysis failed");
-                    } else {
-                        setStatus(`Processing... (${statusData.status})`);
-                    }
-                } catch (err) {
-                    clearInterval(pollInterval);
+            // Stream stage-level progress instead of polling /status
+            const stageLabels: Record<string, string> = {
+                queued: "Waiting in queue...",
+                started: "Starting analysis...",
+                scraping: "Scraping reviews...",
+                analyzing: "Analyzing reviews with AI...",
+                storing: "Saving results...",
+            };
+            const events = new EventSource(`http://localhost:8000/api/v1/status/${taskId}/stream`);
+
+            const handleEvent = (e: MessageEvent) => {
+                const event = JSON.parse(e.data);
+
+                if (event.stage === "completed") {
+                    events.close();
                     setLoading(false);
-                    setError(err instanceof Error ? err.message : "Error checking status");
+                    setStatus("Complete!");
+                    // Redirect to the detail page (which uses the new design)
+                    router.push(`/dashboard/analysis/${event.analysis_id}`);
+                } else if (event.stage === "failed") {
+                    events.close();
+                    setLoading(false);
+                    setError(event.error || "Analysis failed");
+                } else if (event.stage === "scraped") {
+                    setStatus(`Parsed ${event.reviews_parsed} reviews...`);
+                } else {
+                    setStatus(stageLabels[event.stage] || `Processing... (${event.stage})`);
+                }
+            };
+
+            ["queued", "started", "scraping", "scraped", "analyzing", "storing", "completed", "failed"].forEach(
+                (stage) => events.addEventListener(stage, handleEvent as EventListener)
+            );
+            events.onerror = () => {
+                // EventSource reconnects on its own; only give up once the server closed the stream
+                if (events.readyState === EventSource.CLOSED) {
+                    setLoading(false);
+                    setError("Lost connection while checking status");
                 }
-            }, 2000);
+            };
 
         } catch (err) {
             setLoading(false);
@@ -112,8 +112,8 @@ export default function DashboardCharts({ stats }: { stats: DashboardStats }) {
                                             const data = payload[0].payload;
                                             return (
                                                 <div className="bg-[#18181b] border border-[#27272a] p-3 rounded-lg shadow-xl">
-                                                    <p className="text-white font-medium mb-1">{data.restaurant_name}</p>
-                                                    <p className="text-gray-400 text-xs mb-2">{new Date(data.date).toLocaleString()}</p>
+                                                    <p className="text-white font-medium mb-1">{new Date(data.date).toLocaleDateString()}</p>
+                                                    <p className="text-gray-400 text-xs mb-2">{data.volume} {data.volume === 1 ? "analysis" : "analyses"}</p>
                                                     <div className="flex items-center gap-2">
                                                         <div className={`w-2 h-2 rounded-full ${data.avg_sentiment > 0 ? 'bg-green-500' : 'bg-red-500'}`} />
                                                         <span className="text-white font-bold">{(data.avg_sentiment * 100).toFixed(0)}% Sentiment</span>